@@ -1,6 +1,7 @@
 import os
 import subprocess
-from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
 from .config import get_platform, load_app_configs
 import shutil
 import glob
@@ -10,6 +11,9 @@ import pyperclip  # For clipboard operations
 import schedule   # For scheduling tasks
 import time
 import ctypes
+import logging
+
+logger = logging.getLogger(__name__)
 
 def is_admin() -> bool:
     """Check if the script is running with administrative privileges."""
@@ -18,9 +22,19 @@ def is_admin() -> bool:
     except:
         return False
     
-def find_executable(app: str) -> Optional[str]:
+# Resolved executable paths keyed by (platform, app). Misses are not
+# cached, so applications installed later are still found.
+_executable_cache: Dict[Tuple[str, str], str] = {}
+_prefetch_executor = None
+
+def find_executable(app: str, use_cache: bool = True) -> Optional[str]:
     """Find the executable path for the given application."""
     platform = get_platform()
+    key = (platform, app.lower())
+    cached = _executable_cache.get(key)
+    if use_cache and cached and (os.path.exists(cached) or shutil.which(cached)):
+        return cached
+
     app_configs = load_app_configs()
     app_paths = app_configs.get(platform, {}).get(app.lower(), [])
 
@@ -29,10 +43,22 @@ def find_executable(app: str) -> Optional[str]:
         matched_paths = glob.glob(expanded_path)
         for matched_path in matched_paths:
             if os.path.exists(matched_path) or shutil.which(matched_path):
+                _executable_cache[key] = matched_path
                 return matched_path
 
     return None
 
+def prefetch_executable(app: str):
+    """Resolve an application's executable in the background so a later open is instant."""
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        _prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bylexa-prefetch")
+    _prefetch_executor.submit(find_executable, app)
+
+def clear_executable_cache():
+    """Forget resolved executable paths, e.g. after the app configuration changed."""
+    _executable_cache.clear()
+
 def open_application(app: str, task: Optional[str] = None) -> str:
     """Open the specified application and perform a task if provided."""
     app_path = find_executable(app)
@@ -149,12 +175,12 @@ def control_media_player(action: str, media: str = None, seek_time: int = None,
         str: Status message indicating the result of the operation
     """
     try:
-        print("Determining platform...")
+        logger.debug("Determining platform...")
         platform = get_platform()
-        print(f"Platform detected: {platform}")
+        logger.debug("Platform detected: %s", platform)
 
         if platform == 'windows':
-            print("Running on Windows platform.")
+            logger.debug("Running on Windows platform.")
             try:
                 import win32api
                 import win32con
@@ -169,43 +195,43 @@ def control_media_player(action: str, media: str = None, seek_time: int = None,
             VK_VOLUME_DOWN = 0xAE
             VK_VOLUME_MUTE = 0xAD
             
-            print(f"Action requested: {action}")
+            logger.debug("Action requested: %s", action)
 
             if action == "play":
                 # Check if "media" specifies next or previous track
                 if media == "next":
-                    print("Playing next track.")
+                    logger.debug("Playing next track.")
                     win32api.keybd_event(VK_MEDIA_NEXT_TRACK, 0, 0, 0)
                     return "Next track played"
                 elif media == "previous":
-                    print("Playing previous track.")
+                    logger.debug("Playing previous track.")
                     win32api.keybd_event(VK_MEDIA_PREV_TRACK, 0, 0, 0)
                     return "Previous track played"
                 elif media:
                     # If media is specified as a file, attempt to play it
-                    print(f"Attempting to play media file: {media}")
+                    logger.debug("Attempting to play media file: %s", media)
                     os.startfile(media)
                     return f"Playing {media}"
                 else:
                     # Toggle play/pause if no specific media is specified
-                    print("Attempting to toggle play/pause.")
+                    logger.debug("Attempting to toggle play/pause.")
                     win32api.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
                     return "Media playback started"
                     
             elif action == "pause":
-                print("Attempting to pause media.")
+                logger.debug("Attempting to pause media.")
                 win32api.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
                 return "Media playback paused"
                 
             elif action == "stop":
-                print("Attempting to stop media.")
+                logger.debug("Attempting to stop media.")
                 win32api.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
                 win32api.keybd_event(VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
                 return "Media playback stopped"
                 
             elif action == "forward":
                 if seek_time:
-                    print(f"Attempting to seek forward within the track by {seek_time} seconds.")
+                    logger.debug("Attempting to seek forward within the track by %s seconds.", seek_time)
                     # Placeholder: Implement seeking if specific player allows it, otherwise use next track as fallback
                     # Note: Implement specific player integration if needed
                     win32api.keybd_event(VK_MEDIA_NEXT_TRACK, 0, 0, 0)
@@ -213,25 +239,25 @@ def control_media_player(action: str, media: str = None, seek_time: int = None,
                     
             elif action == "rewind":
                 if seek_time:
-                    print(f"Attempting to seek backward within the track by {seek_time} seconds.")
+                    logger.debug("Attempting to seek backward within the track by %s seconds.", seek_time)
                     # Placeholder: Implement seeking if specific player allows it, otherwise use previous track as fallback
                     win32api.keybd_event(VK_MEDIA_PREV_TRACK, 0, 0, 0)
                     # Note: Implement specific player integration if needed
                     return f"Sought backward {seek_time} seconds"
 
             elif action == "next":
-                print("Playing next track.")
+                logger.debug("Playing next track.")
                 win32api.keybd_event(VK_MEDIA_NEXT_TRACK, 0, 0, 0)
                 return "Next track played"
 
             elif action == "previous":
-                print("Playing previous track.")
+                logger.debug("Playing previous track.")
                 win32api.keybd_event(VK_MEDIA_PREV_TRACK, 0, 0, 0)
                 return "Previous track played"
 
             elif action == "volume":
                 if volume_level is not None:
-                    print(f"Setting volume to {volume_level}%.")
+                    logger.debug("Setting volume to %s%%.", volume_level)
                     try:
                         from ctypes import cast, POINTER
                         from comtypes import CLSCTX_ALL
@@ -248,93 +274,93 @@ def control_media_player(action: str, media: str = None, seek_time: int = None,
                     return f"Volume set to {volume_level}%"
                     
             elif action == "volume_up":
-                print("Increasing volume.")
+                logger.debug("Increasing volume.")
                 win32api.keybd_event(VK_VOLUME_UP, 0, 0, 0)
                 return "Volume increased"
                 
             elif action == "volume_down":
-                print("Decreasing volume.")
+                logger.debug("Decreasing volume.")
                 win32api.keybd_event(VK_VOLUME_DOWN, 0, 0, 0)
                 return "Volume decreased"
                 
             elif action == "mute":
-                print("Muting volume.")
+                logger.debug("Muting volume.")
                 win32api.keybd_event(VK_VOLUME_MUTE, 0, 0, 0)
                 return "Volume muted"
 
         else:
             # For Linux/macOS systems
-            print("Running on Linux/macOS platform.")
-            print(f"Action requested: {action}")
+            logger.debug("Running on Linux/macOS platform.")
+            logger.debug("Action requested: %s", action)
 
             if action == "play":
                 if media:
-                    print(f"Attempting to play media file: {media}")
+                    logger.debug("Attempting to play media file: %s", media)
                     os.system(f"xdg-open '{media}'")  # Linux
                     return f"Playing {media}"
                 else:
-                    print("Attempting to start playback using playerctl.")
+                    logger.debug("Attempting to start playback using playerctl.")
                     os.system("playerctl play")
                     return "Media playback started"
                     
             elif action == "pause":
-                print("Attempting to pause playback using playerctl.")
+                logger.debug("Attempting to pause playback using playerctl.")
                 os.system("playerctl pause")
                 return "Media playback paused"
                 
             elif action == "stop":
-                print("Attempting to stop playback using playerctl.")
+                logger.debug("Attempting to stop playback using playerctl.")
                 os.system("playerctl stop")
                 return "Media playback stopped"
                 
             elif action == "forward":
                 if seek_time:
-                    print(f"Seeking forward {seek_time} seconds.")
+                    logger.debug("Seeking forward %s seconds.", seek_time)
                     os.system(f"playerctl position {seek_time}+")
                     return f"Sought forward {seek_time} seconds"
                     
             elif action == "rewind":
                 if seek_time:
-                    print(f"Seeking backward {seek_time} seconds.")
+                    logger.debug("Seeking backward %s seconds.", seek_time)
                     os.system(f"playerctl position {seek_time}-")
                     return f"Sought backward {seek_time} seconds"
 
             elif action == "next":
-                print("Playing next track.")
+                logger.debug("Playing next track.")
                 os.system("playerctl next")
                 return "Next track played"
 
             elif action == "previous":
-                print("Playing previous track.")
+                logger.debug("Playing previous track.")
                 os.system("playerctl previous")
                 return "Previous track played"
 
             elif action == "volume":
                 if volume_level is not None:
-                    print(f"Setting volume to {volume_level}%.")
+                    logger.debug("Setting volume to %s%%.", volume_level)
                     os.system(f"amixer set Master {volume_level}%")
                     return f"Volume set to {volume_level}%"
                     
             elif action == "volume_up":
-                print("Increasing volume using amixer.")
+                logger.debug("Increasing volume using amixer.")
                 os.system("amixer set Master 5%+")
                 return "Volume increased"
                 
             elif action == "volume_down":
-                print("Decreasing volume using amixer.")
+                logger.debug("Decreasing volume using amixer.")
                 os.system("amixer set Master 5%-")
                 return "Volume decreased"
                 
             elif action == "mute":
-                print("Muting volume using amixer.")
+                logger.debug("Muting volume using amixer.")
                 os.system("amixer set Master toggle")
                 return "Volume muted"
         
-        print("Action completed successfully.")
+        logger.debug("Action completed successfully.")
         return f"Media action '{action}' completed successfully"
         
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        logger.error("An error occurred: %s", e)
         return f"Error controlling media player: {str(e)}"
 
 def perform_custom_script(
@@ -359,7 +385,7 @@ def perform_custom_script(
             for key, value in parameters.items():
                 command.append(f"{key}={value}")
 
-        print("Executing command:", command)  # Debugging print statement
+        logger.debug("Executing command: %s", command)
 
         # Run the command
         process = subprocess.Popen(
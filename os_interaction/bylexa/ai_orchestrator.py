@@ -3,19 +3,33 @@ from typing import Dict, List, Any, Optional, Tuple, Union
 import json
 import time
 import asyncio
+import functools
 from pathlib import Path
 import threading
 import queue
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
 
 from .intent_parser import IntentParser
-from .dialog_manager import DialogManager
+from .parser_pool import ParserPool
+from .streaming_parser import StreamingParseSession
+from .dialog_manager import DialogManager, DEFAULT_SESSION
+from .command_executor import CommandExecutor, LaneFullError, PRIORITY_INTERACTIVE
 from .commands import perform_action
+from .tracing import get_tracer, span
+from .metrics import get_metrics
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Metrics updated per command
+COMMANDS = get_metrics().counter(
+    "bylexa_commands_total", "Commands handled, by action and response status", ("action", "status")
+)
+EXECUTIONS = get_metrics().counter(
+    "bylexa_command_executions_total", "Commands executed, by action and outcome", ("action", "outcome")
+)
+
 class AIOrchestrator:
     """
     Core orchestration layer for Bylexa's AI system.
@@ -23,100 +37,383 @@ class AIOrchestrator:
     handling ambiguity and parameter collection through dialog.
     """
     
-    def __init__(self):
-        """Initialize the AI orchestrator with necessary components."""
-        self.parser = IntentParser()
-        self.dialog_manager = DialogManager()
-        self.command_queue = queue.Queue()
-        self.response_queue = queue.Queue()
-        self._executing = False
-        self._execution_thread = None
-        
-        # Start the execution thread
-        self._start_execution_thread()
-    
-    def _start_execution_thread(self):
-        """Start a separate thread for command execution."""
-        if self._execution_thread is None or not self._execution_thread.is_alive():
-            self._executing = True
-            self._execution_thread = threading.Thread(
-                target=self._execution_loop, 
-                daemon=True
+    def __init__(self, parser_options: Optional[Dict[str, Any]] = None,
+                 pool_options: Optional[Dict[str, Any]] = None,
+                 dialog_options: Optional[Dict[str, Any]] = None,
+                 executor_options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the AI orchestrator with necessary components.
+        
+        Args:
+            parser_options: Optional keyword arguments for the IntentParser,
+                e.g. {"pipeline_profile": "fast"}
+            pool_options: Optional keyword arguments for a ParserPool, e.g.
+                {"size": 2}; when given, process_text_async parses in worker
+                processes instead of a thread of this process
+            dialog_options: Optional keyword arguments for the DialogManager,
+                e.g. {"max_sessions": 100, "session_ttl": 600}
+            executor_options: Optional keyword arguments for the
+                CommandExecutor, e.g. {"lane_sizes": {"default": 8}}
+        """
+        self.parser = IntentParser(**(parser_options or {}))
+        self.parser_pool = None
+        if pool_options is not None:
+            self.parser_pool = ParserPool(
+                parser_options=parser_options,
+                registry=self.parser.command_registry,
+                **pool_options
             )
-            self._execution_thread.start()
-            logger.info("Command execution thread started")
+        # Parameter answers are read with the parser's extraction tables
+        self.dialog_manager = DialogManager(
+            parameter_extractor=self.parser.param_extractor,
+            **(dialog_options or {})
+        )
+        # Commands run in per-resource lanes of worker threads
+        self.executor = CommandExecutor(self._execute, **(executor_options or {}))
+        # Results in completion order for get_execution_result(); the oldest
+        # are dropped when nobody reads them
+        self.response_queue = queue.Queue(maxsize=256)
+        # Futures of queued and running commands, and of recently finished ones
+        self._futures: Dict[str, Future] = {}
+        self._finished: "OrderedDict[str, Future]" = OrderedDict()
+        self._futures_lock = threading.Lock()
+        self.max_finished = 256
+        
+        # Sampled only when metrics are collected
+        metrics = get_metrics()
+        metrics.gauge("bylexa_command_queue_depth", "Commands waiting per executor lane", ("lane",),
+                      callback=lambda: {lane: s["queued"] for lane, s in self.executor.stats().items()})
+        metrics.gauge("bylexa_commands_running", "Commands executing per executor lane", ("lane",),
+                      callback=lambda: {lane: s["running"] for lane, s in self.executor.stats().items()})
+        metrics.gauge("bylexa_dialog_sessions", "Open dialog sessions",
+                      callback=lambda: self.dialog_manager.session_stats()["sessions"])
+    
+    def _execute(self, command: Dict[str, Any]) -> Any:
+        """Execute one command in an executor lane."""
+        action = command.get("action", "none")
+        try:
+            logger.info("Executing command: %s", command)
+            result = perform_action(command)
+            EXECUTIONS.inc(action, "ok")
+            return result
+        except Exception as e:
+            logger.error(f"Error in command execution: {str(e)}")
+            EXECUTIONS.inc(action, "error")
+            return f"Error executing command: {str(e)}"
+    
+    def submit_command(self, command: Dict[str, Any], priority: str = PRIORITY_INTERACTIVE,
+                       deadline: Optional[float] = None) -> Tuple[str, Future]:
+        """
+        Queue a command for execution.
+        
+        Args:
+            command: Command dictionary
+            priority: Command priority, see command_executor.PRIORITIES
+            deadline: Maximum seconds the command may wait to start
+            
+        Returns:
+            Tuple of (command ID, future resolving to the command's result)
+            
+        Raises:
+            LaneFullError: If the command's lane has too many queued commands
+            ValueError: If the priority is unknown
+        """
+        command_id = uuid.uuid4().hex
+        future = self.executor.submit(command, priority, deadline)
+        with self._futures_lock:
+            self._futures[command_id] = future
+        future.add_done_callback(functools.partial(self._finish_command, command_id))
+        return command_id, future
     
-    def _execution_loop(self):
-        """Background loop to execute commands from the queue."""
-        while self._executing:
+    def _finish_command(self, command_id: str, future: Future):
+        """Keep a finished command's future for lookups and publish its result."""
+        with self._futures_lock:
+            self._futures.pop(command_id, None)
+            self._finished[command_id] = future
+            while len(self._finished) > self.max_finished:
+                self._finished.popitem(last=False)
+        if future.cancelled():
+            return
+        result = future.result()
+        
+        # Keep get_execution_result() working without letting unread
+        # results pile up
+        while True:
             try:
-                # Get a command from the queue with a timeout
-                command = self.command_queue.get(timeout=0.5)
-                
-                # Execute the command
-                logger.info(f"Executing command: {command}")
-                result = perform_action(command)
-                
-                # Put the result in the response queue
-                self.response_queue.put(result)
-                
-                # Mark task as done
-                self.command_queue.task_done()
-                
-            except queue.Empty:
-                # No commands in the queue, continue waiting
-                pass
-            except Exception as e:
-                logger.error(f"Error in command execution: {str(e)}")
-                # Put error in response queue
-                self.response_queue.put(f"Error executing command: {str(e)}")
-                # Mark task as done if there was a command
-                if not self.command_queue.empty():
-                    self.command_queue.task_done()
+                self.response_queue.put_nowait(result)
+                break
+            except queue.Full:
+                try:
+                    self.response_queue.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def get_command_future(self, command_id: str) -> Optional[Future]:
+        """
+        Get the future of a queued, running or recently finished command.
+        
+        Args:
+            command_id: ID from the response of process_text or submit_command
+            
+        Returns:
+            The command's future, or None if the ID is unknown or too old
+        """
+        with self._futures_lock:
+            return self._futures.get(command_id) or self._finished.get(command_id)
+    
+    def wait_for_result(self, command_id: str, timeout: Optional[float] = None) -> Any:
+        """
+        Block until a command has executed.
+        
+        Args:
+            command_id: ID from the response of process_text or submit_command
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            The command's result
+            
+        Raises:
+            KeyError: If the command ID is unknown
+            concurrent.futures.TimeoutError: If the command didn't finish in time
+        """
+        future = self.get_command_future(command_id)
+        if future is None:
+            raise KeyError(f"Unknown command ID: {command_id}")
+        return future.result(timeout)
+    
+    async def result_async(self, command_id: str) -> Any:
+        """
+        Wait for a command's result without blocking the event loop.
+        
+        Args:
+            command_id: ID from the response of process_text or submit_command
+            
+        Returns:
+            The command's result
+            
+        Raises:
+            KeyError: If the command ID is unknown
+        """
+        future = self.get_command_future(command_id)
+        if future is None:
+            raise KeyError(f"Unknown command ID: {command_id}")
+        return await asyncio.wrap_future(future)
+    
+    async def execute_text_async(self, text: str, session_id: str = DEFAULT_SESSION,
+                                 priority: str = PRIORITY_INTERACTIVE,
+                                 deadline: Optional[float] = None) -> Dict:
+        """
+        Process text input and wait until its command, if any, has executed.
+        
+        Args:
+            text: The text input to process
+            session_id: Conversation the input belongs to, e.g. a connection ID
+            priority: Priority of the resulting command
+            deadline: Maximum seconds the resulting command may wait to start
+            
+        Returns:
+            Response dictionary as from process_text_async, with the
+            command's result under 'execution_result' once executed
+            
+        Raises:
+            PoolSaturatedError: If the parser pool is saturated
+        """
+        response = await self.process_text_async(text, session_id, priority, deadline)
+        if "command_id" in response:
+            response["execution_result"] = await self.result_async(response["command_id"])
+        return response
+    
+    def stop_execution(self):
+        """Stop executing commands once the commands already queued have run."""
+        self.executor.shutdown(wait=True)
     
     def stop(self):
-        """Stop the execution thread."""
-        self._executing = False
-        if self._execution_thread and self._execution_thread.is_alive():
-            self._execution_thread.join(timeout=5.0)
-            logger.info("Command execution thread stopped")
+        """Stop the command executor and the parser pool, and flush dialog history."""
+        self.stop_execution()
+        if self.parser_pool is not None:
+            self.parser_pool.shutdown(wait=False)
+        self.dialog_manager.close()
     
-    def process_text(self, text: str) -> Dict:
+    def process_text(self, text: str, session_id: str = DEFAULT_SESSION,
+                     priority: str = PRIORITY_INTERACTIVE, deadline: Optional[float] = None) -> Dict:
         """
         Process text input and determine the appropriate action.
         
         Args:
             text: The text input to process
+            session_id: Conversation the input belongs to, e.g. a connection ID
+            priority: Priority of the resulting command
+            deadline: Maximum seconds the resulting command may wait to start
+            
+        Returns:
+            Dictionary with response information
+        """
+        with get_tracer().trace("process_text", session=session_id):
+            # Step 1: Parse the text to identify intent and extract parameters
+            with span("parse"):
+                parser_result = self.parser.parse_command(text)
+            logger.info("Parser result: %s", parser_result)
+            
+            return self._handle_parser_result(text, parser_result, session_id, priority, deadline)
+    
+    async def process_text_async(self, text: str, session_id: str = DEFAULT_SESSION,
+                                 priority: str = PRIORITY_INTERACTIVE,
+                                 deadline: Optional[float] = None) -> Dict:
+        """
+        Process text input without blocking the event loop.
+        
+        Cached, structured and fast-path commands are answered inline; the
+        spaCy parse runs in the parser pool when one is configured, and in
+        a worker thread otherwise.
+        
+        Args:
+            text: The text input to process
+            session_id: Conversation the input belongs to, e.g. a connection ID
+            priority: Priority of the resulting command
+            deadline: Maximum seconds the resulting command may wait to start
             
         Returns:
             Dictionary with response information
+            
+        Raises:
+            PoolSaturatedError: If the parser pool is saturated
+        """
+        with get_tracer().trace("process_text", session=session_id):
+            with span("parse", pool=self.parser_pool is not None):
+                if self.parser_pool is None:
+                    loop = asyncio.get_running_loop()
+                    parser_result = await loop.run_in_executor(None, self.parser.parse_command, text)
+                else:
+                    parser_result = await self._parse_in_pool(text)
+            logger.info("Parser result: %s", parser_result)
+            
+            return self._handle_parser_result(text, parser_result, session_id, priority, deadline)
+    
+    async def process_texts_async(self, texts: List[str], batch_size: int = 64,
+                                  session_id: str = DEFAULT_SESSION,
+                                  priority: str = PRIORITY_INTERACTIVE,
+                                  deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Process several text inputs without blocking the event loop.
+        
+        Without a parser pool the texts are parsed as one batch in a worker
+        thread; with a pool they are spread over the worker processes.
+        
+        Args:
+            texts: The text inputs to process
+            batch_size: Number of texts parsed per spaCy batch
+            session_id: Conversation the inputs belong to
+            priority: Priority of the resulting commands
+            deadline: Maximum seconds each resulting command may wait to start
+            
+        Returns:
+            List of response dictionaries, in the same order as ``texts``
+            
+        Raises:
+            PoolSaturatedError: If the parser pool is saturated
+        """
+        with get_tracer().trace("process_texts", session=session_id, count=len(texts)):
+            with span("parse", pool=self.parser_pool is not None, count=len(texts)):
+                if self.parser_pool is None:
+                    loop = asyncio.get_running_loop()
+                    parser_results = await loop.run_in_executor(
+                        None, functools.partial(self.parser.parse_commands, texts, batch_size=batch_size)
+                    )
+                else:
+                    parser_results = await asyncio.gather(*(self._parse_in_pool(text) for text in texts))
+            
+            return [
+                self._handle_parser_result(text, parser_result, session_id, priority, deadline)
+                for text, parser_result in zip(texts, parser_results)
+            ]
+    
+    async def _parse_in_pool(self, text: str) -> Dict:
+        """Parse a text, sending it to the parser pool only if it needs spaCy."""
+        parser_result, version = self.parser.parse_quick(text)
+        if parser_result is None:
+            parser_result, elapsed_ms = await self.parser_pool.parse(text)
+            self.parser.record_nlp_result(text, version, parser_result, elapsed_ms)
+        return parser_result
+    
+    def process_texts(self, texts: List[str], batch_size: int = 64,
+                      session_id: str = DEFAULT_SESSION, priority: str = PRIORITY_INTERACTIVE,
+                      deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Process several text inputs, parsing them as one batch.
+        
+        Parsing is batched through ``IntentParser.parse_commands``; the
+        dialog and execution steps still run once per text, in order.
+        
+        Args:
+            texts: The text inputs to process
+            batch_size: Number of texts parsed per spaCy batch
+            session_id: Conversation the inputs belong to
+            priority: Priority of the resulting commands
+            deadline: Maximum seconds each resulting command may wait to start
+            
+        Returns:
+            List of response dictionaries, in the same order as ``texts``
         """
-        # Step 1: Parse the text to identify intent and extract parameters
-        parser_result = self.parser.parse_command(text)
-        logger.info(f"Parser result: {parser_result}")
+        with get_tracer().trace("process_texts", session=session_id, count=len(texts)):
+            with span("parse", count=len(texts)):
+                parser_results = self.parser.parse_commands(texts, batch_size=batch_size)
+            
+            return [
+                self._handle_parser_result(text, parser_result, session_id, priority, deadline)
+                for text, parser_result in zip(texts, parser_results)
+            ]
+    
+    def _handle_parser_result(self, text: str, parser_result: Dict,
+                              session_id: str = DEFAULT_SESSION,
+                              priority: str = PRIORITY_INTERACTIVE,
+                              deadline: Optional[float] = None) -> Dict:
+        """
+        Run a parser result through the dialog manager and queue execution.
         
+        Args:
+            text: The text input that was parsed
+            parser_result: Result of parsing ``text``
+            session_id: Conversation the input belongs to
+            priority: Priority of the resulting command
+            deadline: Maximum seconds the resulting command may wait to start
+            
+        Returns:
+            Dictionary with response information
+        """
         # Step 2: Use dialog manager to handle the parser result
-        dialog_result = self.dialog_manager.handle_response(text, parser_result)
-        logger.info(f"Dialog result: {dialog_result}")
+        with span("dialog"):
+            dialog_result = self.dialog_manager.handle_response(text, parser_result, session_id)
+        logger.info("Dialog result: %s", dialog_result)
         
         # Step 3: Execute command if dialog indicates we should
         if dialog_result.get("should_execute", False) and "command" in dialog_result:
-            # Add command to execution queue
-            self.command_queue.put(dialog_result["command"])
-            
-            # Return response with execution status
-            return {
-                "status": "executing",
-                "message": dialog_result.get("message", "Executing command..."),
-                "command": dialog_result["command"]
+            # Add command to execution queue; its result can be awaited by ID
+            try:
+                command_id, _ = self.submit_command(dialog_result["command"], priority, deadline)
+                
+                # Return response with execution status
+                response = {
+                    "status": "executing",
+                    "message": dialog_result.get("message", "Executing command..."),
+                    "command": dialog_result["command"],
+                    "command_id": command_id
+                }
+            except LaneFullError as e:
+                response = {
+                    "status": "error",
+                    "message": f"Too busy to run this command now: {str(e)}",
+                    "command": dialog_result["command"]
+                }
+        else:
+            # Return dialog response if not executing
+            response = {
+                "status": dialog_result.get("status", "unknown"),
+                "message": dialog_result.get("message", "Unknown command"),
+                "command": dialog_result.get("command", None)
             }
         
-        # Return dialog response if not executing
-        return {
-            "status": dialog_result.get("status", "unknown"),
-            "message": dialog_result.get("message", "Unknown command"),
-            "command": dialog_result.get("command", None)
-        }
+        COMMANDS.inc((response["command"] or {}).get("action", "none"), response["status"])
+        return response
     
     def execute_voice_command(self, text: str) -> Dict:
         """
@@ -131,6 +428,52 @@ class AIOrchestrator:
         # For now, voice commands go through the same flow as text
         return self.process_text(text)
     
+    def start_voice_session(self, on_commit=None) -> StreamingParseSession:
+        """
+        Start incremental parsing of a voice command that is still being spoken.
+        
+        Feed the recognizer's partial transcripts to the returned session and
+        pass it to ``finish_voice_session`` at end of speech.
+        
+        Args:
+            on_commit: Optional callback receiving the parse result as soon as
+                the partial transcript resolves to a complete command
+            
+        Returns:
+            A new streaming parse session
+        """
+        return StreamingParseSession(self.parser, on_commit=on_commit)
+    
+    def finish_voice_session(self, session: StreamingParseSession,
+                             transcript: Optional[str] = None,
+                             session_id: str = DEFAULT_SESSION) -> Dict:
+        """
+        Complete a voice session and process its command.
+        
+        Args:
+            session: Session returned by ``start_voice_session``
+            transcript: Final transcript, if the recognizer revised it
+            session_id: Conversation the command belongs to
+            
+        Returns:
+            Dictionary with response information
+        """
+        with get_tracer().trace("voice", session=session_id):
+            with span("parse", streaming=True):
+                text, parser_result = session.finish(transcript)
+            logger.info("Parser result: %s", parser_result)
+            
+            return self._handle_parser_result(text, parser_result, session_id)
+    
+    def end_session(self, session_id: str):
+        """
+        Discard the dialog state of a conversation, e.g. when its client disconnects.
+        
+        Args:
+            session_id: Conversation ID
+        """
+        self.dialog_manager.end_session(session_id)
+    
     def get_execution_result(self, timeout: float = 0.1) -> Optional[str]:
         """
         Check if there are any execution results available.
@@ -147,18 +490,14 @@ class AIOrchestrator:
             return None
     
     def has_pending_commands(self) -> bool:
-        """Check if there are any commands pending execution."""
-        return not self.command_queue.empty()
+        """Check if there are any commands queued or executing."""
+        with self._futures_lock:
+            return bool(self._futures)
     
     def clear_queues(self):
         """Clear both command and response queues."""
-        # Clear command queue
-        while not self.command_queue.empty():
-            try:
-                self.command_queue.get_nowait()
-                self.command_queue.task_done()
-            except queue.Empty:
-                break
+        # Cancel the commands that haven't started yet
+        self.executor.clear()
         
         # Clear response queue
         while not self.response_queue.empty():
@@ -180,6 +519,24 @@ def get_orchestrator() -> AIOrchestrator:
         _orchestrator_instance = AIOrchestrator()
     return _orchestrator_instance
 
-def init_orchestrator() -> AIOrchestrator:
-    """Initialize and get the global orchestrator instance."""
-    return get_orchestrator()
\ No newline at end of file
+def init_orchestrator(parser_options: Optional[Dict[str, Any]] = None,
+                      pool_options: Optional[Dict[str, Any]] = None,
+                      dialog_options: Optional[Dict[str, Any]] = None,
+                      executor_options: Optional[Dict[str, Any]] = None) -> AIOrchestrator:
+    """
+    Initialize and get the global orchestrator instance.
+    
+    Args:
+        parser_options: Optional keyword arguments for the IntentParser,
+            used only when the instance is created by this call
+        pool_options: Optional keyword arguments for the ParserPool, used
+            only when the instance is created by this call
+        dialog_options: Optional keyword arguments for the DialogManager,
+            used only when the instance is created by this call
+        executor_options: Optional keyword arguments for the CommandExecutor,
+            used only when the instance is created by this call
+    """
+    global _orchestrator_instance
+    if _orchestrator_instance is None:
+        _orchestrator_instance = AIOrchestrator(parser_options, pool_options, dialog_options, executor_options)
+    return _orchestrator_instance
\ No newline at end of file
@@ -10,9 +10,6 @@ import time
 import base64
 from typing import Dict, List, Any, Optional, Callable, Set, Union
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BylexaClient:
@@ -8,16 +8,17 @@ import argparse
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Import Bylexa components
 from .ai_orchestrator import init_orchestrator, get_orchestrator
-from .intent_parser import IntentParser
+from .intent_parser import IntentParser, DEFAULT_PIPELINE_PROFILE
 from .dialog_manager import DialogManager
+from .dialog_store import DEFAULT_STORE_PATH
 from .websocket_gateway import start_ws_server, stop_ws_server
+from .tracing import init_tracer, get_tracer
+from .metrics import MetricsServer, get_metrics
+from .logging_setup import setup_logging_from_config
 from .script_manager import init_script_manager
 from .community_registry import get_registry
 from .config import load_app_configs, load_token
@@ -35,6 +36,7 @@ class BylexaOrchestrator:
         self.ws_task = None
         self.components_initialized = False
         self.plugins_dir = None
+        self.metrics_server = None
     
     def initialize_components(self):
         """Initialize all Bylexa components."""
@@ -52,10 +54,52 @@ class BylexaOrchestrator:
         registry = get_registry()
         logger.info("Community registry initialized")
         
-        # Initialize AI orchestrator
-        orchestrator = init_orchestrator()
+        # Trace commands into a ring buffer, and to a JSONL file if configured
+        init_tracer(
+            capacity=int(self.config.get('trace_buffer_size', 1000)),
+            export_path=self.config.get('trace_export_path'),
+            enabled=bool(self.config.get('tracing', True))
+        )
+        
+        # Initialize AI orchestrator; parser_workers > 0 moves the spaCy
+        # parse into that many worker processes
+        pool_options = None
+        parser_workers = int(self.config.get('parser_workers', 0))
+        if parser_workers > 0:
+            pool_options = {
+                'size': parser_workers,
+                'max_pending': self.config.get('parser_max_pending'),
+                'queue_timeout': float(self.config.get('parser_queue_timeout', 1.0))
+            }
+        orchestrator = init_orchestrator({
+            'pipeline_profile': self.config.get('nlp_pipeline_profile', DEFAULT_PIPELINE_PROFILE),
+            'cache_size': int(self.config.get('parse_cache_size', 512)),
+            'cache_ttl': self.config.get('parse_cache_ttl', 300.0),
+            'semantic_matching': bool(self.config.get('semantic_matching', False)),
+            'semantic_model': self.config.get('semantic_model')
+        }, pool_options, {
+            'max_sessions': int(self.config.get('dialog_max_sessions', 1000)),
+            'session_ttl': self.config.get('dialog_session_ttl', 1800.0),
+            'history_size': int(self.config.get('dialog_history_size', 20)),
+            'history_text_limit': self.config.get('dialog_history_text_limit', 500),
+            'history_log_path': self.config.get('dialog_history_log'),
+            # Set to an empty value to keep dialogs in memory only
+            'store_path': self.config.get('dialog_store', str(DEFAULT_STORE_PATH)) or None
+        }, {
+            # Workers per lane, e.g. {"default": 4, "media": 1}
+            'lane_sizes': dict(self.config.get('executor_lanes', {}),
+                               default=int(self.config.get('executor_workers', 4))),
+            'max_queue': self.config.get('executor_max_queue'),
+            # Seconds a command may wait per priority, e.g. {"normal": 10}
+            'deadlines': self.config.get('executor_deadlines')
+        })
         logger.info("AI orchestrator initialized")
         
+        # Load the NLP models in the background while the rest starts up;
+        # with a parser pool the workers load their own copy instead
+        if orchestrator.parser_pool is None:
+            orchestrator.parser.warm_up(background=True)
+        
         # Load plugins
         self.plugins_dir = Path(self.config.get('plugins_directory', 'plugins'))
         plugins_dir = Path(self.config.get('plugins_directory', 'plugins'))
@@ -67,6 +111,10 @@ class BylexaOrchestrator:
         self.plugin_manager.load_all_plugins()
         logger.info(f"Loaded {len(self.plugin_manager.plugins)} plugins")
         logger.info(f"Plugins directory: {self.plugins_dir}")
+        
+        # Start parser workers once plugin commands are registered
+        if orchestrator.parser_pool is not None:
+            orchestrator.parser_pool.start()
 
         
         self.components_initialized = True
@@ -81,6 +129,13 @@ class BylexaOrchestrator:
         # Initialize components
         self.initialize_components()
         
+        # Resume dialogs that were waiting for an answer before the last
+        # shutdown; plugin flows are registered by now
+        try:
+            get_orchestrator().dialog_manager.restore()
+        except Exception as e:
+            logger.error(f"Error restoring dialog sessions: {str(e)}")
+        
         # Set running flag
         self.running = True
         
@@ -88,9 +143,31 @@ class BylexaOrchestrator:
         ws_host = self.config.get('ws_host', 'localhost')
         ws_port = int(self.config.get('ws_port', 8765))
         
+        # Serve metrics over HTTP if a port is configured; they are also
+        # available through the gateway's 'metrics' query
+        metrics_port = self.config.get('metrics_port')
+        if metrics_port:
+            try:
+                self.metrics_server = MetricsServer(get_metrics(), self.config.get('metrics_host', 'localhost'),
+                                                    int(metrics_port))
+                self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Failed to start metrics server: {str(e)}")
+                self.metrics_server = None
+        
+        # Clients slower than this are disconnected; 0 waits for them
+        send_timeout = self.config.get('ws_send_timeout', 5.0)
+        max_send_buffer = self.config.get('ws_max_send_buffer', 1 << 20)
+        
         logger.info(f"Starting WebSocket server on {ws_host}:{ws_port}")
         try:
-            self.ws_task = asyncio.create_task(start_ws_server(ws_host, ws_port))
+            self.ws_task = asyncio.create_task(start_ws_server(
+                ws_host, ws_port,
+                inbox_size=int(self.config.get('ws_inbox_size', 64)),
+                max_concurrent_handlers=int(self.config.get('ws_max_concurrent_handlers', 64)),
+                send_timeout=float(send_timeout) if send_timeout else None,
+                max_send_buffer=int(max_send_buffer) if max_send_buffer else None
+            ))
             logger.info("WebSocket server started")
         except Exception as e:
             logger.error(f"Failed to start WebSocket server: {str(e)}")
@@ -127,6 +204,14 @@ class BylexaOrchestrator:
         except Exception as e:
             logger.error(f"Error stopping AI orchestrator: {str(e)}")
         
+        # Stop serving metrics
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        
+        # Flush exported traces
+        get_tracer().close()
+        
         # Set running flag
         self.running = False
         logger.info("Bylexa system stopped")
@@ -151,11 +236,9 @@ class BylexaOrchestrator:
         # Process the command
         result = orchestrator.process_text(command)
         
-        # Wait for execution to complete
-        while orchestrator.has_pending_commands():
-            execution_result = orchestrator.get_execution_result(timeout=0.5)
-            if execution_result:
-                result['execution_result'] = execution_result
+        # Wait for this command's own execution result
+        if 'command_id' in result:
+            result['execution_result'] = orchestrator.wait_for_result(result['command_id'])
         
         return result
 
@@ -209,6 +292,8 @@ async def main_async():
 
 def main():
     """Main entry point for the command line."""
+    setup_logging_from_config(load_app_configs())
+    
     # Run the async main
     asyncio.run(main_async())
 
@@ -0,0 +1,428 @@
+import time
+import heapq
+import queue
+import bisect
+import logging
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from .tracing import current_trace, use_trace
+
+logger = logging.getLogger(__name__)
+
+# Lane of commands that don't share a resource with other commands
+DEFAULT_LANE = "default"
+
+# Lane per command action; commands in one lane never run more
+# concurrently than the lane has workers
+LANES: Dict[str, str] = {
+    "media": "media",
+    "clipboard": "clipboard",
+}
+
+# Workers per lane; lanes not listed here get one worker (serialized)
+DEFAULT_LANE_SIZES: Dict[str, int] = {
+    DEFAULT_LANE: 4,
+    "media": 1,
+    "clipboard": 1,
+}
+
+# Command priorities, most urgent first: commands a user is waiting for,
+# remote commands, and scheduled or bulk work
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES: Dict[str, int] = {
+    PRIORITY_INTERACTIVE: 0,
+    PRIORITY_NORMAL: 1,
+    PRIORITY_BACKGROUND: 2,
+}
+
+# Seconds a command may wait in its lane before it is dropped, per priority;
+# None waits indefinitely
+DEFAULT_DEADLINES: Dict[str, Optional[float]] = {
+    PRIORITY_INTERACTIVE: 15.0,
+    PRIORITY_NORMAL: 30.0,
+    PRIORITY_BACKGROUND: None,
+}
+
+# Tighter deadlines for actions that are pointless when late
+# (a 'pause' 20 seconds late is worse than none)
+ACTION_DEADLINES: Dict[str, float] = {
+    "media": 5.0,
+}
+
+# Upper bounds (ms) of the queue wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Queued to make a lane worker exit; ranks after every command
+_STOP = object()
+_STOP_RANK = len(PRIORITIES)
+
+
+class LaneFullError(RuntimeError):
+    """Raised when a command's lane already has the maximum number of queued commands."""
+
+
+def register_lane(action: str, lane: str):
+    """
+    Route a command action to a lane.
+
+    Commands that use the same resource (a device, a window, a file)
+    should share a lane with size 1 so they run one at a time.
+
+    Args:
+        action: Command action, e.g. "myplugin.print"
+        lane: Lane name
+    """
+    LANES[action] = lane
+
+
+def register_deadline(action: str, seconds: float):
+    """
+    Limit how long commands of an action may wait before they are dropped.
+
+    Args:
+        action: Command action
+        seconds: Maximum queue wait
+    """
+    ACTION_DEADLINES[action] = seconds
+
+
+class _Entry:
+    """A queued command."""
+    __slots__ = ("future", "command", "priority", "enqueued", "deadline", "trace")
+
+    def __init__(self, future: Future, command: Dict[str, Any], priority: str,
+                 enqueued: float, deadline: Optional[float], trace=None):
+        self.future = future
+        self.command = command
+        self.priority = priority
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.trace = trace
+
+
+class CommandQueue:
+    """
+    Blocking priority queue of commands.
+
+    Entries are ordered by priority rank and then by arrival, so commands
+    of the same priority stay first-in, first-out.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, Any]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, item: Any, rank: int):
+        """Add an item with a priority rank (lower runs first)."""
+        with self._cond:
+            heapq.heappush(self._heap, (rank, next(self._seq), item))
+            self._cond.notify()
+
+    def get(self) -> Any:
+        """Remove and return the most urgent item, waiting for one if needed."""
+        with self._cond:
+            while not self._heap:
+                self._cond.wait()
+            return heapq.heappop(self._heap)[2]
+
+    def get_nowait(self) -> Any:
+        """
+        Remove and return the most urgent item.
+
+        Raises:
+            queue.Empty: If the queue is empty
+        """
+        with self._cond:
+            if not self._heap:
+                raise queue.Empty
+            return heapq.heappop(self._heap)[2]
+
+    def qsize(self) -> int:
+        """Number of queued items."""
+        with self._cond:
+            return len(self._heap)
+
+
+class WaitHistogram:
+    """Histogram of queue wait times."""
+
+    def __init__(self, bounds_ms: Tuple[float, ...] = WAIT_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        # One count per bound, plus one for waits above the last bound
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, wait_ms: float):
+        """Record one wait."""
+        self.counts[bisect.bisect_left(self.bounds_ms, wait_ms)] += 1
+        self.count += 1
+        self.sum_ms += wait_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the bucket counts ("le" bound in ms -> count), count and sum."""
+        buckets = {str(bound): count for bound, count in zip(self.bounds_ms, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"buckets": buckets, "count": self.count, "sum_ms": self.sum_ms}
+
+
+class _Lane:
+    """Queue and worker threads of one lane."""
+
+    def __init__(self, name: str, size: int, max_queue: Optional[int]):
+        self.name = name
+        self.size = size
+        self.max_queue = max_queue
+        self.queue = CommandQueue()
+        self.threads: List[threading.Thread] = []
+        self.running = 0
+        self.max_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+
+
+class CommandExecutor:
+    """
+    Pool that executes commands in per-resource lanes.
+
+    Each command runs in the lane of its action: commands of the same lane
+    queue behind each other up to the lane's worker count, while commands
+    of different lanes run in parallel. A slow 'run' command therefore no
+    longer delays a 'media pause'. Worker threads are started on a lane's
+    first command.
+
+    Within a lane, interactive commands run before remote ones and those
+    before background work. A command that waited past its deadline is
+    not executed; its future resolves to an explanation instead.
+    """
+
+    def __init__(self, execute: Callable[[Dict[str, Any]], Any],
+                 lane_sizes: Optional[Dict[str, int]] = None,
+                 max_queue: Optional[int] = None,
+                 deadlines: Optional[Dict[str, Optional[float]]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            execute: Function that executes a command and returns its result
+            lane_sizes: Workers per lane, merged over DEFAULT_LANE_SIZES
+            max_queue: Maximum commands waiting per lane, or None for no limit
+            deadlines: Maximum queue wait in seconds per priority, merged
+                over DEFAULT_DEADLINES
+        """
+        self.execute = execute
+        self.lane_sizes = dict(DEFAULT_LANE_SIZES, **(lane_sizes or {}))
+        self.max_queue = max_queue
+        self.deadlines = dict(DEFAULT_DEADLINES, **(deadlines or {}))
+        self._lanes: Dict[str, _Lane] = {}
+        self._wait_times = {priority: WaitHistogram() for priority in PRIORITIES}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def lane_for(self, command: Dict[str, Any]) -> str:
+        """Get the name of the lane a command runs in."""
+        return LANES.get(command.get("action"), DEFAULT_LANE)
+
+    def _get_lane(self, name: str) -> _Lane:
+        """Get a lane, creating it and starting its workers if needed (lock held)."""
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = _Lane(name, max(1, int(self.lane_sizes.get(name, 1))), self.max_queue)
+            for i in range(lane.size):
+                thread = threading.Thread(
+                    target=self._worker, args=(lane,), name=f"bylexa-{name}-{i}", daemon=True
+                )
+                thread.start()
+                lane.threads.append(thread)
+            self._lanes[name] = lane
+            logger.info(f"Command lane '{name}' started with {lane.size} workers")
+        return lane
+
+    def _deadline(self, command: Dict[str, Any], priority: str,
+                  timeout: Optional[float], now: float) -> Optional[float]:
+        """Absolute deadline of a command: the tightest applicable limit."""
+        limits = [
+            limit for limit in (timeout, self.deadlines.get(priority), ACTION_DEADLINES.get(command.get("action")))
+            if limit is not None
+        ]
+        return now + min(limits) if limits else None
+
+    def submit(self, command: Dict[str, Any], priority: str = PRIORITY_NORMAL,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue a command in its lane.
+
+        Args:
+            command: Command dictionary
+            priority: One of PRIORITIES
+            timeout: Maximum seconds the command may wait before it is
+                dropped; the priority's and action's deadlines still apply
+
+        Returns:
+            Future resolving to the command's result
+
+        Raises:
+            ValueError: If the priority is unknown
+            LaneFullError: If the lane's queue is full
+            RuntimeError: If the executor has been shut down
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown command priority: {priority}")
+
+        now = time.monotonic()
+        entry = _Entry(Future(), command, priority, now, self._deadline(command, priority, timeout, now),
+                       current_trace())
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Command executor is shut down")
+            lane = self._get_lane(self.lane_for(command))
+            depth = lane.queue.qsize()
+            if lane.max_queue is not None and depth >= lane.max_queue:
+                lane.rejected += 1
+                raise LaneFullError(f"Too many queued commands in the '{lane.name}' lane ({depth})")
+            lane.queue.put(entry, PRIORITIES[priority])
+            lane.submitted += 1
+            lane.max_depth = max(lane.max_depth, depth + 1)
+
+        # The caller's trace stays open until the command is done
+        if entry.trace is not None:
+            entry.trace.hold()
+            entry.future.add_done_callback(lambda _: entry.trace.release())
+        return entry.future
+
+    def _worker(self, lane: _Lane):
+        """Run a lane's commands until the stop sentinel arrives."""
+        while True:
+            entry = lane.queue.get()
+            if entry is _STOP:
+                break
+
+            future = entry.future
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            now = time.monotonic()
+            waited = now - entry.enqueued
+            with self._lock:
+                self._wait_times[entry.priority].observe(waited * 1000)
+
+            expired = entry.deadline is not None and now > entry.deadline
+            if entry.trace is not None:
+                entry.trace.add_span("command_queue", entry.enqueued, now, lane=lane.name,
+                                     priority=entry.priority, expired=expired)
+
+            if expired:
+                with self._lock:
+                    lane.expired += 1
+                logger.warning(f"Dropped command that waited {waited:.1f}s past its deadline: {entry.command}")
+                future.set_result(
+                    f"Command not executed: it waited {waited:.1f}s in the queue, "
+                    f"longer than its deadline allows ({entry.command.get('action')})"
+                )
+                continue
+
+            with self._lock:
+                lane.running += 1
+            try:
+                with use_trace(entry.trace):
+                    result = self.execute(entry.command)
+            except Exception as e:
+                with self._lock:
+                    lane.running -= 1
+                    lane.failed += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    lane.running -= 1
+                    lane.completed += 1
+                future.set_result(result)
+
+    def clear(self) -> int:
+        """
+        Cancel all commands that haven't started yet.
+
+        Returns:
+            Number of commands cancelled
+        """
+        cancelled = 0
+        with self._lock:
+            for lane in self._lanes.values():
+                stops = 0
+                while True:
+                    try:
+                        item = lane.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stops += 1
+                    elif item.future.cancel():
+                        cancelled += 1
+                # Keep a pending shutdown
+                for _ in range(stops):
+                    lane.queue.put(_STOP, _STOP_RANK)
+        return cancelled
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-lane statistics.
+
+        Returns:
+            Dictionary mapping lane names to worker count, current queue depth,
+            running commands, the highest depth seen and completion counters
+        """
+        with self._lock:
+            return {
+                name: {
+                    "workers": lane.size,
+                    "queued": lane.queue.qsize(),
+                    "running": lane.running,
+                    "max_depth": lane.max_depth,
+                    "max_queue": lane.max_queue,
+                    "submitted": lane.submitted,
+                    "completed": lane.completed,
+                    "failed": lane.failed,
+                    "rejected": lane.rejected,
+                    "expired": lane.expired
+                }
+                for name, lane in self._lanes.items()
+            }
+
+    def wait_time_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get queue wait-time histograms.
+
+        Returns:
+            Dictionary mapping priorities to histogram snapshots
+        """
+        with self._lock:
+            return {priority: histogram.snapshot() for priority, histogram in self._wait_times.items()}
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0):
+        """
+        Stop the workers once the commands already queued have run.
+
+        Args:
+            wait: Wait for the workers to exit
+            timeout: Maximum seconds to wait per worker
+        """
+        with self._lock:
+            self._closed = True
+            lanes = list(self._lanes.values())
+            for lane in lanes:
+                for _ in lane.threads:
+                    lane.queue.put(_STOP, _STOP_RANK)
+
+        if wait:
+            for lane in lanes:
+                for thread in lane.threads:
+                    thread.join(timeout)
+        logger.info("Command executor stopped")
@@ -13,9 +13,20 @@ from .actions import (
 )
 import json
 import os
+import logging
 from difflib import get_close_matches
 from .script_manager import init_script_manager, get_script_manager
 from .plugins import plugin_manager
+from .tracing import span
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Exceptions raised by plugin action handlers
+PLUGIN_ERRORS = get_metrics().counter(
+    "bylexa_plugin_errors_total", "Exceptions raised by plugin action handlers", ("plugin",)
+)
+
 # Registry for command handlers
 COMMAND_HANDLERS: Dict[str, Callable] = {}
 
@@ -31,19 +42,22 @@ def perform_action(command: Dict[str, str]) -> str:
     action = command.get('action', '').lower()
     
     # First check if any plugin can handle this action
-    for plugin_id, plugin in plugin_manager.plugins.items():
-        if plugin['enabled'] and hasattr(plugin['module'], 'handle_action'):
-            try:
-                result = plugin['module'].handle_action(action, command)
-                if result is not None:
-                    return result
-            except Exception as e:
-                print(f"Error in plugin {plugin_id}: {e}")
+    with span("plugins", action=action):
+        for plugin_id, plugin in plugin_manager.plugins.items():
+            if plugin['enabled'] and hasattr(plugin['module'], 'handle_action'):
+                try:
+                    result = plugin['module'].handle_action(action, command)
+                    if result is not None:
+                        return result
+                except Exception as e:
+                    PLUGIN_ERRORS.inc(plugin_id)
+                    logger.error("Error in plugin %s: %s", plugin_id, e)
     
     # If no plugin handled it, use built-in handlers
     handler = COMMAND_HANDLERS.get(action)
     if handler:
-        return handler(command)
+        with span("handler", action=action):
+            return handler(command)
     else:
         return f"Action '{action}' is not supported."
 
@@ -64,7 +78,7 @@ def handle_custom_script_command(command: Dict[str, Any]) -> str:
     Handles script execution commands with automatic WebDriver session management.
     """
     try:
-        print("Received command:", command)
+        logger.debug("Received command: %s", command)
 
         # Ensure script manager is initialized
         ensure_script_manager()
@@ -83,16 +97,14 @@ def handle_custom_script_command(command: Dict[str, Any]) -> str:
             elif isinstance(arg, str):
                 flattened_args.append(arg)
             else:
-                print(f"Unhandled argument type: {type(arg)}")
+                logger.warning("Unhandled argument type: %s", type(arg))
                 continue
         
         # Include any parameters directly specified in the command
         if 'parameters' in command:
             parameters.update(command['parameters'])
 
-        print("Script name:", script_name)
-        print("Arguments:", flattened_args)
-        print("Parameters:", parameters)
+        logger.debug("Script name: %s, arguments: %s, parameters: %s", script_name, flattened_args, parameters)
 
         if not script_name:
             return "Error: 'script_name' not specified."
@@ -101,14 +113,12 @@ def handle_custom_script_command(command: Dict[str, Any]) -> str:
         script_manager = get_script_manager()
         
         # Load custom scripts from configuration
-        print("Loading custom scripts from configuration...")
         custom_scripts = get_custom_scripts()
-        print("Custom scripts loaded:", custom_scripts)
+        logger.debug("Custom scripts loaded: %s", custom_scripts)
 
         # Find the closest match for the requested script name
-        print("Finding closest match for script name:", script_name)
         closest_matches = get_close_matches(script_name.lower(), custom_scripts.keys(), n=1, cutoff=0.5)
-        print("Closest matches found:", closest_matches)
+        logger.debug("Closest matches for %s: %s", script_name, closest_matches)
 
         if not closest_matches:
             return f"Error: Script '{script_name}' not found."
@@ -118,15 +128,15 @@ def handle_custom_script_command(command: Dict[str, Any]) -> str:
         script_path = custom_scripts[best_match_script_name]
         
         # Run the script with the specified arguments and parameters
-        print("Running script:", script_path, "with arguments:", flattened_args, "and parameters:", parameters)
+        logger.info("Running script: %s with arguments: %s and parameters: %s", script_path, flattened_args, parameters)
         result = script_manager.perform_script(script_path, flattened_args, parameters)
-        print("Script result:", result)
+        logger.debug("Script result: %s", result)
         
         return result
 
     except Exception as e:
         error_msg = f"Error executing script command: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
 
 @register_command("run")
@@ -13,9 +13,6 @@ from datetime import datetime
 import shutil
 import importlib.util
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class CommunityRegistry:
@@ -0,0 +1,302 @@
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# States in which the dialog is not waiting for an answer
+TERMINAL_STATES = ("initial", "clear")
+
+# Name of the built-in flow
+DEFAULT_FLOW_NAME = "default"
+
+# Event returned by a handler to hand the conversation to another flow;
+# the values must contain the flow under "flow"
+ENTER_FLOW = "enter_flow"
+
+# A state handler inspects the turn, may update the context, and returns the
+# event that selects the transition plus the values for its prompt
+StateHandler = Callable[[Any, str, Dict[str, Any]], Tuple[str, Dict[str, Any]]]
+
+
+def prompt(template: str) -> Callable[..., str]:
+    """
+    Precompile a prompt template.
+
+    Args:
+        template: str.format template; unused keyword arguments are ignored
+
+    Returns:
+        Function rendering the template from keyword arguments
+    """
+    return template.format
+
+
+class Transition(NamedTuple):
+    """Where an event leads and what the user is told."""
+    target: str
+    status: str
+    prompt: Callable[..., str]
+    execute: bool = False
+
+
+class DialogFlow:
+    """
+    Declarative dialog state machine.
+
+    Each state has a handler and a table mapping the events its handler can
+    return to transitions. Evaluating a turn is one handler call plus two
+    dictionary lookups, and the table can be inspected with describe().
+    """
+
+    def __init__(self, name: str, handlers: Dict[str, StateHandler],
+                 transitions: Dict[str, Dict[str, Transition]], start: str = "initial",
+                 actions: Optional[List[str]] = None):
+        """
+        Initialize a flow.
+
+        Args:
+            name: Flow name, used in metrics
+            handlers: State name -> handler
+            transitions: State name -> event -> transition
+            start: State the conversation enters when the flow takes over
+            actions: Command actions whose dialog this flow handles
+        """
+        missing = [state for state in transitions if state not in handlers]
+        if missing:
+            raise ValueError(f"Flow '{name}' has transitions for states without handlers: {missing}")
+        if start not in handlers:
+            raise ValueError(f"Flow '{name}' starts in unknown state '{start}'")
+
+        self.name = name
+        self.handlers = handlers
+        self.transitions = transitions
+        self.start = start
+        self.actions = list(actions or [])
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Get the flow's structure.
+
+        Returns:
+            Dictionary with the start state and, per state, event -> target state
+        """
+        return {
+            "name": self.name,
+            "start": self.start,
+            "actions": self.actions,
+            "states": {
+                state: {event: t.target for event, t in self.transitions.get(state, {}).items()}
+                for state in self.handlers
+            }
+        }
+
+
+# Precompiled prompts of the default flow
+EXECUTE_PROMPT = prompt("Executing command: {action}")
+OPTIONS_PROMPT = prompt(
+    "I'm not sure which command you want to run. "
+    "Please choose one of the following options by number or name:\n{options}"
+)
+INVALID_CHOICE_PROMPT = prompt(
+    "I didn't understand your selection. "
+    "Please choose one of the following options by number or name:\n{options}"
+)
+PARAMETER_PROMPT = prompt("Please provide the {param} for the {action} command:")
+INVALID_VALUE_PROMPT = prompt("{error}. Please provide the {param} for the {action} command:")
+NO_OPTIONS_PROMPT = prompt("No options available. Please state your command again.")
+ERROR_PROMPT = prompt("{message}")
+OPTION_LINE = prompt("{index}. {description}")
+
+# Number of options offered when a command is ambiguous
+MAX_OPTIONS = 5
+
+
+def render_options(options: List[Dict[str, Any]]) -> str:
+    """Render the numbered option list of a clarification prompt."""
+    return "\n".join(
+        OPTION_LINE(index=i + 1, description=option.get("description", option["action"]))
+        for i, option in enumerate(options[:MAX_OPTIONS])
+    )
+
+
+# Flows registered by plugins, by the command action they handle
+FLOWS: Dict[str, DialogFlow] = {}
+
+
+def register_flow(flow: DialogFlow):
+    """
+    Register a flow for multi-turn dialogs of plugin commands.
+
+    Once a command with one of the flow's actions is recognized, the
+    conversation is handed to the flow until it reaches a terminal state.
+
+    Args:
+        flow: Flow to register
+    """
+    for action in flow.actions:
+        FLOWS[action] = flow
+
+
+def unregister_flow(flow: DialogFlow):
+    """
+    Remove a flow registered with register_flow().
+
+    Args:
+        flow: Flow to remove
+    """
+    for action in flow.actions:
+        if FLOWS.get(action) is flow:
+            del FLOWS[action]
+
+
+def get_flow(name: str) -> Optional[DialogFlow]:
+    """
+    Find a flow by name.
+
+    Args:
+        name: Flow name
+
+    Returns:
+        The default flow or a registered flow with that name, or None
+    """
+    if name == DEFAULT_FLOW_NAME:
+        return DEFAULT_FLOW
+    return next((flow for flow in FLOWS.values() if flow.name == name), None)
+
+
+def _on_initial(context, user_input: str, parser_result: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Start a dialog from a fresh parser result."""
+    context.reset()
+    status = parser_result.get("status")
+    command = parser_result.get("command")
+
+    if status in ("clear", "missing_params") and command and command.get("action") in FLOWS:
+        context.update(command=command, missing_params=list(parser_result.get("missing_params", [])))
+        return ENTER_FLOW, {"flow": FLOWS[command["action"]]}
+
+    if status == "clear":
+        context.command = command
+        return "execute", {"action": command["action"]}
+
+    if status == "ambiguous":
+        context.options = parser_result["options"]
+        return "choose", {"options": render_options(context.options)}
+
+    if status == "missing_params":
+        context.update(command=command, missing_params=list(parser_result["missing_params"]))
+        return "ask", {"param": context.missing_params[0], "action": command["action"]}
+
+    return "error", {"message": parser_result.get("message", "I couldn't understand that command.")}
+
+
+def _on_choice(context, user_input: str, parser_result: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Resolve an ambiguous command from the user's choice."""
+    if not context.options:
+        context.reset()
+        return "no_options", {}
+
+    selected = None
+
+    # Check if user entered a number
+    if user_input.isdigit():
+        index = int(user_input) - 1
+        if 0 <= index < len(context.options):
+            selected = context.options[index]
+
+    # Check if user entered an action name or part of a description
+    if selected is None:
+        user_input_lower = user_input.lower()
+        for option in context.options:
+            if option["action"].lower() == user_input_lower:
+                selected = option
+                break
+            if "description" in option and user_input_lower in option["description"].lower():
+                selected = option
+                break
+
+    if selected is None:
+        return "invalid", {"options": render_options(context.options)}
+
+    context.command = {"action": selected["action"]}
+    if selected.get("required"):
+        context.missing_params = list(selected["required"])
+        return "ask", {"param": context.missing_params[0], "action": selected["action"]}
+
+    return "execute", {"action": selected["action"]}
+
+
+def _on_parameter(context, user_input: str, parser_result: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fill missing parameters from the user's answer.
+
+    The answer goes through the context's parameter extractor, which looks
+    for every parameter of the command that is still unset, not only the
+    required ones asked for: "from a.txt to backup/a.txt" fills both the
+    source and the optional destination of a copy. If nothing in it is
+    recognized, the whole answer is the first missing parameter, converted
+    to the parameter's declared type.
+    """
+    if context.command is None:
+        context.command = {}
+
+    action = context.command.get("action")
+    answer = user_input.strip()
+    extractor = context.extractor
+
+    if context.missing_params:
+        filled = {}
+        if extractor is not None and action:
+            unset = [param for param in extractor.slots(action) if param not in context.command]
+            filled = extractor.extract_text(answer, action, unset, context.command)
+
+        if not filled:
+            param = context.missing_params[0]
+            try:
+                value = extractor.coerce(action, param, answer) if extractor is not None and action else answer
+            except ValueError as e:
+                return "invalid_value", {"error": str(e), "param": param, "action": action}
+            filled = {param: value}
+
+        context.command.update(filled)
+        context.missing_params = [param for param in context.missing_params if param not in filled]
+
+    if context.missing_params:
+        return "ask", {"param": context.missing_params[0], "action": action}
+    return "execute", {"action": action}
+
+
+_EXECUTE = Transition("clear", "clear", EXECUTE_PROMPT, execute=True)
+_CHOOSE = Transition("ambiguous", "ambiguous", OPTIONS_PROMPT)
+_ASK = Transition("missing_params", "missing_params", PARAMETER_PROMPT)
+_NEW_COMMAND = {
+    "execute": _EXECUTE,
+    "choose": _CHOOSE,
+    "ask": _ASK,
+    "error": Transition("initial", "error", ERROR_PROMPT),
+}
+
+DEFAULT_FLOW = DialogFlow(
+    DEFAULT_FLOW_NAME,
+    handlers={
+        "initial": _on_initial,
+        # A new turn after an executed command starts over
+        "clear": _on_initial,
+        "ambiguous": _on_choice,
+        "missing_params": _on_parameter,
+    },
+    transitions={
+        "initial": _NEW_COMMAND,
+        "clear": _NEW_COMMAND,
+        "ambiguous": {
+            "execute": _EXECUTE,
+            "ask": _ASK,
+            "invalid": Transition("ambiguous", "ambiguous", INVALID_CHOICE_PROMPT),
+            "no_options": Transition("initial", "error", NO_OPTIONS_PROMPT),
+        },
+        "missing_params": {
+            "execute": _EXECUTE,
+            "ask": _ASK,
+            "invalid_value": Transition("missing_params", "missing_params", INVALID_VALUE_PROMPT),
+        },
+    }
+)
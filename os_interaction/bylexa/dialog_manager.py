@@ -1,26 +1,154 @@
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Union
 import json
 import re
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from pathlib import Path
+
+from .dialog_flow import (
+    DialogFlow, DEFAULT_FLOW, ENTER_FLOW, TERMINAL_STATES,
+    EXECUTE_PROMPT, OPTIONS_PROMPT, PARAMETER_PROMPT, render_options, get_flow
+)
+from .dialog_store import DialogStore
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Session used by callers that don't track conversations separately
+DEFAULT_SESSION = "default"
+
+class HistoryTurn:
+    """One user/system exchange of a conversation."""
+    __slots__ = ("timestamp", "user", "system")
+    
+    def __init__(self, user: str, system: str, timestamp: Optional[float] = None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.user = user
+        self.system = system
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the turn to a JSON-serializable dictionary."""
+        return {"timestamp": self.timestamp, "user": self.user, "system": self.system}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistoryTurn":
+        """Create a turn from a dictionary produced by ``to_dict``."""
+        return cls(data["user"], data["system"], data.get("timestamp"))
+    
+    def __repr__(self) -> str:
+        return f"HistoryTurn(user={self.user!r}, system={self.system!r})"
+
+class HistoryLog:
+    """
+    Append-only JSON Lines log of conversation turns.
+    
+    Turns that no longer fit in a session's in-memory history are written
+    here, one line per turn tagged with the session ID, and can be replayed.
+    """
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the log; the file is created on the first write.
+        
+        Args:
+            path: Log file path
+        """
+        self.path = Path(path).expanduser()
+        self._file = None
+        self._lock = threading.Lock()
+        self.written = 0
+    
+    def append(self, session_id: str, turns: List[HistoryTurn]):
+        """
+        Write turns of a session to the end of the log.
+        
+        Args:
+            session_id: Conversation the turns belong to
+            turns: Turns to write, oldest first
+        """
+        if not turns:
+            return
+        lines = "".join(
+            json.dumps(dict(turn.to_dict(), session=session_id)) + "\n" for turn in turns
+        )
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+            self.written += len(turns)
+    
+    def replay(self, session_id: Optional[str] = None) -> Iterator[HistoryTurn]:
+        """
+        Read turns back from the log, oldest first.
+        
+        Args:
+            session_id: Only yield turns of this conversation; all when None
+            
+        Yields:
+            Logged turns
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash; skip it
+                    continue
+                if session_id is None or data.get("session") == session_id:
+                    yield HistoryTurn.from_dict(data)
+    
+    def close(self):
+        """Close the log file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
 class DialogContext:
     """
     Class to manage and track conversation context.
+    
+    History is a ring buffer of the last ``history_size`` turns; with a
+    history log, turns pushed out of the buffer are appended to the log
+    instead of being dropped.
     """
-    def __init__(self):
-        """Initialize the dialog context."""
+    def __init__(self, history_size: int = 20, history_text_limit: Optional[int] = 500,
+                 history_log: Optional[HistoryLog] = None, session_id: str = DEFAULT_SESSION,
+                 extractor=None):
+        """
+        Initialize the dialog context.
+        
+        Args:
+            history_size: Maximum number of turns kept in memory
+            history_text_limit: Maximum characters kept per message, or None
+            history_log: Optional log receiving turns that leave the buffer
+            session_id: Conversation ID used to tag logged turns
+            extractor: Optional ParameterExtractor used to read answers
+        """
         self.state = "initial"
+        # Plugin flow the conversation is in; None for the default flow
+        self.flow = None
+        self.state_entered = time.monotonic()
         self.command = None
         self.missing_params = []
         self.options = []
-        self.history = []
+        self.history = deque(maxlen=history_size)
+        self.history_text_limit = history_text_limit
+        self.history_log = history_log
+        self.session_id = session_id
+        self.extractor = extractor
+        # Whether the dialog store holds a snapshot of this context
+        self.persisted = False
         self.last_response = None
         self.original_text = None
+        # Serializes turns of this conversation
+        self.lock = threading.RLock()
+        # Updated by DialogManager whenever the session is used
+        self.last_active = time.monotonic()
     
     def update(self, **kwargs):
         """Update context with new values."""
@@ -29,15 +157,75 @@ class DialogContext:
     
     def add_to_history(self, user_input: str, system_response: str):
         """Add an exchange to the conversation history."""
-        self.history.append({
-            "user": user_input,
-            "system": system_response
-        })
+        limit = self.history_text_limit
+        if limit is not None:
+            user_input = user_input[:limit]
+            system_response = system_response[:limit]
+        
+        # Spill the oldest turn before the ring buffer overwrites it
+        if self.history_log is not None and len(self.history) == self.history.maxlen:
+            self.history_log.append(self.session_id, [self.history[0]])
+        
+        self.history.append(HistoryTurn(user_input, system_response))
         self.last_response = system_response
     
+    def spill_history(self):
+        """Move all in-memory turns to the history log, if there is one."""
+        if self.history_log is not None:
+            self.history_log.append(self.session_id, list(self.history))
+            self.history.clear()
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the dialog state for restoring after a restart.
+        
+        History is not included; it has its own log.
+        
+        Returns:
+            JSON-serializable snapshot
+        """
+        return {
+            "state": self.state,
+            "flow": self.flow.name if self.flow else None,
+            "command": self.command,
+            "missing_params": list(self.missing_params),
+            "options": list(self.options),
+            "original_text": self.original_text,
+            "last_response": self.last_response,
+            "saved_at": time.time()
+        }
+    
+    def restore_snapshot(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Restore the dialog state from a snapshot.
+        
+        Args:
+            snapshot: Snapshot produced by ``to_snapshot``
+            
+        Returns:
+            False if the snapshot's flow is no longer registered
+        """
+        flow = None
+        if snapshot.get("flow"):
+            flow = get_flow(snapshot["flow"])
+            if flow is None:
+                return False
+        
+        self.update(
+            state=snapshot["state"],
+            flow=flow,
+            command=snapshot.get("command"),
+            missing_params=list(snapshot.get("missing_params", [])),
+            options=list(snapshot.get("options", [])),
+            original_text=snapshot.get("original_text"),
+            last_response=snapshot.get("last_response")
+        )
+        idle = max(0.0, time.time() - snapshot.get("saved_at", time.time()))
+        self.last_active = self.state_entered = time.monotonic() - idle
+        return True
+    
     def reset(self):
-        """Reset the context to initial state."""
-        self.state = "initial"
+        """Clear the pending command and its options and parameters."""
         self.command = None
         self.missing_params = []
         self.options = []
@@ -50,287 +238,388 @@ class DialogManager:
     Manages dialog with users to handle ambiguous commands
     and collect missing parameters.
     """
-    def __init__(self):
-        """Initialize the dialog manager."""
-        self.context = DialogContext()
-    
-    def handle_response(self, user_input: str, parser_result: Dict) -> Dict:
-        """Process user input based on current dialog state."""
-        logger.info(f"Handling response in state: {self.context.state}")
-        logger.info(f"Parser result: {parser_result}")
-        
-        # Update context with the original text if available
-        if "original_text" in parser_result:
-            self.context.original_text = parser_result["original_text"]
-        
-        # Handle based on the current state
-        if self.context.state == "initial":
-            return self._handle_initial_state(parser_result)
-        elif self.context.state == "ambiguous":
-            return self._resolve_ambiguity(user_input)
-        elif self.context.state == "missing_params":
-            return self._collect_parameters(user_input)
-        elif self.context.state == "clear":
-            # Reset state and handle as initial
-            self.context.reset()
-            return self._handle_initial_state(parser_result)
-        else:
-            # Unknown state, reset to initial
-            self.context.reset()
-            return {
-                "status": "error",
-                "message": "Dialog system error. Starting over.",
-                "should_execute": False
-            }
-    
-    def _handle_initial_state(self, parser_result: Dict) -> Dict:
-        """Handle the initial state based on parser results."""
-        status = parser_result.get("status")
+    def __init__(self, max_sessions: int = 1000, session_ttl: Optional[float] = 1800.0,
+                 history_size: int = 20, history_text_limit: Optional[int] = 500,
+                 history_log_path: Optional[Union[str, Path]] = None,
+                 parameter_extractor=None, store_path: Optional[Union[str, Path]] = None):
+        """
+        Initialize the dialog manager.
         
-        if status == "clear":
-            # Command is ready to execute
-            self.context.update(
-                state="clear",
-                command=parser_result["command"]
-            )
-            return {
-                "status": "clear",
-                "message": f"Executing command: {parser_result['command']['action']}",
-                "command": parser_result["command"],
-                "should_execute": True
-            }
+        Args:
+            max_sessions: Maximum number of conversations kept; the least
+                recently active one is dropped beyond this
+            session_ttl: Seconds of inactivity after which a conversation is
+                dropped, or None to keep conversations until evicted by size
+            history_size: Turns of history kept in memory per conversation
+            history_text_limit: Maximum characters kept per history message,
+                or None for no limit
+            history_log_path: Optional JSON Lines file receiving turns that no
+                longer fit in memory and the history of dropped conversations
+            parameter_extractor: Optional ParameterExtractor for reading
+                parameter answers; without it each answer fills exactly one
+                parameter verbatim
+            store_path: Optional write-ahead log file for the state of dialogs
+                waiting for an answer, so restore() can resume them after a
+                restart
+        """
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.history_size = history_size
+        self.history_text_limit = history_text_limit
+        self.history_log = HistoryLog(history_log_path) if history_log_path else None
+        self.parameter_extractor = parameter_extractor
+        self.store = DialogStore(store_path) if store_path else None
+        self._sessions: "OrderedDict[str, DialogContext]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        # Per '<flow>.<state>': entries, seconds spent, conversations abandoned
+        self._state_metrics = defaultdict(lambda: {"entries": 0, "seconds": 0.0, "abandoned": 0})
+        self._metrics_lock = threading.Lock()
+    
+    @property
+    def context(self) -> DialogContext:
+        """Context of the default session, for single-user callers."""
+        return self.get_context(DEFAULT_SESSION)
+    
+    def get_context(self, session_id: str = DEFAULT_SESSION) -> DialogContext:
+        """
+        Get the dialog context of a session, creating it if needed.
         
-        elif status == "ambiguous":
-            # Multiple possible commands, need clarification
-            self.context.update(
-                state="ambiguous",
-                options=parser_result["options"]
-            )
+        Args:
+            session_id: Conversation ID, e.g. a gateway connection ID
             
-            # Generate clarification message
-            option_texts = []
-            for i, option in enumerate(parser_result["options"][:5]):  # Limit to top 5
-                desc = option.get("description", option["action"])
-                option_texts.append(f"{i+1}. {desc}")
+        Returns:
+            The session's dialog context
+        """
+        now = time.monotonic()
+        with self._sessions_lock:
+            dropped = self._expire_sessions(now)
             
-            options_text = "\n".join(option_texts)
-            message = (
-                f"I'm not sure which command you want to run. "
-                f"Please choose one of the following options by number or name:\n{options_text}"
-            )
+            context = self._sessions.get(session_id)
+            if context is None:
+                context = DialogContext(
+                    history_size=self.history_size,
+                    history_text_limit=self.history_text_limit,
+                    history_log=self.history_log,
+                    session_id=session_id,
+                    extractor=self.parameter_extractor
+                )
+                self._sessions[session_id] = context
+                while len(self._sessions) > self.max_sessions:
+                    evicted_id, evicted = self._sessions.popitem(last=False)
+                    dropped.append(evicted)
+                    self.evictions += 1
+                    logger.info(f"Dialog session evicted: {evicted_id}")
+            else:
+                self._sessions.move_to_end(session_id)
             
-            return {
-                "status": "ambiguous",
-                "message": message,
-                "should_execute": False
-            }
+            context.last_active = now
         
-        elif status == "missing_params":
-            # Command is identified but missing parameters
-            self.context.update(
-                state="missing_params",
-                command=parser_result["command"],
-                missing_params=parser_result["missing_params"]
-            )
-            
-            # Ask for the first missing parameter
-            param = self.context.missing_params[0]
-            message = f"Please provide the {param} for the {parser_result['command']['action']} command:"
+        # Keep the history of dropped sessions, outside the sessions lock
+        for dropped_context in dropped:
+            self._drop(dropped_context)
+        return context
+    
+    def _expire_sessions(self, now: float) -> List[DialogContext]:
+        """Drop sessions idle for longer than the TTL (sessions lock held)."""
+        expired = []
+        if self.session_ttl is None:
+            return expired
+        
+        # Sessions are kept in order of last activity, so stop at the first live one
+        while self._sessions:
+            session_id, context = next(iter(self._sessions.items()))
+            if now - context.last_active <= self.session_ttl:
+                break
+            del self._sessions[session_id]
+            expired.append(context)
+            self.expirations += 1
+            logger.info(f"Dialog session expired: {session_id}")
+        return expired
+    
+    def end_session(self, session_id: str):
+        """
+        Forget a conversation, e.g. when its connection closes.
+        
+        Args:
+            session_id: Conversation ID
+        """
+        with self._sessions_lock:
+            context = self._sessions.pop(session_id, None)
+        if context is not None:
+            self._drop(context)
+    
+    def _drop(self, context: DialogContext):
+        """Clean up after a session left the session map."""
+        self._record_abandoned(context)
+        context.spill_history()
+        if context.persisted:
+            self.store.delete(context.session_id)
+            context.persisted = False
+    
+    def _persist(self, context: DialogContext):
+        """Log the dialog state of a context after a turn (context lock held)."""
+        if self.store is None:
+            return
+        if context.state not in TERMINAL_STATES:
+            self.store.put(context.session_id, context.to_snapshot())
+            context.persisted = True
+        elif context.persisted:
+            # Nothing left to resume
+            self.store.delete(context.session_id)
+            context.persisted = False
+    
+    def restore(self) -> int:
+        """
+        Resume the dialogs recorded in the dialog store, e.g. after a restart.
+        
+        Dialogs idle for longer than the session TTL, and dialogs of plugin
+        flows that are no longer registered, are discarded.
+        
+        Returns:
+            Number of sessions restored
+        """
+        if self.store is None:
+            return 0
+        
+        restored = 0
+        for session_id, snapshot in self.store.load().items():
+            idle = time.time() - snapshot.get("saved_at", 0.0)
+            if self.session_ttl is not None and idle > self.session_ttl:
+                self.store.delete(session_id)
+                continue
             
-            return {
-                "status": "missing_params",
-                "message": message,
-                "should_execute": False
-            }
+            context = self.get_context(session_id)
+            with context.lock:
+                if context.restore_snapshot(snapshot):
+                    context.persisted = True
+                    restored += 1
+                else:
+                    logger.warning(f"Dialog session {session_id} uses unknown flow '{snapshot.get('flow')}'")
+                    self.store.delete(session_id)
         
-        else:  # status == "error" or other
-            # Error or unrecognized command
-            message = parser_result.get("message", "I couldn't understand that command.")
+        # Sessions were restored oldest first; keep the map in activity order
+        with self._sessions_lock:
+            for session_id in sorted(self._sessions, key=lambda s: self._sessions[s].last_active):
+                self._sessions.move_to_end(session_id)
+        
+        logger.info(f"Restored {restored} dialog sessions")
+        return restored
+    
+    def get_history(self, session_id: str = DEFAULT_SESSION,
+                    include_logged: bool = False) -> List[HistoryTurn]:
+        """
+        Get the history of a conversation, oldest turn first.
+        
+        Args:
+            session_id: Conversation ID
+            include_logged: Also replay turns spilled to the history log
             
-            return {
-                "status": "error",
-                "message": message,
-                "should_execute": False
-            }
+        Returns:
+            List of turns
+        """
+        turns = []
+        if include_logged and self.history_log is not None:
+            turns.extend(self.history_log.replay(session_id))
+        with self._sessions_lock:
+            context = self._sessions.get(session_id)
+            if context is not None:
+                turns.extend(context.history)
+        return turns
+    
+    def close(self):
+        """
+        Spill all in-memory history to the history log and close the logs.
+        
+        Dialogs in the dialog store are kept for the next restore().
+        """
+        if self.store is not None:
+            self.store.close()
+        if self.history_log is None:
+            return
+        with self._sessions_lock:
+            contexts = list(self._sessions.values())
+        for context in contexts:
+            with context.lock:
+                context.spill_history()
+        self.history_log.close()
     
-    def _resolve_ambiguity(self, user_input: str) -> Dict:
-        """Resolve ambiguity by processing user's choice."""
-        if not self.context.options:
-            self.context.reset()
+    def session_stats(self) -> Dict[str, Any]:
+        """
+        Get session statistics.
+        
+        Returns:
+            Dictionary with the number of sessions, limits and eviction counters
+        """
+        with self._sessions_lock:
             return {
-                "status": "error",
-                "message": "No options available. Please state your command again.",
-                "should_execute": False
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "session_ttl": self.session_ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "history_size": self.history_size,
+                "history_logged": self.history_log.written if self.history_log else 0,
+                "store": self.store.stats() if self.store else None
             }
+    
+    def handle_response(self, user_input: str, parser_result: Dict,
+                        session_id: str = DEFAULT_SESSION) -> Dict:
+        """
+        Process user input based on the session's current dialog state.
         
-        selected_option = None
-        
-        # Check if user entered a number
-        if user_input.isdigit():
-            option_num = int(user_input) - 1
-            if 0 <= option_num < len(self.context.options):
-                selected_option = self.context.options[option_num]
-        
-        # Check if user entered an action name
-        if not selected_option:
-            user_input_lower = user_input.lower()
-            for option in self.context.options:
-                if option["action"].lower() == user_input_lower:
-                    selected_option = option
-                    break
-                
-                # Also check if the user entered part of the description
-                if "description" in option and user_input_lower in option["description"].lower():
-                    selected_option = option
-                    break
-        
-        if selected_option:
-            # Build command from the selected option
-            command = {"action": selected_option["action"]}
+        Args:
+            user_input: What the user said or typed
+            parser_result: Parser result for ``user_input``
+            session_id: Conversation the input belongs to
             
-            # Check if we need parameters
-            if "required" in selected_option and selected_option["required"]:
-                self.context.update(
-                    state="missing_params",
-                    command=command,
-                    missing_params=selected_option["required"]
-                )
-                
-                # Ask for the first missing parameter
-                param = self.context.missing_params[0]
-                message = f"Please provide the {param} for the {command['action']} command:"
-                
-                return {
-                    "status": "missing_params",
-                    "message": message,
-                    "should_execute": False
-                }
-            else:
-                # No parameters needed, execute the command
-                self.context.update(
-                    state="clear",
-                    command=command
-                )
-                
-                return {
-                    "status": "clear",
-                    "message": f"Executing command: {command['action']}",
-                    "command": command,
-                    "should_execute": True
-                }
-        else:
-            # User didn't select a valid option
-            options_text = "\n".join([f"{i+1}. {option.get('description', option['action'])}" 
-                                   for i, option in enumerate(self.context.options[:5])])
+        Returns:
+            Dialog result dictionary
+        """
+        context = self.get_context(session_id)
+        with context.lock:
+            logger.info("Handling response in state: %s", context.state)
+            logger.info("Parser result: %s", parser_result)
             
-            message = (
-                f"I didn't understand your selection. "
-                f"Please choose one of the following options by number or name:\n{options_text}"
-            )
+            result = self._step(context, user_input, parser_result)
             
-            return {
-                "status": "ambiguous",
-                "message": message,
-                "should_execute": False
-            }
+            # Update context with the original text if available
+            if "original_text" in parser_result:
+                context.original_text = parser_result["original_text"]
+            
+            context.add_to_history(user_input, result.get("message", ""))
+            self._persist(context)
+            return result
     
-    def _collect_parameters(self, user_input: str) -> Dict:
-        """Collect missing parameters from user input."""
-        if not self.context.missing_params:
-            self.context.update(state="clear")
+    def _step(self, context: DialogContext, user_input: str, parser_result: Dict) -> Dict:
+        """Evaluate one turn against the context's flow (context lock held)."""
+        flow = context.flow or DEFAULT_FLOW
+        handler = flow.handlers.get(context.state)
+        if handler is None:
+            # Unknown state, reset to initial
+            self._enter(context, "initial", None)
+            context.reset()
             return {
-                "status": "clear",
-                "message": f"Executing command: {self.context.command['action']}",
-                "command": self.context.command,
-                "should_execute": True
+                "status": "error",
+                "message": "Dialog system error. Starting over.",
+                "should_execute": False
             }
         
-        # Get the current parameter we're collecting
-        current_param = self.context.missing_params[0]
+        event, values = handler(context, user_input, parser_result)
         
-        # Update the command with the provided parameter
-        if not self.context.command:
-            self.context.command = {}
+        if event == ENTER_FLOW:
+            # Hand the conversation to a plugin flow and let it take this turn
+            self._enter(context, values["flow"].start, values["flow"])
+            return self._step(context, user_input, parser_result)
         
-        self.context.command[current_param] = user_input.strip()
+        transition = flow.transitions[context.state][event]
+        self._enter(context, transition.target, None if transition.target in TERMINAL_STATES else flow)
         
-        # Remove this parameter from the missing list
-        self.context.missing_params.pop(0)
+        result = {
+            "status": transition.status,
+            "message": transition.prompt(**values),
+            "should_execute": transition.execute
+        }
+        if transition.execute:
+            result["command"] = context.command
+        return result
+    
+    def _enter(self, context: DialogContext, state: str, flow: Optional[DialogFlow]):
+        """Move a context to a state, recording the time spent in the previous one."""
+        now = time.monotonic()
+        with self._metrics_lock:
+            previous = self._state_metrics[self._state_key(context)]
+            previous["seconds"] += now - context.state_entered
+            self._state_metrics[self._state_key(context, state, flow)]["entries"] += 1
         
-        # Check if we have all required parameters
-        if not self.context.missing_params:
-            # All parameters collected, ready to execute
-            self.context.update(state="clear")
-            
-            return {
-                "status": "clear",
-                "message": f"Executing command: {self.context.command['action']}",
-                "command": self.context.command,
-                "should_execute": True
-            }
-        else:
-            # Still missing parameters, ask for the next one
-            next_param = self.context.missing_params[0]
-            message = f"Please provide the {next_param} for the {self.context.command['action']} command:"
-            
-            return {
-                "status": "missing_params",
-                "message": message,
-                "should_execute": False
-            }
+        context.state = state
+        context.flow = flow
+        context.state_entered = now
+    
+    @staticmethod
+    def _state_key(context: DialogContext, state: Optional[str] = None,
+                   flow: Optional[DialogFlow] = None) -> str:
+        """Metrics key of a state: '<flow>.<state>'."""
+        if state is None:
+            state, flow = context.state, context.flow
+        return f"{(flow or DEFAULT_FLOW).name}.{state}"
+    
+    def _record_abandoned(self, context: DialogContext):
+        """Count a dropped conversation that was still waiting for an answer."""
+        if context.state in TERMINAL_STATES:
+            return
+        with self._metrics_lock:
+            metrics = self._state_metrics[self._state_key(context)]
+            metrics["abandoned"] += 1
+            metrics["seconds"] += time.monotonic() - context.state_entered
+    
+    def flow_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-state dialog metrics.
+        
+        Returns:
+            Dictionary mapping '<flow>.<state>' to the number of entries, total
+            and mean seconds spent in the state, and how many conversations were
+            dropped while waiting in it (count and rate)
+        """
+        with self._metrics_lock:
+            stats = {}
+            for key, metrics in self._state_metrics.items():
+                entries = metrics["entries"]
+                stats[key] = {
+                    "entries": entries,
+                    "seconds": metrics["seconds"],
+                    "mean_seconds": metrics["seconds"] / entries if entries else 0.0,
+                    "abandoned": metrics["abandoned"],
+                    "abandonment_rate": metrics["abandoned"] / entries if entries else 0.0
+                }
+            return stats
     
-    def request_clarification(self, options: List[Dict]) -> Dict:
+    def request_clarification(self, options: List[Dict], session_id: str = DEFAULT_SESSION) -> Dict:
         """
         Request clarification when a command is ambiguous.
         
         Args:
             options: List of possible command options
+            session_id: Conversation to ask in
             
         Returns:
             Dict with the clarification message
         """
-        self.context.update(
-            state="ambiguous",
-            options=options
-        )
-        
-        option_texts = []
-        for i, option in enumerate(options[:5]):  # Limit to top 5
-            desc = option.get("description", option["action"])
-            option_texts.append(f"{i+1}. {desc}")
-        
-        options_text = "\n".join(option_texts)
-        message = (
-            f"I'm not sure which command you want to run. "
-            f"Please choose one of the following options by number or name:\n{options_text}"
-        )
+        context = self.get_context(session_id)
+        with context.lock:
+            context.options = options
+            self._enter(context, "ambiguous", None)
+            self._persist(context)
         
         return {
             "status": "ambiguous",
-            "message": message
+            "message": OPTIONS_PROMPT(options=render_options(options))
         }
     
-    def request_parameters(self, command: Dict) -> Dict:
+    def request_parameters(self, command: Dict, session_id: str = DEFAULT_SESSION) -> Dict:
         """
         Request missing parameters for a command.
         
         Args:
             command: Partial command dictionary
+            session_id: Conversation to ask in
             
         Returns:
             Dict with the parameter request message
         """
         # Check command structure to determine missing parameters
-        from .intent_parser import CommandRegistry
+        from .intent_parser import get_command_registry
         
-        registry = CommandRegistry()
+        registry = get_command_registry().snapshot()
         command_info = registry.get_command(command["action"])
         
         if not command_info or "required" not in command_info:
             # If we can't determine required parameters, just execute with what we have
             return {
                 "status": "clear",
-                "message": f"Executing command: {command['action']}",
+                "message": EXECUTE_PROMPT(action=command["action"]),
                 "command": command,
                 "should_execute": True
             }
@@ -345,23 +634,20 @@ class DialogManager:
             # All required parameters are present
             return {
                 "status": "clear",
-                "message": f"Executing command: {command['action']}",
+                "message": EXECUTE_PROMPT(action=command["action"]),
                 "command": command,
                 "should_execute": True
             }
         
         # Update context for parameter collection
-        self.context.update(
-            state="missing_params",
-            command=command,
-            missing_params=missing_params
-        )
+        context = self.get_context(session_id)
+        with context.lock:
+            context.update(command=command, missing_params=missing_params)
+            self._enter(context, "missing_params", None)
+            self._persist(context)
         
         # Ask for the first missing parameter
-        param = missing_params[0]
-        message = f"Please provide the {param} for the {command['action']} command:"
-        
         return {
             "status": "missing_params",
-            "message": message
+            "message": PARAMETER_PROMPT(param=missing_params[0], action=command["action"])
         }
\ No newline at end of file
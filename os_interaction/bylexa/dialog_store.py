@@ -0,0 +1,161 @@
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Union
+
+logger = logging.getLogger(__name__)
+
+# Default location of the dialog session log
+DEFAULT_STORE_PATH = Path.home() / '.bylexa' / 'dialog_sessions.wal'
+
+
+class DialogStore:
+    """
+    Write-ahead log of dialog session snapshots.
+
+    Every change to a session waiting for an answer is appended as one JSON
+    line ({"op": "put", "session": ..., "context": {...}}); a session that
+    completes or is dropped gets a {"op": "delete"} record. Replaying the
+    log gives the latest snapshot of every in-flight session. Once the log
+    holds many more records than live sessions it is compacted by writing
+    the live snapshots to a temporary file and atomically replacing the log.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_STORE_PATH,
+                 compact_after: int = 1000, fsync: bool = False):
+        """
+        Initialize the store; nothing is read until load().
+
+        Args:
+            path: Log file path
+            compact_after: Minimum number of records before compacting
+            fsync: Force every record to disk, not just to the OS
+        """
+        self.path = Path(path).expanduser()
+        self.compact_after = compact_after
+        self.fsync = fsync
+
+        self._file = None
+        self._lock = threading.Lock()
+        # Latest snapshot per live session, for compaction
+        self._live: Dict[str, Dict[str, Any]] = {}
+        self._records = 0
+        self._loaded = False
+
+        self.writes = 0
+        self.compactions = 0
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Replay the log.
+
+        Returns:
+            Dictionary mapping session IDs to their latest snapshot
+        """
+        with self._lock:
+            self._load_locked()
+            return dict(self._live)
+
+    def _load_locked(self):
+        """Read the log into the live snapshots (lock held)."""
+        live: Dict[str, Dict[str, Any]] = {}
+        records = 0
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash; skip it
+                        continue
+                    records += 1
+                    if record.get("op") == "put":
+                        live[record["session"]] = record["context"]
+                    elif record.get("op") == "delete":
+                        live.pop(record["session"], None)
+
+        self._live = live
+        self._records = records
+        self._loaded = True
+
+    def put(self, session_id: str, snapshot: Dict[str, Any]):
+        """
+        Record the latest snapshot of a session.
+
+        Args:
+            session_id: Conversation ID
+            snapshot: JSON-serializable session snapshot
+        """
+        with self._lock:
+            if not self._loaded:
+                # Don't let a compaction drop sessions that weren't restored yet
+                self._load_locked()
+            self._live[session_id] = snapshot
+            self._append({"op": "put", "session": session_id, "context": snapshot})
+
+    def delete(self, session_id: str):
+        """
+        Record that a session no longer needs restoring.
+
+        Args:
+            session_id: Conversation ID
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            self._live.pop(session_id, None)
+            self._append({"op": "delete", "session": session_id})
+
+    def _append(self, record: Dict[str, Any]):
+        """Write one record, compacting first if the log is mostly stale (lock held)."""
+        if self._records >= self.compact_after and self._records > 2 * len(self._live):
+            self._compact()
+
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._records += 1
+        self.writes += 1
+
+    def _compact(self):
+        """Rewrite the log with only the live snapshots (lock held)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for session_id, snapshot in self._live.items():
+                f.write(json.dumps({"op": "put", "session": session_id, "context": snapshot}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self._records = len(self._live)
+        self.compactions += 1
+        logger.debug(f"Dialog store compacted to {self._records} sessions")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "live_sessions": len(self._live),
+                "records": self._records,
+                "writes": self.writes,
+                "compactions": self.compactions
+            }
+
+    def close(self):
+        """Close the log file; the logged sessions stay for the next load()."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,403 @@
+import re
+import threading
+import logging
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Tokens are quoted strings or runs of non-whitespace
+TOKEN_PATTERN = re.compile(r'"([^"]*)"|\'([^\']*)\'|(\S+)')
+
+# Value-alias groups in CommandRegistry.aliases ("<value>_action") that
+# fill each action slot. The phrases themselves come from the registry.
+ACTION_SLOTS = {
+    "media_action": ("play_action", "pause_action"),
+    "file_action": ("copy_action", "move_action", "delete_action"),
+}
+
+# File actions that need both a source and a destination
+TWO_PATH_ACTIONS = {"copy", "move"}
+
+# Slots that take the rest of the utterance verbatim
+FREE_TEXT_SLOTS = {"command_line", "text"}
+
+# Words that may follow an action verb without changing its meaning
+FILLER_WORDS = {"the", "music", "song", "audio", "video", "playback", "media"}
+
+# Words that connect a source path to its destination
+PATH_CONNECTORS = {"to", "into", "as"}
+
+# Volume units accepted after the level
+LEVEL_UNITS = {"%", "percent"}
+
+_END = object()
+
+
+class _CompiledRules(NamedTuple):
+    """Matching tables compiled from one registry version."""
+    verb_trie: Dict[Any, Any]
+    slot_values: Dict[str, Dict[str, str]]
+    canonical_values: Dict[str, str]
+    command_rules: Dict[str, Dict[str, Any]]
+
+
+class PathStats:
+    """Thread-safe hit and latency counters for the parser's resolution paths."""
+
+    def __init__(self, paths: List[str]):
+        """
+        Initialize the counters.
+
+        Args:
+            paths: Names of the paths to count, e.g. ["fast_path", "nlp_path"]
+        """
+        self._lock = threading.Lock()
+        self._counts = {path: 0 for path in paths}
+        self._total_ms = {path: 0.0 for path in paths}
+
+    def record(self, path: str, elapsed_ms: float):
+        """Record one command resolved by the given path."""
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._total_ms[path] = self._total_ms.get(path, 0.0) + elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current counters.
+
+        Returns:
+            Dictionary with per-path count, total and mean latency, and the
+            share of commands each path resolved
+        """
+        with self._lock:
+            total = sum(self._counts.values())
+            stats = {}
+            for path, count in self._counts.items():
+                stats[path] = {
+                    "count": count,
+                    "hit_rate": count / total if total else 0.0,
+                    "total_ms": self._total_ms[path],
+                    "mean_ms": self._total_ms[path] / count if count else 0.0
+                }
+            stats["total"] = total
+            return stats
+
+    def reset(self):
+        """Reset all counters to zero."""
+        with self._lock:
+            for path in self._counts:
+                self._counts[path] = 0
+                self._total_ms[path] = 0.0
+
+
+class FastPathMatcher:
+    """
+    Deterministic matcher for formulaic commands.
+
+    Rules are compiled from a CommandRegistry: command names and command
+    aliases form a token trie of verb phrases, and the "<value>_action"
+    alias groups provide the vocabulary for action slots. An utterance only
+    matches when a rule consumes it completely, so anything unusual falls
+    back to the spaCy path.
+    """
+
+    def __init__(self, registry):
+        """
+        Initialize the matcher.
+
+        Args:
+            registry: CommandRegistry to compile rules from
+        """
+        self.registry = registry
+        self.compile()
+
+    def compile(self, snapshot=None):
+        """
+        (Re)compile the matching rules from the registry.
+
+        The tables are built aside and published with one assignment, so
+        matches running on other threads see either the old rules or the
+        new ones, never a mix.
+
+        Args:
+            snapshot: RegistrySnapshot to compile; the registry's current one when None
+        """
+        if snapshot is None:
+            snapshot = self.registry.snapshot()
+        commands = snapshot.commands
+        aliases = snapshot.aliases
+
+        # Verb phrase trie: token -> subtrie, _END -> command name
+        verb_trie: Dict[Any, Any] = {}
+        for name in commands:
+            if "." not in name:
+                self._add_verb(verb_trie, name, name)
+        for alias, target in aliases.items():
+            if isinstance(target, str) and target in commands:
+                self._add_verb(verb_trie, alias, target)
+
+        # Action slot vocabulary: slot -> phrase -> value
+        slot_values: Dict[str, Dict[str, str]] = {}
+        for slot, groups in ACTION_SLOTS.items():
+            values = {}
+            for group in groups:
+                phrases = aliases.get(group)
+                if not isinstance(phrases, list):
+                    continue
+                value = group[:-len("_action")]
+                for phrase in phrases:
+                    values.setdefault(phrase.lower(), value)
+            slot_values[slot] = values
+
+        # Known parameter values: phrase -> canonical value ("browser" -> "chrome")
+        canonical_values: Dict[str, str] = {}
+        for key, phrases in aliases.items():
+            if isinstance(phrases, list) and not key.endswith("_action"):
+                for phrase in phrases:
+                    canonical_values.setdefault(phrase.lower(), key)
+
+        # Per-command rule data
+        command_rules: Dict[str, Dict[str, Any]] = {}
+        for name, info in commands.items():
+            params = info.get("params", [])
+            required = info.get("required", [])
+            command_rules[name] = {
+                "params": params,
+                "required": required,
+                "action_slot": next((p for p in params if p in slot_values), None),
+                "level_slot": next((p for p in params if p.endswith("_level")), None),
+            }
+
+        self._rules = _CompiledRules(verb_trie, slot_values, canonical_values, command_rules)
+        logger.debug(f"Fast path compiled for {len(command_rules)} commands")
+
+    @staticmethod
+    def _add_verb(verb_trie: Dict[Any, Any], phrase: str, command: str):
+        """Add a verb phrase for a command to the trie."""
+        node = verb_trie
+        for token in phrase.lower().split():
+            node = node.setdefault(token, {})
+        node.setdefault(_END, command)
+
+    def match_verb(self, words: List[str]) -> Tuple[Optional[str], int]:
+        """
+        Find the longest verb phrase at the start of the utterance.
+
+        Args:
+            words: Lowercased tokens
+
+        Returns:
+            Tuple of (command name, number of tokens consumed)
+        """
+        return self._match_verb(self._rules, words)
+
+    @staticmethod
+    def _match_verb(compiled: "_CompiledRules", words: List[str]) -> Tuple[Optional[str], int]:
+        """match_verb against one set of compiled rules."""
+        node = compiled.verb_trie
+        command, consumed = None, 0
+        for i, word in enumerate(words):
+            if word not in node:
+                break
+            node = node[word]
+            if _END in node:
+                command, consumed = node[_END], i + 1
+        return command, consumed
+
+    @staticmethod
+    def tokenize(text: str, pos: int = 0) -> Tuple[List[str], List[str], List[bool], List[int]]:
+        """
+        Split text into tokens.
+
+        Args:
+            text: Text to split
+            pos: Offset in ``text`` to start at
+
+        Returns:
+            Tuple of (tokens with quotes removed, lowercased tokens, whether
+            each token was quoted, start offset of each token in the text)
+        """
+        tokens, lowered, quoted, starts = [], [], [], []
+        for match in TOKEN_PATTERN.finditer(text, pos):
+            double, single, bare = match.groups()
+            value = bare if bare is not None else (double if double is not None else single)
+            tokens.append(value)
+            lowered.append(value.lower())
+            quoted.append(bare is None)
+            starts.append(match.start())
+        return tokens, lowered, quoted, starts
+
+    def match(self, text: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Match an utterance against the compiled rules.
+
+        Args:
+            text: Natural language command text
+
+        Returns:
+            Tuple of (command action, parameters) if a rule resolves the whole
+            utterance with every required parameter filled, None otherwise
+        """
+        text = text.strip().rstrip(".!?")
+        return self.match_tokens(text, *self.tokenize(text))
+
+    def match_tokens(self, text: str, tokens: List[str], words: List[str],
+                     quoted: List[bool], starts: List[int],
+                     vocabulary_only: bool = False) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Match an utterance that has already been tokenized by ``tokenize``.
+
+        Lets callers that tokenize incrementally (streaming transcripts)
+        skip re-tokenizing the whole text.
+
+        Args:
+            text: Command text with trailing punctuation removed
+            tokens, words, quoted, starts: Output of ``tokenize(text)``
+            vocabulary_only: Only match when every slot value comes from the
+                registry's vocabulary or a number, not from a bare word,
+                path or free text that a partial transcript may have cut short
+
+        Returns:
+            Same as ``match``
+        """
+        if not tokens:
+            return None
+
+        # One set of rules for the whole match, even if they are recompiled meanwhile
+        compiled = self._rules
+
+        # Rules that start with an action phrase rather than a command verb
+        result = self._match_action_phrase(compiled, words)
+        if result is None and not vocabulary_only:
+            result = self._match_file_action(compiled, tokens, words, quoted)
+        if result:
+            return result
+
+        command, consumed = self._match_verb(compiled, words)
+        if not command:
+            return None
+
+        rules = compiled.command_rules[command]
+        verb_words, rest_words = words[:consumed], words[consumed:]
+        rest = tokens[consumed:]
+        rest_text = text[starts[consumed]:] if consumed < len(tokens) else ""
+
+        for rule in (self._match_action_slot, self._match_level_slot, self._match_single_slot):
+            parameters = rule(compiled, rules, verb_words, rest, rest_words, rest_text, vocabulary_only)
+            if parameters is not None and all(p in parameters for p in rules["required"]):
+                return command, parameters
+
+        return None
+
+    def _match_action_slot(self, compiled, rules, verb_words, rest, rest_words,
+                           rest_text, vocabulary_only=False) -> Optional[Dict[str, Any]]:
+        """'pause', 'play music': the verb itself names the slot value."""
+        slot = rules["action_slot"]
+        if not slot:
+            return None
+
+        value = compiled.slot_values[slot].get(" ".join(verb_words))
+        if value is None or any(word not in FILLER_WORDS for word in rest_words):
+            return None
+
+        return {slot: value}
+
+    def _match_level_slot(self, compiled, rules, verb_words, rest, rest_words,
+                          rest_text, vocabulary_only=False) -> Optional[Dict[str, Any]]:
+        """'volume 40 percent', 'volume to 40%': <x> [to] N [unit] fills <x>_level."""
+        slot = rules["level_slot"]
+        if not slot or " ".join(verb_words) != slot[:-len("_level")]:
+            return None
+
+        words = [w for w in rest_words if w != "to"]
+        if words and words[-1] in LEVEL_UNITS:
+            words = words[:-1]
+        if len(words) != 1:
+            return None
+
+        number = words[0].rstrip("%")
+        if not number.isdigit():
+            return None
+
+        parameters = {}
+        if rules["action_slot"]:
+            parameters[rules["action_slot"]] = slot[:-len("_level")]
+        parameters[slot] = int(number)
+        return parameters
+
+    def _match_single_slot(self, compiled, rules, verb_words, rest, rest_words,
+                           rest_text, vocabulary_only=False) -> Optional[Dict[str, Any]]:
+        """'open chrome', 'run dir /b': a command with one required slot."""
+        required = rules["required"]
+        if len(required) != 1 or not rest:
+            return None
+
+        slot = required[0]
+        if slot in FREE_TEXT_SLOTS:
+            return None if vocabulary_only else {slot: rest_text}
+
+        phrase = " ".join(rest_words)
+
+        # Action slots take a fixed set of values; anything else ("play
+        # despacito", "volume up") is left to the spaCy path
+        if slot in compiled.slot_values or slot.endswith("_action"):
+            values = compiled.slot_values.get(slot, {})
+            if phrase in values:
+                return {slot: values[phrase]}
+            if phrase in values.values():
+                return {slot: phrase}
+            return None
+
+        if phrase in compiled.canonical_values:
+            return {slot: compiled.canonical_values[phrase]}
+        if len(rest) == 1 and not vocabulary_only:
+            return {slot: rest[0]}
+
+        return None
+
+    def _match_action_phrase(self, compiled, words) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """'resume', 'start playback': the whole utterance is an action phrase."""
+        phrase = " ".join(words)
+        for name, rules in compiled.command_rules.items():
+            slot = rules["action_slot"]
+            if slot and phrase in compiled.slot_values[slot]:
+                parameters = {slot: compiled.slot_values[slot][phrase]}
+                if all(p in parameters for p in rules["required"]):
+                    return name, parameters
+        return None
+
+    def _match_file_action(self, compiled, tokens, words, quoted) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """"copy 'a.txt' 'b.txt'", "delete old.log": <file verb> PATH [to] [PATH]."""
+        values = compiled.slot_values.get("file_action")
+        if not values or words[0] not in values:
+            return None
+
+        command = next(
+            (name for name, rules in compiled.command_rules.items() if rules["action_slot"] == "file_action"),
+            None
+        )
+        if not command:
+            return None
+
+        file_action = values[words[0]]
+        paths = []
+        for i in range(1, len(tokens)):
+            if not quoted[i] and words[i] in PATH_CONNECTORS and len(paths) == 1:
+                continue
+            if not (quoted[i] or self._looks_like_path(tokens[i])):
+                return None
+            paths.append(tokens[i])
+
+        expected = 2 if file_action in TWO_PATH_ACTIONS else 1
+        if len(paths) != expected:
+            return None
+
+        parameters = {"file_action": file_action, "source": paths[0]}
+        if expected == 2:
+            parameters["destination"] = paths[1]
+        return command, parameters
+
+    @staticmethod
+    def _looks_like_path(token: str) -> bool:
+        """Whether an unquoted token is clearly a file path."""
+        return "/" in token or "\\" in token or "." in token[1:-1]
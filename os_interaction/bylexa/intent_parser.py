@@ -1,48 +1,389 @@
 import os
 import json
 import re
-from typing import Dict, List, Any, Optional, Tuple, Union
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable, Mapping, NamedTuple
+from types import MappingProxyType
 from pathlib import Path
 import importlib.util
-import nltk
-from nltk.tokenize import word_tokenize
-import spacy
-import numpy as np
 import logging
+import time
+
+from .fast_path import FastPathMatcher, PathStats
+from .param_extractor import ParameterExtractor
+from .parse_cache import ParseCache
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# spaCy and NLTK are imported on first use, not at module import, so that
+# commands which never reach the NLP models start without paying for them.
+_nltk_ready = False
+_nltk_lock = threading.Lock()
+
+def _ensure_nltk_data():
+    """Make sure the NLTK tokenizer data is available, downloading it once if needed."""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+    
+    with _nltk_lock:
+        if _nltk_ready:
+            return
+        
+        import nltk
+        
+        # Download required NLTK data
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt', quiet=True)
+        
+        try:
+            nltk.data.find('tokenizers/punkt_tab')  
+        except LookupError:
+            nltk.download('punkt_tab', quiet=True)
+        
+        _nltk_ready = True
+
+# spaCy pipeline components each extractor depends on. Both extractors read
+# token.pos_ (tagger + attribute_ruler), token.dep_ (parser) and
+# token.lemma_ (lemmatizer, which needs POS tags); tok2vec feeds the tagger
+# and parser. Nothing reads doc.ents, so "ner" is never needed.
+EXTRACTOR_COMPONENTS = {
+    "_extract_command_action": ["tok2vec", "tagger", "attribute_ruler", "lemmatizer", "parser"],
+    "_extract_parameters": ["tok2vec", "tagger", "attribute_ruler", "lemmatizer", "parser"],
+}
+
+# Pipeline profiles map to the components excluded when loading the model.
+# "intent" keeps everything the extractors need; "fast" also drops the
+# dependency parser and relies on the first-word/noun fallbacks.
+PIPELINE_PROFILES = {
+    "full": [],
+    "intent": ["ner"],
+    "fast": ["ner", "parser"],
+}
+
+DEFAULT_PIPELINE_PROFILE = "intent"
+
+class RegistrySnapshot(NamedTuple):
+    """
+    Read-only view of the command registry at one version.
+    
+    The registry never mutates a published commands/aliases dict (changes
+    replace them), so a snapshot stays consistent while the registry moves on.
+    ``extract_tables`` holds the parameter extraction tables, which are
+    kept out of the command details clients see.
+    """
+    version: int
+    commands: Mapping[str, Dict]
+    aliases: Mapping[str, Any]
+    extract_tables: Mapping[str, Dict] = MappingProxyType({})
+    
+    def get_command(self, name: str) -> Optional[Dict]:
+        """Get command details by name or alias."""
+        return _lookup_command(self.commands, self.aliases, name)
+
+
+def _lookup_command(commands: Mapping[str, Dict], aliases: Mapping[str, Any], name: str) -> Optional[Dict]:
+    """Resolve a command name or alias to the command details."""
+    # Check if this is a direct command name
+    if name in commands:
+        return {"action": name, **commands[name]}
+    
+    # Check if this is an alias
+    if name in aliases:
+        target = aliases[name]
+        if isinstance(target, str) and target in commands:
+            return {"action": target, **commands[target]}
+    
+    return None
 
-try:
-    nltk.data.find('tokenizers/punkt_tab')  
-except LookupError:
-    nltk.download('punkt_tab', quiet=True)
 
 class CommandRegistry:
-    """Registry for available commands and their parameters."""
+    """
+    Registry for available commands and their parameters.
+    
+    Commands and aliases are registered per source ("builtin", one source
+    per plugin) and can be added or removed incrementally. Every change
+    bumps ``version`` and is reported to listeners as a delta.
+    """
     
-    def __init__(self):
+    def __init__(self, load_commands: bool = True):
+        """
+        Initialize the registry.
+        
+        Args:
+            load_commands: Load the built-in and legacy plugin commands; when
+                False the registry starts empty
+        """
         self.commands = {}
         self.aliases = {}
-        self._load_builtin_commands()
-        self._load_plugin_commands()
+        # Parameter extraction tables ("extract" in a command's details),
+        # kept apart from the command metadata
+        self.extract_tables = {}
+        # Bumped whenever commands or aliases change; caches key on it
+        self.version = 0
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._snapshot = None
+        # Which source registered each command and alias
+        self._sources = {}
+        self._command_owners = {}
+        self._alias_owners = {}
+        self._plugin_source = None
+        self._plugin_generation = None
+        # Similarity index: token -> commands, command -> cached token sets
+        self._index = {}
+        self._token_sets = {}
+        if load_commands:
+            self._load_builtin_commands()
+            self._load_plugin_commands()
+        self.version = 0
+    
+    @classmethod
+    def from_snapshot(cls, version: int, commands: Dict[str, Dict],
+                      aliases: Dict[str, Any],
+                      extract_tables: Optional[Dict[str, Dict]] = None) -> "CommandRegistry":
+        """
+        Build a standalone registry holding a copy of another registry's contents.
+        
+        Used by parser worker processes, which cannot share the parent's
+        registry. The copy never loads plugins itself.
+        
+        Args:
+            version: Version of the registry the contents were taken from
+            commands: Registry commands
+            aliases: Registry aliases
+            extract_tables: Registry parameter extraction tables
+            
+        Returns:
+            A registry at the given version
+        """
+        extract_tables = extract_tables or {}
+        commands = {
+            name: dict(info, extract=extract_tables[name]) if name in extract_tables else info
+            for name, info in commands.items()
+        }
+        registry = cls(load_commands=False)
+        registry.register("snapshot", commands, aliases)
+        registry.version = version
+        return registry
+    
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback for registry changes.
+        
+        Args:
+            callback: Called with a delta dictionary (version, source,
+                added/removed commands and aliases) after every change
+        """
+        with self._lock:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Remove a previously registered change callback."""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+    
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        Get a read-only snapshot of the current commands and aliases.
+        
+        Snapshots are cached per version, so this is cheap on the request path.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = RegistrySnapshot(
+                    self.version,
+                    MappingProxyType(self.commands),
+                    MappingProxyType(self.aliases),
+                    MappingProxyType(self.extract_tables)
+                )
+            return self._snapshot
+    
+    def register(self, source: str, commands: Dict[str, Dict] = None,
+                 aliases: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Add or replace the commands and aliases provided by a source.
+        
+        Anything the source registered before but no longer provides is removed.
+        
+        Args:
+            source: Name of the provider, e.g. "builtin" or "plugin:weather"
+            commands: Full command names mapped to their details; an
+                "extract" table in the details goes to extract_tables
+            aliases: Aliases mapped to command names or value lists
+            
+        Returns:
+            The delta that was applied
+        """
+        commands = dict(commands or {})
+        aliases = dict(aliases or {})
+        
+        with self._lock:
+            old_commands, old_aliases = self._sources.get(source, (set(), set()))
+            removed_commands = [c for c in old_commands
+                                if c not in commands and self._command_owners.get(c) == source]
+            removed_aliases = [a for a in old_aliases
+                               if a not in aliases and self._alias_owners.get(a) == source]
+            
+            delta = self._apply(source, commands, aliases, removed_commands, removed_aliases)
+            self._sources[source] = (set(commands), set(aliases))
+        
+        self._notify(delta)
+        return delta
+    
+    def unregister(self, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove every command and alias registered by a source.
+        
+        Args:
+            source: Name of the provider
+            
+        Returns:
+            The delta that was applied, or None if the source was unknown
+        """
+        with self._lock:
+            if source not in self._sources:
+                return None
+            
+            old_commands, old_aliases = self._sources.pop(source)
+            removed_commands = [c for c in old_commands if self._command_owners.get(c) == source]
+            removed_aliases = [a for a in old_aliases if self._alias_owners.get(a) == source]
+            
+            delta = self._apply(source, {}, {}, removed_commands, removed_aliases)
+        
+        self._notify(delta)
+        return delta
+    
+    def _apply(self, source: str, commands: Dict[str, Dict], aliases: Dict[str, Any],
+               removed_commands: List[str], removed_aliases: List[str]) -> Dict[str, Any]:
+        """Publish new command/alias dicts and update the index (lock held)."""
+        new_commands = dict(self.commands)
+        new_aliases = dict(self.aliases)
+        new_tables = dict(self.extract_tables)
+        
+        for name in removed_commands:
+            new_commands.pop(name, None)
+            new_tables.pop(name, None)
+            self._command_owners.pop(name, None)
+        for alias in removed_aliases:
+            new_aliases.pop(alias, None)
+            self._alias_owners.pop(alias, None)
+        
+        for name, info in commands.items():
+            if "extract" in info:
+                info = dict(info)
+                new_tables[name] = info.pop("extract")
+            else:
+                new_tables.pop(name, None)
+            new_commands[name] = info
+            self._command_owners[name] = source
+        new_aliases.update(aliases)
+        for alias in aliases:
+            self._alias_owners[alias] = source
+        
+        # Commands whose index entries change: added/removed ones and the
+        # targets of added/removed aliases
+        affected = set(commands) | set(removed_commands)
+        for alias in list(aliases) + removed_aliases:
+            target = aliases.get(alias, self.aliases.get(alias))
+            if isinstance(target, str):
+                affected.add(target)
+        
+        # Publish by replacement so existing snapshots stay unchanged
+        self.commands = new_commands
+        self.aliases = new_aliases
+        self.extract_tables = new_tables
+        self.version += 1
+        
+        for name in affected:
+            self._unindex_command(name)
+            if name in self.commands:
+                self._index_command(name)
+        
+        return {
+            "version": self.version,
+            "source": source,
+            "added_commands": list(commands),
+            "removed_commands": list(removed_commands),
+            "added_aliases": list(aliases),
+            "removed_aliases": list(removed_aliases)
+        }
+    
+    def _notify(self, delta: Dict[str, Any]):
+        """Send a delta to every listener."""
+        for listener in list(self._listeners):
+            try:
+                listener(delta)
+            except Exception as e:
+                logger.error(f"Error in command registry listener: {e}")
+    
+    def refresh(self) -> int:
+        """
+        Re-register legacy plugin commands if those plugins changed.
+        
+        Plugins managed by plugin_dev_kit.PluginManager register themselves
+        incrementally; this only covers the older bylexa.plugins manager,
+        which has no hooks and is detected through its generation counter.
+        
+        Returns:
+            The registry version after the check
+        """
+        source = self._plugin_source
+        if source is not None and getattr(source, 'generation', None) != self._plugin_generation:
+            logger.info("Legacy plugins changed, re-registering their commands")
+            self._load_plugin_commands()
+        return self.version
+    
+    def _index_command(self, cmd_name: str):
+        """
+        Add a command's name, description and aliases to the similarity index.
+        
+        Each text is stored as a token set so queries never re-split it.
+        """
+        cmd_info = self.commands[cmd_name]
+        texts = [cmd_name]
+        if "description" in cmd_info:
+            texts.append(cmd_info["description"])
+        texts.extend(
+            alias for alias, target in self.aliases.items()
+            if isinstance(target, str) and target == cmd_name
+        )
+        
+        token_sets = [frozenset(text.lower().split()) for text in texts]
+        self._token_sets[cmd_name] = [tokens for tokens in token_sets if tokens]
+        for tokens in self._token_sets[cmd_name]:
+            for token in tokens:
+                self._index.setdefault(token, set()).add(cmd_name)
+    
+    def _unindex_command(self, cmd_name: str):
+        """Remove a command from the similarity index."""
+        for tokens in self._token_sets.pop(cmd_name, []):
+            for token in tokens:
+                commands = self._index.get(token)
+                if commands is not None:
+                    commands.discard(cmd_name)
+                    if not commands:
+                        del self._index[token]
     
     def _load_builtin_commands(self):
         """Load built-in commands and their parameters."""
         # Define core commands with their parameters and aliases
-        self.commands = {
+        commands = {
             "open": {
                 "params": ["application", "task", "file_path"],
                 "required": ["application"],
-                "description": "Open an application or file"
+                "description": "Open an application or file",
+                "extract": {
+                    "application": {"from": "object"},
+                    "task": {"from": "prep_object"}
+                }
             },
             "script": {
                 "params": ["script_name", "args", "parameters"],
@@ -52,32 +393,66 @@ class CommandRegistry:
             "run": {
                 "params": ["command_line"],
                 "required": ["command_line"],
-                "description": "Execute a shell command"
+                "description": "Execute a shell command",
+                "extract": {
+                    "command_line": {"from": "rest"}
+                }
             },
             "file": {
                 "params": ["file_action", "source", "destination"],
                 "required": ["file_action", "source"],
-                "description": "Perform file operations"
+                "description": "Perform file operations",
+                "extract": {
+                    "file_action": {"keywords": {
+                        "copy": "copy", "duplicate": "copy",
+                        "move": "move", "relocate": "move",
+                        "delete": "delete", "remove": "delete",
+                        "create": "create_directory", "make": "create_directory"
+                    }},
+                    "source": {"from": "path", "index": 0},
+                    "destination": {"from": "path", "index": 1, "when": {"file_action": ["copy", "move"]}}
+                }
             },
             "clipboard": {
                 "params": ["clipboard_action", "text"],
                 "required": ["clipboard_action"],
-                "description": "Interact with clipboard"
+                "description": "Interact with clipboard",
+                "extract": {
+                    "text": {"from": "quoted"}
+                }
             },
             "media": {
                 "params": ["media_action", "media", "seek_time", "volume_level"],
                 "required": ["media_action"],
-                "description": "Control media playback"
+                "description": "Control media playback",
+                "extract": {
+                    "media_action": {"keywords": {
+                        "play": "play", "start": "play", "resume": "play",
+                        "pause": "pause", "stop": "pause",
+                        "next": "next", "previous": "previous", "skip": "next",
+                        "mute": "mute", "unmute": "unmute",
+                        "increase": "volume_up", "decrease": "volume_down",
+                        "turn up": "volume_up", "turn down": "volume_down"
+                    }},
+                    "volume_level": {
+                        "pattern": r"(\d+)(?:\s*%|\s*percent)",
+                        "type": "int",
+                        "sets": {"media_action": "volume"}
+                    }
+                }
             },
             "close": {
                 "params": ["application"],
                 "required": ["application"],
-                "description": "Close an application"
+                "description": "Close an application",
+                "extract": {
+                    "application": {"from": "object"}
+                }
             }
         }
         
         # Define aliases for commands and actions
-        self.aliases = {
+        aliases = {
             # Command aliases
             "launch": "open",
             "start": "open",
@@ -97,132 +472,290 @@ class CommandRegistry:
             "play_action": ["play", "start playback", "resume"],
             "pause_action": ["pause", "stop playback"],
         }
+        
+        self.register("builtin", commands, aliases)
     
     def _load_plugin_commands(self):
-        """Load commands from installed plugins."""
+        """Register commands from plugins of the legacy bylexa.plugins manager."""
         try:
             # Import plugin_manager only when needed to avoid circular imports
             from .plugins import plugin_manager
-            
-            for plugin_id, plugin in plugin_manager.plugins.items():
-                if not plugin['enabled']:
-                    continue
-                
-                # Check if the plugin defines commands
-                if hasattr(plugin['module'], 'get_commands'):
-                    try:
-                        plugin_commands = plugin['module'].get_commands()
-                        for cmd_name, cmd_info in plugin_commands.items():
-                            self.commands[f"{plugin_id}.{cmd_name}"] = cmd_info
-                    except Exception as e:
-                        logger.error(f"Error loading commands from plugin {plugin_id}: {e}")
-                
-                # Check if the plugin defines aliases
-                if hasattr(plugin['module'], 'get_aliases'):
-                    try:
-                        plugin_aliases = plugin['module'].get_aliases()
-                        for alias, target in plugin_aliases.items():
-                            self.aliases[alias] = target
-                    except Exception as e:
-                        logger.error(f"Error loading aliases from plugin {plugin_id}: {e}")
-        
         except ImportError:
             logger.warning("Plugin manager not available, skipping plugin commands.")
+            return
+        
+        self._plugin_source = plugin_manager
+        self._plugin_generation = getattr(plugin_manager, 'generation', None)
+        
+        registered = set()
+        for plugin_id, plugin in plugin_manager.plugins.items():
+            if not plugin['enabled']:
+                continue
+            
+            commands = {}
+            aliases = {}
+            
+            # Check if the plugin defines commands
+            if hasattr(plugin['module'], 'get_commands'):
+                try:
+                    plugin_commands = plugin['module'].get_commands()
+                    for cmd_name, cmd_info in plugin_commands.items():
+                        commands[f"{plugin_id}.{cmd_name}"] = cmd_info
+                except Exception as e:
+                    logger.error(f"Error loading commands from plugin {plugin_id}: {e}")
+            
+            # Check if the plugin defines aliases
+            if hasattr(plugin['module'], 'get_aliases'):
+                try:
+                    aliases.update(plugin['module'].get_aliases())
+                except Exception as e:
+                    logger.error(f"Error loading aliases from plugin {plugin_id}: {e}")
+            
+            source = f"legacy:{plugin_id}"
+            self.register(source, commands, aliases)
+            registered.add(source)
+        
+        # Drop plugins that were disabled or uninstalled
+        for source in [s for s in self._sources if s.startswith("legacy:") and s not in registered]:
+            self.unregister(source)
     
     def get_command(self, name: str) -> Optional[Dict]:
         """Get command details by name or alias."""
-        # Check if this is a direct command name
-        if name in self.commands:
-            return {"action": name, **self.commands[name]}
-        
-        # Check if this is an alias
-        if name in self.aliases:
-            target = self.aliases[name]
-            if isinstance(target, str) and target in self.commands:
-                return {"action": target, **self.commands[target]}
-        
-        return None
+        return _lookup_command(self.commands, self.aliases, name)
     
     def get_similar_commands(self, name: str, threshold: float = 0.7) -> List[Dict]:
-        """Get commands similar to the given name."""
-        similar_commands = []
+        """
+        Get commands similar to the given name.
+        
+        A command's similarity is the best Jaccard word overlap between the
+        name and the command's name, description or any of its aliases.
+        Only commands sharing at least one word with the name are scored,
+        found through the inverted index.
+        """
+        query = frozenset(name.lower().split())
+        if not query:
+            return []
         
-        # Check direct commands and their descriptions
-        for cmd_name, cmd_info in self.commands.items():
-            similarity = self._calculate_similarity(name, cmd_name)
+        # Commands without a shared word score 0, which only a
+        # non-positive threshold accepts
+        if threshold <= 0:
+            candidates = set(self._token_sets)
+        else:
+            candidates = set()
+            for token in query:
+                candidates.update(self._index.get(token, ()))
+        
+        similar_commands = []
+        for cmd_name in candidates:
+            similarity = max(
+                (self._jaccard(query, tokens) for tokens in self._token_sets[cmd_name]),
+                default=0.0
+            )
             if similarity >= threshold:
                 similar_commands.append({
                     "action": cmd_name,
                     "similarity": similarity,
-                    **cmd_info
+                    **self.commands[cmd_name]
                 })
-            
-            # Also check the description
-            if "description" in cmd_info:
-                desc_similarity = self._calculate_similarity(name, cmd_info["description"])
-                if desc_similarity > similarity and desc_similarity >= threshold:
-                    # Update the existing entry if we already added it
-                    for i, cmd in enumerate(similar_commands):
-                        if cmd["action"] == cmd_name:
-                            similar_commands[i]["similarity"] = desc_similarity
-                            break
-                    else:
-                        # Otherwise add a new entry
-                        similar_commands.append({
-                            "action": cmd_name,
-                            "similarity": desc_similarity,
-                            **cmd_info
-                        })
-        
-        # Sort by similarity score descending
-        similar_commands.sort(key=lambda x: x["similarity"], reverse=True)
+        
+        # Sort by similarity score descending, then by name for stable output
+        similar_commands.sort(key=lambda x: (-x["similarity"], x["action"]))
         return similar_commands
     
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate text similarity between two strings."""
-        # Simple Jaccard similarity for now, could be enhanced
-        set1 = set(str1.lower().split())
-        set2 = set(str2.lower().split())
-        
-        if not set1 or not set2:
-            return 0.0
-            
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        
-        return intersection / union if union > 0 else 0.0
+    @staticmethod
+    def _jaccard(set1: frozenset, set2: frozenset) -> float:
+        """Jaccard similarity of two non-empty token sets."""
+        intersection = len(set1 & set2)
+        return intersection / (len(set1) + len(set2) - intersection)
+
+
+# Shared registry instance
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+def get_command_registry() -> CommandRegistry:
+    """Get the shared command registry that plugins register into."""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = CommandRegistry()
+    return _registry_instance
 
 
 class IntentParser:
     """Parser for extracting intents from natural language commands."""
     
-    def __init__(self, spacy_model: str = "en_core_web_sm"):
+    def __init__(self, spacy_model: str = "en_core_web_sm",
+                 pipeline_profile: str = DEFAULT_PIPELINE_PROFILE,
+                 cache_size: int = 512, cache_ttl: Optional[float] = 300.0,
+                 semantic_matching: bool = False, semantic_model: Optional[str] = None,
+                 semantic_threshold: float = 0.6,
+                 registry: Optional[CommandRegistry] = None):
         """
         Initialize the intent parser.
         
         Args:
             spacy_model: Name of the spaCy model to load
+            pipeline_profile: Name of the pipeline profile in PIPELINE_PROFILES,
+                which decides the spaCy components excluded at load time
+            cache_size: Maximum number of cached parse results; 0 disables the cache
+            cache_ttl: Seconds a cached parse result stays valid, or None for no expiry
+            semantic_matching: Suggest ambiguous-command options by embedding
+                similarity in addition to word overlap
+            semantic_model: Local sentence-transformers model for semantic
+                matching; spaCy vectors are used when None
+            semantic_threshold: Minimum cosine similarity for a semantic suggestion
+            registry: Command registry to parse against; the shared registry
+                from get_command_registry() when None
+        """
+        if pipeline_profile not in PIPELINE_PROFILES:
+            raise ValueError(
+                f"Unknown pipeline profile '{pipeline_profile}'. "
+                f"Available profiles: {', '.join(PIPELINE_PROFILES)}"
+            )
+        
+        self.command_registry = registry or get_command_registry()
+        self.spacy_model = spacy_model
+        
+        # Formulaic commands are resolved by compiled rules before spaCy
+        self.fast_path = FastPathMatcher(self.command_registry)
+        self.path_stats = PathStats(["structured", "fast_path", "nlp_path"])
+        
+        # Parameters are extracted by tables compiled from the registry
+        self.param_extractor = ParameterExtractor(self.command_registry)
+        
+        # Results are cached per registry version
+        self.cache = ParseCache(max_size=cache_size, ttl=cache_ttl)
+        self._registry_version = self.command_registry.version
+        # Serializes recompiling when several threads notice a registry change
+        self._sync_lock = threading.Lock()
+        
+        # Built by _load_models once the NLP models are loaded
+        self.semantic_matching = semantic_matching
+        self.semantic_model = semantic_model
+        self.semantic_threshold = semantic_threshold
+        self.semantic_matcher = None
+        self.pipeline_profile = pipeline_profile
+        
+        # The spaCy model is loaded on first use of self.nlp, or ahead of
+        # time on a background thread via warm_up()
+        self._nlp = None
+        self._nlp_lock = threading.Lock()
+        self._warmup_thread = None
+    
+    @property
+    def nlp(self):
+        """The spaCy pipeline, loaded on first access."""
+        if self._nlp is None:
+            self._load_nlp()
+        return self._nlp
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the spaCy pipeline has been loaded."""
+        return self._nlp is not None
+    
+    def _load_nlp(self):
+        """Load the spaCy model for the configured pipeline profile."""
+        with self._nlp_lock:
+            # Another thread may have finished loading while we waited
+            if self._nlp is not None:
+                return
+            
+            import spacy
+            
+            spacy_model = self.spacy_model
+            exclude = PIPELINE_PROFILES[self.pipeline_profile]
+            
+            # Load spaCy model without the components this profile excludes
+            try:
+                nlp = spacy.load(spacy_model, exclude=exclude)
+                logger.info(f"Loaded spaCy model: {spacy_model}")
+            except OSError:
+                logger.warning(f"spaCy model '{spacy_model}' not found. Downloading...")
+                spacy.cli.download(spacy_model)
+                nlp = spacy.load(spacy_model, exclude=exclude)
+                logger.info(f"Downloaded and loaded spaCy model: {spacy_model}")
+            
+            self._nlp = nlp
+            
+            logger.info(f"Pipeline profile '{self.pipeline_profile}' components: {nlp.pipe_names}")
+            for extractor, missing in self.missing_components().items():
+                logger.warning(
+                    f"Pipeline profile '{self.pipeline_profile}' lacks {missing} "
+                    f"used by {extractor}; falling back to heuristics"
+                )
+            
+            # Load any additional models or resources
+            self._load_models()
+    
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
         """
-        self.command_registry = CommandRegistry()
+        Load the NLP models ahead of the first command.
         
-        # Load spaCy model
+        Args:
+            background: Load on a daemon thread instead of blocking the caller
+            
+        Returns:
+            The warm-up thread if loading in the background, None otherwise
+        """
+        if background:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(
+                    target=self._warm_up_models,
+                    name="bylexa-nlp-warmup",
+                    daemon=True
+                )
+                self._warmup_thread.start()
+            return self._warmup_thread
+        
+        self._warm_up_models()
+        return None
+    
+    def _warm_up_models(self):
+        """Load the spaCy pipeline and the NLTK tokenizer data."""
         try:
-            self.nlp = spacy.load(spacy_model)
-            logger.info(f"Loaded spaCy model: {spacy_model}")
-        except OSError:
-            logger.warning(f"spaCy model '{spacy_model}' not found. Downloading...")
-            spacy.cli.download(spacy_model)
-            self.nlp = spacy.load(spacy_model)
-            logger.info(f"Downloaded and loaded spaCy model: {spacy_model}")
+            self.nlp
+            _ensure_nltk_data()
+            logger.info("NLP models warmed up")
+        except Exception as e:
+            logger.error(f"Error warming up NLP models: {str(e)}")
+    
+    def missing_components(self) -> Dict[str, List[str]]:
+        """
+        Get the pipeline components each extractor needs but the loaded model lacks.
         
-        # Load any additional models or resources
-        self._load_models()
+        Returns:
+            Dictionary mapping extractor names to their missing components
+        """
+        loaded = set(self.nlp.pipe_names)
+        missing = {}
+        for extractor, components in EXTRACTOR_COMPONENTS.items():
+            absent = [c for c in components if c not in loaded]
+            if absent:
+                missing[extractor] = absent
+        return missing
     
     def _load_models(self):
         """Load any additional models or embeddings needed."""
-        # This could be extended to load tensorflow/pytorch models,
-        # word embeddings, etc. as the system scales
-        pass
+        if not self.semantic_matching:
+            return
+        
+        from .semantic_matcher import SemanticMatcher, spacy_embedder, sentence_transformer_embedder
+        
+        try:
+            if self.semantic_model:
+                embed = sentence_transformer_embedder(self.semantic_model)
+            else:
+                embed = spacy_embedder(self._nlp)
+            
+            matcher = SemanticMatcher(embed)
+            matcher.sync(self.command_registry.commands, self.command_registry.aliases)
+            self.semantic_matcher = matcher
+            logger.info(f"Semantic matcher ready with {len(matcher)} commands")
+        except Exception as e:
+            logger.error(f"Error loading semantic matcher, using word overlap only: {str(e)}")
     
     def parse_command(self, text: str) -> Dict[str, Any]:
         """
@@ -234,18 +767,277 @@ class IntentParser:
         Returns:
             Dictionary with parsed command structure and status
         """
-        logger.info(f"Parsing command: '{text}'")
+        logger.info("Parsing command: '%s'", text)
         
-        # Skip processing if text is empty
-        if not text or text.strip() == "":
-            return {"status": "error", "message": "Empty command"}
+        result, version = self.parse_quick(text)
+        if result is not None:
+            return result
+        
+        start = time.perf_counter()
         
         # Process text with spaCy for NER, POS tagging, etc.
         doc = self.nlp(text)
+        result = self._parse_doc(text, doc)
+        
+        self.record_nlp_result(text, version, result, (time.perf_counter() - start) * 1000)
+        return result
+    
+    def parse_quick(self, text: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Parse a command only if that doesn't need the spaCy model.
+        
+        Empty, cached, structured and fast-path commands are answered here;
+        everything else is left to the caller, e.g. a parser worker process.
+        
+        Args:
+            text: Natural language command text
+            
+        Returns:
+            Tuple of (parse result or None if spaCy is needed, registry version
+            the result belongs to)
+        """
+        version = self._sync_registry()
+        
+        # Skip processing if text is empty
+        if not text or text.strip() == "":
+            return {"status": "error", "message": "Empty command"}, version
+        
+        # Repeated utterances are answered from the cache
+        result = self.cache.get(text, version)
+        if result is not None:
+            return result, version
+        
+        # Structured and formulaic commands don't need the NLP models at all
+        result = self._parse_without_nlp(text)
+        if result is not None:
+            self.cache.put(text, version, result)
+        return result, version
+    
+    def match_tokens(self, text: str, tokens: Tuple[List[str], List[str], List[bool], List[int]],
+                     vocabulary_only: bool = False) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], int]:
+        """
+        Match already tokenized text on the fast path, e.g. a streaming transcript.
+        
+        Args:
+            text: Command text with trailing punctuation removed
+            tokens: Output of ``FastPathMatcher.tokenize(text)``
+            vocabulary_only: See ``FastPathMatcher.match_tokens``
+            
+        Returns:
+            Tuple of (command action and parameters, or None if no rule
+            matches; registry version the match belongs to)
+        """
+        version = self._sync_registry()
+        return self.fast_path.match_tokens(text, *tokens, vocabulary_only=vocabulary_only), version
+    
+    def record_fast_path_result(self, text: str, version: int,
+                                match: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build, cache and count the result of a match from ``match_tokens``.
+        
+        Args:
+            text: Command text the match was made on
+            version: Registry version returned by ``match_tokens``
+            match: Command action and parameters
+            
+        Returns:
+            Parse result
+        """
+        start = time.perf_counter()
+        result = self._build_result(text, *match)
+        self.path_stats.record("fast_path", (time.perf_counter() - start) * 1000)
+        self.cache.put(text, version, result)
+        return result
+    
+    def record_nlp_result(self, text: str, version: int, result: Dict[str, Any], elapsed_ms: float):
+        """
+        Cache and count a result produced by the spaCy path.
+        
+        Args:
+            text: Command text
+            version: Registry version returned by ``parse_quick``
+            result: Parse result
+            elapsed_ms: Time the spaCy parse took
+        """
+        self.path_stats.record("nlp_path", elapsed_ms)
+        self.cache.put(text, version, result)
+    
+    def _sync_registry(self) -> int:
+        """
+        Pick up registry changes, recompiling rules and dropping stale cache entries.
+        
+        Safe to call from several parsing threads at once: one recompiles
+        while the others keep parsing with the previous rules.
+        
+        Returns:
+            The registry version the rules were compiled from
+        """
+        version = self.command_registry.refresh()
+        if version == self._registry_version:
+            return version
+        
+        with self._sync_lock:
+            # Both rule sets come from one snapshot, which may be newer than
+            # the version seen above
+            snapshot = self.command_registry.snapshot()
+            if snapshot.version != self._registry_version:
+                self.fast_path.compile(snapshot)
+                self.param_extractor.compile(snapshot)
+                self.cache.invalidate()
+                if self.semantic_matcher is not None:
+                    self.semantic_matcher.sync(snapshot.commands, snapshot.aliases)
+                self._registry_version = snapshot.version
+            return self._registry_version
+    
+    def parse_commands(self, texts: List[str], batch_size: int = 64,
+                       n_process: int = 1) -> List[Dict[str, Any]]:
+        """
+        Parse several natural language commands in one batch.
+        
+        Texts are streamed through spaCy's ``nlp.pipe`` so the pipeline
+        overhead is paid per batch instead of per utterance. The result for
+        each text is identical to calling ``parse_command`` on it.
+        
+        Args:
+            texts: Natural language command texts
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of processes spaCy uses for the pipeline
+            
+        Returns:
+            List of parse results, in the same order as ``texts``
+        """
+        texts = list(texts)
+        logger.info("Parsing %d commands in batch", len(texts))
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        
+        version = self._sync_registry()
+        
+        # Empty, cached and structured texts never reach spaCy, same as parse_command
+        pending = []
+        for i, text in enumerate(texts):
+            if not text or text.strip() == "":
+                results[i] = {"status": "error", "message": "Empty command"}
+                continue
+            
+            result = self.cache.get(text, version)
+            if result is None:
+                result = self._parse_without_nlp(text)
+                if result is not None:
+                    self.cache.put(text, version, result)
+            
+            if result is not None:
+                results[i] = result
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return results
         
+        start = time.perf_counter()
+        
+        docs = self.nlp.pipe(
+            (texts[i] for i in pending),
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        for i, doc in zip(pending, docs):
+            results[i] = self._parse_doc(texts[i], doc)
+            self.cache.put(texts[i], version, results[i])
+        
+        # Spread the batch time evenly over the commands it parsed
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for _ in pending:
+            self.path_stats.record("nlp_path", elapsed_ms / len(pending))
+        
+        return results
+    
+    def _parse_without_nlp(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Try the paths that resolve a command without spaCy.
+        
+        Args:
+            text: Non-empty command text
+            
+        Returns:
+            Parse result if a structured or fast-path rule resolved the
+            command, None if it needs the spaCy path
+        """
+        start = time.perf_counter()
+        
+        result = self._parse_structured(text)
+        if result is not None:
+            self.path_stats.record("structured", (time.perf_counter() - start) * 1000)
+            return result
+        
+        match = self.fast_path.match(text)
+        if match is not None:
+            command_action, parameters = match
+            logger.info("Fast path matched: %s %s", command_action, parameters)
+            result = self._build_result(text, command_action, parameters)
+            self.path_stats.record("fast_path", (time.perf_counter() - start) * 1000)
+            return result
+        
+        return None
+    
+    def get_path_stats(self) -> Dict[str, Any]:
+        """
+        Get hit-rate and latency counters for each parsing path.
+        
+        Returns:
+            Dictionary with counters for the structured, fast and spaCy paths
+        """
+        return self.path_stats.snapshot()
+    
+    def _parse_structured(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a command that is already structured as a JSON object.
+        
+        Remote clients and scripts often send '{"action": "media",
+        "media_action": "pause"}' instead of natural language. These are
+        validated against the registry directly, without loading spaCy.
+        
+        Args:
+            text: Command text
+            
+        Returns:
+            Parse result if the text is a structured command, None otherwise
+        """
+        stripped = text.strip()
+        if not stripped.startswith("{"):
+            return None
+        
+        try:
+            command = json.loads(stripped)
+        except ValueError:
+            return None
+        
+        if not isinstance(command, dict) or not isinstance(command.get("action"), str):
+            return None
+        
+        command_info = self.command_registry.get_command(command["action"])
+        if not command_info:
+            return None
+        
+        command_action = command_info["action"]
+        parameters = {k: v for k, v in command.items() if k != "action"}
+        
+        return self._build_result(text, command_action, parameters)
+    
+    def _parse_doc(self, text: str, doc) -> Dict[str, Any]:
+        """
+        Build the parse result for a text from its processed spaCy doc.
+        
+        Args:
+            text: Original command text
+            doc: spaCy doc for ``text``
+            
+        Returns:
+            Dictionary with parsed command structure and status
+        """
         # Extract potential command/action
         command_action = self._extract_command_action(doc)
-        logger.info(f"Extracted command action: {command_action}")
+        logger.info("Extracted command action: %s", command_action)
         
         if not command_action:
             # Try to find similar commands
@@ -265,8 +1057,22 @@ class IntentParser:
         
         # Extract parameters for the command
         parameters = self._extract_parameters(doc, command_action)
-        logger.info(f"Extracted parameters: {parameters}")
+        logger.info("Extracted parameters: %s", parameters)
+        
+        return self._build_result(text, command_action, parameters)
+    
+    def _build_result(self, text: str, command_action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate an identified command and build its parse result.
         
+        Args:
+            text: Original command text
+            command_action: Identified command action
+            parameters: Extracted command parameters
+            
+        Returns:
+            Dictionary with parsed command structure and status
+        """
         # Validate the command structure
         validation_result = self._validate_command(command_action, parameters)
         
@@ -336,121 +1142,9 @@ class IntentParser:
     
     def _extract_parameters(self, doc, command_action: str) -> Dict[str, Any]:
         """Extract parameters for the given command from the parsed document."""
-        parameters = {}
-        
-        # Get command details to know what parameters to look for
-        command_info = self.command_registry.get_command(command_action)
-        if not command_info or "params" not in command_info:
-            return parameters
-        
-        # Extract parameters based on the command type
-        if command_action == "open":
-            # For "open" commands, look for application names and tasks
-            app_name = None
-            task = None
-            
-            # Look for direct objects which could be the application
-            for token in doc:
-                if token.dep_ == "dobj" and not app_name:
-                    app_name = token.text
-                    break
-            
-            # If no direct object, look for nouns after the verb
-            if not app_name:
-                verb_found = False
-                for token in doc:
-                    if verb_found and token.pos_ in ["NOUN", "PROPN"]:
-                        app_name = token.text
-                        break
-                    if token.lemma_ == "open":
-                        verb_found = True
-            
-            # Look for prepositional phrases that might contain the task
-            for token in doc:
-                if token.dep_ == "prep" and token.head.lemma_ == "open":
-                    for child in token.children:
-                        if child.dep_ == "pobj":
-                            task = child.text
-                            break
-            
-            if app_name:
-                parameters["application"] = app_name
-            if task:
-                parameters["task"] = task
-        
-        elif command_action == "media":
-            # For media commands, determine the specific media action
-            media_action = None
-            
-            # Check for specific media verbs
-            media_verbs = {
-                "play": "play", "start": "play", "resume": "play",
-                "pause": "pause", "stop": "pause",
-                "next": "next", "previous": "previous", "skip": "next",
-                "mute": "mute", "unmute": "unmute",
-                "increase": "volume_up", "decrease": "volume_down", 
-                "turn up": "volume_up", "turn down": "volume_down"
-            }
-            
-            for verb, action in media_verbs.items():
-                if verb in doc.text.lower():
-                    media_action = action
-                    break
-            
-            # Look for volume level specifications
-            volume_level = None
-            volume_pattern = re.search(r'(\d+)(?:\s*%|\s*percent)', doc.text)
-            if volume_pattern:
-                try:
-                    volume_level = int(volume_pattern.group(1))
-                    media_action = "volume"
-                except ValueError:
-                    pass
-            
-            if media_action:
-                parameters["media_action"] = media_action
-            if volume_level is not None:
-                parameters["volume_level"] = volume_level
-        
-        elif command_action == "file":
-            # For file commands, determine the file action and paths
-            file_action = None
-            source = None
-            destination = None
-            
-            # Map verbs to file actions
-            file_verbs = {
-                "copy": "copy", "duplicate": "copy",
-                "move": "move", "relocate": "move", 
-                "delete": "delete", "remove": "delete",
-                "create": "create_directory", "make": "create_directory"
-            }
-            
-            for verb, action in file_verbs.items():
-                if verb in doc.text.lower():
-                    file_action = action
-                    break
-            
-            # Extract file paths - this is a simplified version
-            # Real implementation would need to handle quoted paths, etc.
-            path_pattern = re.findall(r'["\'](.*?)["\']|(\S+\.\S+)', doc.text)
-            paths = [match[0] or match[1] for match in path_pattern if match[0] or match[1]]
-            
-            if paths:
-                source = paths[0]
-                if len(paths) > 1 and file_action in ["copy", "move"]:
-                    destination = paths[1]
-            
-            if file_action:
-                parameters["file_action"] = file_action
-            if source:
-                parameters["source"] = source
-            if destination:
-                parameters["destination"] = destination
-        
-        # Add more specialized parameter extraction for other command types
-        
-        return parameters
+        # Each command's "extract" table (or, for plugin commands, its
+        # parameter specs) drives the extraction; see ParameterExtractor
+        return self.param_extractor.extract(doc, command_action)
     
     def _validate_command(self, command_action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -484,6 +1178,9 @@ class IntentParser:
     
     def _find_potential_commands(self, text: str) -> List[Dict]:
         """Find potential commands based on the input text."""
+        from nltk.tokenize import word_tokenize
+        _ensure_nltk_data()
+        
         # Tokenize the text
         tokens = word_tokenize(text.lower())
         
@@ -497,6 +1194,17 @@ class IntentParser:
         similar_commands = self.command_registry.get_similar_commands(text.lower())
         potential_commands.extend(similar_commands)
         
+        # Add commands that are close in meaning rather than in wording
+        if self.semantic_matcher is not None:
+            for cmd_name, score in self.semantic_matcher.query(text, min_score=self.semantic_threshold):
+                cmd_info = self.command_registry.commands.get(cmd_name)
+                if cmd_info is not None:
+                    potential_commands.append({
+                        "action": cmd_name,
+                        "similarity": score,
+                        **cmd_info
+                    })
+        
         # Remove duplicates and sort by similarity
         unique_commands = {}
         for cmd in potential_commands:
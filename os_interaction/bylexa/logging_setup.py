@@ -0,0 +1,212 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+
+# Format of plain text records
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fields passed with ``extra=`` are included, so
+    ``logger.info("Executing command", extra={"action": "open"})`` can be
+    filtered on ``action`` by a log pipeline.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits how often the same message is logged.
+
+    Records are grouped by logger and message template (the format string
+    before its arguments are applied), and each group may log ``burst``
+    records and then ``rate`` records per second. The next record let
+    through reports how many were suppressed. Warnings at or above
+    ``exempt_level`` always pass.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 20, exempt_level: int = logging.ERROR):
+        """
+        Initialize the filter.
+
+        Args:
+            rate: Records per second allowed per message template
+            burst: Records allowed at once before the rate applies
+            exempt_level: Level from which records are never suppressed
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.exempt_level = exempt_level
+        # (logger, template) -> [tokens, last refill, suppressed]
+        self._buckets: Dict[Tuple[str, Any], list] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= 10000:
+                    # Messages formatted before logging never repeat a
+                    # template; don't let them grow the table forever
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _SuppressedFormatter(logging.Formatter):
+    """Text formatter noting how many similar records were suppressed."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        return text
+
+
+def setup_logging(level: Union[int, str] = logging.INFO,
+                  json_format: bool = False,
+                  module_levels: Optional[Dict[str, Union[int, str]]] = None,
+                  rate: Optional[float] = 5.0,
+                  burst: int = 20,
+                  log_file: Optional[Union[str, Path]] = None):
+    """
+    Configure logging for the whole process.
+
+    Records are put on a queue by the logging thread and written to stderr
+    (and ``log_file``) by a background listener thread, so callers never
+    wait for console or disk I/O. Calling this again replaces the previous
+    setup.
+
+    Args:
+        level: Root log level
+        json_format: Write JSON lines instead of plain text
+        module_levels: Log levels per logger name, e.g.
+            {"bylexa.intent_parser": "DEBUG", "websockets": "WARNING"}
+        rate: Records per second allowed per message template, or None to
+            disable rate limiting
+        burst: Records allowed at once per message template
+        log_file: Optional file records are also written to
+    """
+    global _listener, _queue_handler
+
+    formatter = JsonFormatter() if json_format else _SuppressedFormatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        log_path = Path(log_file).expanduser()
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(log_path, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    with _lock:
+        _stop_listener()
+
+        log_queue = queue.Queue(-1)
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        if rate is not None:
+            # Filter before the record is queued, so suppressed records
+            # cost no formatting at all
+            _queue_handler.addFilter(RateLimitFilter(rate, burst))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+
+        for name, module_level in (module_levels or {}).items():
+            logging.getLogger(name).setLevel(
+                module_level.upper() if isinstance(module_level, str) else module_level
+            )
+
+
+def setup_logging_from_config(config: Dict[str, Any]):
+    """
+    Configure logging from the application configuration.
+
+    Args:
+        config: Application configuration, see load_app_configs()
+    """
+    rate_limit = config.get('log_rate_limit', 5.0)
+    setup_logging(
+        level=config.get('log_level', 'INFO'),
+        json_format=config.get('log_format', 'text') == 'json',
+        module_levels=config.get('log_levels'),
+        rate=float(rate_limit) if rate_limit else None,
+        burst=int(config.get('log_rate_burst', 20)),
+        log_file=config.get('log_file')
+    )
+
+
+def _stop_listener():
+    """Flush and stop the listener thread (lock held)."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread."""
+    with _lock:
+        _stop_listener()
+
+
+atexit.register(shutdown_logging)
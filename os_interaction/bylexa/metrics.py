@@ -0,0 +1,324 @@
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple, Callable, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A gauge callback returns one value, or values by label values
+GaugeCallback = Callable[[], Union[float, Dict[Any, float]]]
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    """Render a label set, e.g. {action="open",status="executing"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Common parts of counters, gauges and histograms."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, label_values: Tuple[Any, ...]):
+        if len(label_values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {label_values}")
+
+    def render(self) -> List[str]:
+        """Render the metric family in the text format."""
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._render_samples()
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, per label values."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[Any, ...], float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        """
+        Increase the count.
+
+        Args:
+            *label_values: One value per label name, in order
+            amount: Amount to add
+        """
+        self._check(label_values)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        """Get the count for label values."""
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in values]
+
+
+class Gauge(_Metric):
+    """
+    Current value, per label values.
+
+    A gauge is either set directly or read from a callback when the
+    metrics are collected, so sampling a queue depth costs nothing until
+    someone scrapes it.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 callback: Optional[GaugeCallback] = None):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[Any, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, *label_values):
+        """
+        Set the value.
+
+        Args:
+            value: New value
+            *label_values: One value per label name, in order
+        """
+        self._check(label_values)
+        with self._lock:
+            self._values[label_values] = value
+
+    def _collect(self) -> Dict[Tuple[Any, ...], float]:
+        """Get the current values, from the callback if there is one."""
+        if self.callback is None:
+            with self._lock:
+                return dict(self._values)
+
+        try:
+            result = self.callback()
+        except Exception as e:
+            logger.error(f"Error collecting gauge {self.name}: {str(e)}")
+            return {}
+        if not isinstance(result, dict):
+            return {(): result}
+        return {labels if isinstance(labels, tuple) else (labels,): v for labels, v in result.items()}
+
+    def _render_samples(self) -> List[str]:
+        values = sorted(self._collect().items(), key=lambda item: tuple(map(str, item[0])))
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in values]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, per label values."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [per-bucket counts (last one above every bound), sum]
+        self._values: Dict[Tuple[Any, ...], List[Any]] = {}
+
+    def observe(self, value: float, *label_values):
+        """
+        Record an observation.
+
+        Args:
+            value: Observed value, e.g. seconds
+            *label_values: One value per label name, in order
+        """
+        self._check(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *label_values) -> int:
+        """Get the number of observations for label values."""
+        with self._lock:
+            entry = self._values.get(label_values)
+            return sum(entry[0]) if entry else 0
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(((labels, (list(counts), total)) for labels, (counts, total) in self._values.items()),
+                            key=lambda item: tuple(map(str, item[0])))
+
+        lines = []
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics of the process.
+
+    Metrics are created on first use and shared by name afterwards, so
+    modules can declare the metrics they update at import time.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+              callback: Optional[GaugeCallback] = None) -> Gauge:
+        """
+        Get or create a gauge.
+
+        Args:
+            name: Metric name
+            help_text: Description
+            labelnames: Label names
+            callback: Function returning the current value(s); replaces the
+                callback of an existing gauge, e.g. a restarted server's
+
+        Returns:
+            The gauge
+        """
+        gauge = self._get_or_create(Gauge, name, help_text, labelnames)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Find a metric by name."""
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves the metrics text at /metrics over HTTP from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "localhost", port: int = 9464):
+        """
+        Initialize the server; nothing listens until start().
+
+        Args:
+            registry: Metrics to serve
+            host: Hostname or IP to bind to
+            port: Port number to listen on; 0 picks a free port
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start listening."""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bylexa-metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        """Stop listening."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+
+# Global metrics registry
+_metrics_instance = None
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = MetricsRegistry()
+    return _metrics_instance
@@ -15,16 +15,15 @@ from .bylexa_orchestrator import get_bylexa_orchestrator
 from .community_registry import get_registry
 from .script_sandbox import validate_script
 from .ai_orchestrator import get_orchestrator
+from .config import load_app_configs
+from .logging_setup import setup_logging_from_config
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 @click.group()
 def main():
     """Bylexa - AI-powered automation middleware"""
-    pass
+    setup_logging_from_config(load_app_configs())
 
 @main.command()
 def login():
@@ -227,9 +226,19 @@ def publish(script_path, metadata_path):
         sys.exit(1)
 
 @main.command()
-@click.argument('text')
-def parse(text):
+@click.argument('text', required=False)
+@click.option('--file', '-f', 'file_path', type=click.Path(exists=True, dir_okay=False),
+              help='Parse every non-empty line of this file as a command.')
+@click.option('--batch-size', default=64, show_default=True,
+              help='Number of commands parsed per spaCy batch.')
+@click.option('--n-process', default=1, show_default=True,
+              help='Number of processes spaCy uses when parsing a file.')
+def parse(text, file_path, batch_size, n_process):
     """Parse a natural language command for testing."""
+    if not text and not file_path:
+        print("Error: TEXT or --file required")
+        sys.exit(1)
+    
     try:
         # Initialize AI components
         orchestrator = get_bylexa_orchestrator()
@@ -238,6 +247,20 @@ def parse(text):
         # Get AI orchestrator
         ai = get_orchestrator()
         
+        if file_path:
+            # Parse all lines of the file as one batch
+            with open(file_path, 'r') as f:
+                texts = [line.strip() for line in f if line.strip()]
+            
+            print(f"Parsing {len(texts)} commands from: {file_path}")
+            results = ai.parser.parse_commands(
+                texts, batch_size=batch_size, n_process=n_process
+            )
+            
+            # Print the results
+            print(json.dumps(results, indent=2))
+            return
+        
         # Parse the text
         print(f"Parsing text: {text}")
         result = ai.parser.parse_command(text)
@@ -0,0 +1,412 @@
+import re
+import logging
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Quoted strings, or bare tokens that contain a dot (file.txt)
+PATH_PATTERN = re.compile(r'["\'](.*?)["\']|(\S+\.\S+)')
+
+# First quoted string
+QUOTED_PATTERN = re.compile(r'"([^"]*)"|\'([^\']*)\'')
+
+# Value coercions for the "type" of a spec
+TYPE_COERCIONS = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": lambda value: str(value).lower() in ("true", "yes", "on", "1"),
+}
+
+# Dependency-parse based sources need a spaCy doc; the others work on text
+DOC_SOURCES = {"object", "prep_object"}
+
+
+class KeywordScanner:
+    """
+    Aho-Corasick automaton for finding many keywords in one pass.
+
+    Matches are reported only on word boundaries, so "start" does not
+    match inside "restart".
+    """
+
+    def __init__(self, keywords: List[str]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Lowercase keywords or phrases to search for
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in set(keywords):
+            self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword: str):
+        """Add a keyword to the trie."""
+        state = 0
+        for char in keyword:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append(keyword)
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Find all keyword occurrences in a lowercase text.
+
+        Returns:
+            List of (start offset, keyword) in order of their end offset
+        """
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                start = end - len(keyword) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if not before.isalnum() and not after.isalnum():
+                    matches.append((start, keyword))
+        return matches
+
+
+class _ExtractionTables(NamedTuple):
+    """Extraction tables compiled from one registry version."""
+    specs: Dict[str, List[Tuple[str, Dict[str, Any]]]]
+    verbs: Dict[str, set]
+    # keyword -> [(command, param, value, priority)]
+    keywords: Dict[str, List[Tuple[str, str, Any, int]]]
+    scanner: KeywordScanner
+
+
+class ParameterExtractor:
+    """
+    Table-driven parameter extraction.
+
+    Each command declares how its parameters are found in an "extract"
+    table next to its other registry details, e.g.::
+
+        "media_action": {"keywords": {"pause": "pause", "stop": "pause"}}
+        "volume_level": {"pattern": r"(\\d+)\\s*%", "type": "int",
+                         "sets": {"media_action": "volume"}}
+        "source": {"from": "path", "index": 0}
+        "application": {"from": "object"}
+
+    Plugin commands without a table get one derived from their
+    "parameters" specs ("name Bob", "count=3"). All tables are compiled
+    once: regexes are precompiled and every keyword of every command goes
+    into one Aho-Corasick scanner, so extraction is a single scan of the
+    text plus a single pass over the doc's tokens.
+    """
+
+    def __init__(self, registry):
+        """
+        Initialize the extractor.
+
+        Args:
+            registry: CommandRegistry whose commands declare the specs
+        """
+        self.registry = registry
+        self.compile()
+
+    def compile(self, snapshot=None):
+        """
+        (Re)compile the extraction tables from the registry.
+
+        The tables are built aside and published with one assignment, so
+        extractions running on other threads never see them half-built.
+
+        Args:
+            snapshot: RegistrySnapshot to compile; the registry's current one when None
+        """
+        if snapshot is None:
+            snapshot = self.registry.snapshot()
+        commands = snapshot.commands
+        aliases = snapshot.aliases
+        extract_tables = snapshot.extract_tables
+
+        all_specs: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        verbs: Dict[str, set] = {}
+        keywords: Dict[str, List[Tuple[str, str, Any, int]]] = {}
+
+        for cmd_name, cmd_info in commands.items():
+            table = extract_tables.get(cmd_name)
+            if table is None:
+                table = self._derive_table(cmd_info.get("parameters"))
+
+            specs = []
+            for param, spec in table.items():
+                compiled = dict(spec)
+                if "pattern" in spec:
+                    compiled["regex"] = re.compile(spec["pattern"], re.IGNORECASE)
+                for priority, (keyword, value) in enumerate(spec.get("keywords", {}).items()):
+                    keywords.setdefault(keyword.lower(), []).append(
+                        (cmd_name, param, value, priority)
+                    )
+                specs.append((param, compiled))
+            all_specs[cmd_name] = specs
+
+            # Words that introduce this command in an utterance
+            verbs[cmd_name] = {cmd_name.lower()} | {
+                alias.lower() for alias, target in aliases.items() if target == cmd_name
+            }
+
+        self._tables = _ExtractionTables(all_specs, verbs, keywords, KeywordScanner(list(keywords)))
+
+    @staticmethod
+    def _derive_table(parameters: Optional[Dict[str, Dict]]) -> Dict[str, Dict[str, Any]]:
+        """Build an extraction table from plugin parameter specs."""
+        table = {}
+        for param, param_info in (parameters or {}).items():
+            name = re.escape(param).replace("_", "[ _]")
+            table[param] = {
+                "pattern": rf'\b{name}\s*(?:=|:|is|of|to)?\s*("[^"]*"|\'[^\']*\'|\S+)',
+                "type": (param_info or {}).get("type", "str"),
+                "strip_quotes": True
+            }
+        return table
+
+    def has_specs(self, cmd_name: str) -> bool:
+        """Whether the command has any extraction specs."""
+        return bool(self._tables.specs.get(cmd_name))
+
+    def slots(self, cmd_name: str) -> List[str]:
+        """Names of the parameters the command has extraction specs for."""
+        return [param for param, _ in self._tables.specs.get(cmd_name, [])]
+
+    def extract(self, doc, command_action: str) -> Dict[str, Any]:
+        """
+        Extract parameters for a command from a parsed spaCy doc.
+
+        Args:
+            doc: spaCy doc of the utterance
+            command_action: The identified command
+
+        Returns:
+            Dictionary of the parameters that were found
+        """
+        tables = self._tables
+        specs = tables.specs.get(command_action)
+        if not specs:
+            return {}
+
+        features = self._scan_doc(tables, doc, command_action)
+        return self._evaluate(tables, doc.text, command_action, specs, features)
+
+    def extract_text(self, text: str, command_action: str,
+                     params: Optional[List[str]] = None,
+                     known: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Extract parameters from plain text, without a spaCy doc.
+
+        Only text-based specs (keywords, patterns, paths, quoted strings and
+        the rest of the text) are evaluated; dependency-based ones are skipped.
+
+        When only some parameters are requested, e.g. the ones a dialog
+        still asks for, the paths in the text fill the requested path
+        parameters in order: answering "backup/a.txt" when only the
+        destination (path index 1) is missing fills the destination.
+
+        Args:
+            text: Text to extract from
+            command_action: The command the parameters belong to
+            params: Only extract these parameters
+            known: Parameters already known, e.g. from an earlier turn; they
+                are used for "when" conditions but not returned
+
+        Returns:
+            Dictionary of the parameters that were found
+        """
+        tables = self._tables
+        specs = [
+            (param, spec) for param, spec in tables.specs.get(command_action, [])
+            if spec.get("from") not in DOC_SOURCES and (params is None or param in params)
+        ]
+        if not specs:
+            return {}
+
+        if params is not None:
+            path_specs = sorted(
+                (spec.get("index", 0), i) for i, (_, spec) in enumerate(specs) if spec.get("from") == "path"
+            )
+            for new_index, (_, i) in enumerate(path_specs):
+                param, spec = specs[i]
+                specs[i] = (param, dict(spec, index=new_index))
+
+        # Without a verb to anchor on, the whole text is the rest
+        return self._evaluate(tables, text, command_action, specs, {"rest": text.strip() or None}, known)
+
+    def param_type(self, command_action: str, param: str) -> Optional[str]:
+        """
+        Get the declared type of a parameter.
+
+        Args:
+            command_action: The command the parameter belongs to
+            param: Parameter name
+
+        Returns:
+            The type name from the extraction spec or, failing that, from the
+            command's "parameters" spec; None if undeclared
+        """
+        for name, spec in self._tables.specs.get(command_action, []):
+            if name == param and "type" in spec:
+                return spec["type"]
+        cmd_info = self.registry.get_command(command_action) or {}
+        return ((cmd_info.get("parameters") or {}).get(param) or {}).get("type")
+
+    def coerce(self, command_action: str, param: str, value: Any) -> Any:
+        """
+        Convert a value to the declared type of a parameter.
+
+        Args:
+            command_action: The command the parameter belongs to
+            param: Parameter name
+            value: Raw value
+
+        Returns:
+            The converted value; unchanged if the parameter has no type
+
+        Raises:
+            ValueError: If the value can't be converted
+        """
+        param_type = self.param_type(command_action, param)
+        if param_type is None:
+            return value
+        try:
+            return TYPE_COERCIONS.get(param_type, str)(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{value}' is not a valid {param_type} for {param}")
+
+    def _scan_doc(self, tables: _ExtractionTables, doc, command_action: str) -> Dict[str, Any]:
+        """Collect everything the doc-based specs need in one token pass."""
+        verbs = tables.verbs.get(command_action, set())
+        verb_index = None
+        root_verb = None
+        first_dobj = None
+        nouns_after_verb = []
+        preps = []
+
+        for token in doc:
+            if verb_index is None and (token.lemma_.lower() in verbs or token.lower_ in verbs):
+                verb_index = token.i
+            if root_verb is None and token.pos_ == "VERB" and token.dep_ in ("ROOT", "ccomp", "xcomp"):
+                root_verb = token.i
+            if first_dobj is None and token.dep_ == "dobj":
+                first_dobj = token
+            if token.pos_ in ("NOUN", "PROPN"):
+                nouns_after_verb.append(token)
+            if token.dep_ == "prep":
+                preps.append(token)
+
+        if verb_index is None:
+            verb_index = root_verb if root_verb is not None else 0
+
+        obj = first_dobj
+        if obj is None:
+            obj = next((t for t in nouns_after_verb if t.i > verb_index), None)
+
+        prep_object = None
+        for prep in preps:
+            if prep.head.i == verb_index:
+                prep_object = next((c for c in prep.children if c.dep_ == "pobj"), None)
+                if prep_object is not None:
+                    break
+
+        rest = doc[verb_index + 1:].text if verb_index + 1 < len(doc) else None
+
+        return {
+            "object": obj.text if obj is not None else None,
+            "prep_object": prep_object.text if prep_object is not None else None,
+            "rest": rest
+        }
+
+    def _evaluate(self, tables: _ExtractionTables, text: str, command_action: str,
+                  specs: List[Tuple[str, Dict[str, Any]]], features: Dict[str, Any],
+                  known: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Evaluate a command's specs against the text and collected doc features."""
+        lowered = text.lower()
+        parameters = {}
+        overrides = {}
+
+        # One scan finds the keywords of every spec; keep the highest
+        # priority (earliest declared) keyword per parameter
+        keyword_hits: Dict[str, Tuple[int, Any]] = {}
+        for _, keyword in tables.scanner.scan(lowered):
+            for cmd_name, param, value, priority in tables.keywords[keyword]:
+                if cmd_name == command_action:
+                    best = keyword_hits.get(param)
+                    if best is None or priority < best[0]:
+                        keyword_hits[param] = (priority, value)
+
+        paths = None
+        for param, spec in specs:
+            value = None
+            source = spec.get("from")
+
+            if "keywords" in spec:
+                hit = keyword_hits.get(param)
+                value = hit[1] if hit else None
+            elif "regex" in spec:
+                match = spec["regex"].search(text)
+                if match:
+                    value = match.group(spec.get("group", 1))
+                    if spec.get("strip_quotes") and value[:1] in ("'", '"') and value[-1:] == value[:1]:
+                        value = value[1:-1]
+            elif source == "path":
+                if paths is None:
+                    paths = [m[0] or m[1] for m in PATH_PATTERN.findall(text) if m[0] or m[1]]
+                index = spec.get("index", 0)
+                value = paths[index] if index < len(paths) else None
+            elif source == "quoted":
+                match = QUOTED_PATTERN.search(text)
+                if match:
+                    value = match.group(1) if match.group(1) is not None else match.group(2)
+            elif source in features:
+                value = features[source]
+
+            if value is None:
+                continue
+
+            if "type" in spec:
+                try:
+                    value = TYPE_COERCIONS.get(spec["type"], str)(value)
+                except (TypeError, ValueError):
+                    continue
+
+            parameters[param] = value
+            overrides.update(spec.get("sets", {}))
+
+        parameters.update(overrides)
+
+        # Drop parameters whose condition on another parameter fails
+        context = dict(known, **parameters) if known else parameters
+        for param, spec in specs:
+            condition = spec.get("when")
+            if param in parameters and condition:
+                if any(context.get(other) not in allowed for other, allowed in condition.items()):
+                    del parameters[param]
+
+        return parameters
@@ -0,0 +1,141 @@
+import copy
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of parser results with a time-to-live.
+
+    Entries are keyed on the utterance (outer whitespace stripped) plus the
+    command registry version, so a registry change never serves a result computed against
+    the old commands. Results are copied on the way in and out because
+    callers (e.g. the dialog manager) mutate the command dictionaries.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached results; 0 disables caching
+            ttl: Seconds a result stays valid, or None to never expire
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.max_size > 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize an utterance for use as a cache key.
+
+        Only outer whitespace is stripped: parameter values such as paths,
+        quoted names and shell command lines keep their case and inner
+        spacing, so utterances differing in either must not share a result.
+        """
+        return text.strip()
+
+    def get(self, text: str, version: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached result for an utterance.
+
+        Args:
+            text: Command text
+            version: Current command registry version
+
+        Returns:
+            A copy of the cached result with 'original_text' set to ``text``,
+            or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        key = (self.normalize(text), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, result = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        result = copy.deepcopy(result)
+        if "original_text" in result:
+            result["original_text"] = text
+        return result
+
+    def put(self, text: str, version: int, result: Dict[str, Any]):
+        """
+        Store the result for an utterance.
+
+        Args:
+            text: Command text
+            version: Command registry version the result was computed with
+            result: Parser result
+        """
+        if not self.enabled:
+            return
+
+        key = (self.normalize(text), version)
+        entry = (time.monotonic(), copy.deepcopy(result))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every cached result."""
+        with self._lock:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+        logger.info("Parse cache invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, limits and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,190 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+from .intent_parser import IntentParser, CommandRegistry, get_command_registry
+
+logger = logging.getLogger(__name__)
+
+# Parser owned by each worker process, created by _init_worker
+_worker_parser: Optional[IntentParser] = None
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the parser pool has no free slot within the queue timeout."""
+
+
+def _init_worker(parser_options: Dict[str, Any], version: int, commands: Dict[str, Dict],
+                 aliases: Dict[str, Any], extract_tables: Dict[str, Dict]):
+    """Create and preload the worker's parser from a copy of the parent's registry."""
+    global _worker_parser
+    registry = CommandRegistry.from_snapshot(version, commands, aliases, extract_tables)
+    # The parent caches results, so the workers don't
+    options = dict(parser_options, cache_size=0, registry=registry)
+    _worker_parser = IntentParser(**options)
+    _worker_parser.nlp  # Load the model before the first request arrives
+
+
+def _parse_in_worker(text: str) -> Tuple[Dict[str, Any], float]:
+    """Parse one command in a worker; returns the result and parse time in ms."""
+    start = time.perf_counter()
+    result = _worker_parser.parse_command(text)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _picklable(value: Any) -> Any:
+    """Drop callables (e.g. plugin handlers) so registry contents can be sent to workers."""
+    if isinstance(value, dict):
+        return {k: _picklable(v) for k, v in value.items() if not callable(v)}
+    if isinstance(value, (list, tuple)):
+        return [_picklable(v) for v in value if not callable(v)]
+    return value
+
+
+class ParserPool:
+    """
+    Pool of worker processes that run the spaCy parse off the event loop.
+
+    Each worker holds its own preloaded IntentParser built from a copy of
+    the command registry; the pool is recycled when the registry version
+    changes. At most ``max_pending`` parses are in flight; further
+    requests wait up to ``queue_timeout`` seconds for a slot and then fail
+    with PoolSaturatedError, so overload is pushed back to clients instead
+    of piling up.
+    """
+
+    def __init__(self, size: Optional[int] = None, parser_options: Optional[Dict[str, Any]] = None,
+                 max_pending: Optional[int] = None, queue_timeout: float = 1.0,
+                 registry: Optional[CommandRegistry] = None):
+        """
+        Initialize the pool. Workers are started on first use or by start().
+
+        Args:
+            size: Number of worker processes; defaults to CPU count - 1 (max 4)
+            parser_options: Keyword arguments for each worker's IntentParser
+            max_pending: Maximum parses in flight; defaults to 4 per worker
+            queue_timeout: Seconds to wait for a free slot before rejecting
+            registry: Command registry the workers copy; the shared one when None
+        """
+        self.size = size or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.parser_options = dict(parser_options or {})
+        self.max_pending = max_pending or self.size * 4
+        self.queue_timeout = queue_timeout
+        self.registry = registry or get_command_registry()
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.recycles = 0
+
+    def start(self):
+        """Start (or restart) the workers for the current registry version."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        """Replace the executor with one built from the current registry (lock held)."""
+        snapshot = self.registry.snapshot()
+        commands = _picklable(dict(snapshot.commands))
+        aliases = _picklable(dict(snapshot.aliases))
+        extract_tables = _picklable(dict(snapshot.extract_tables))
+
+        old_executor = self._executor
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.parser_options, snapshot.version, commands, aliases, extract_tables)
+        )
+        self._version = snapshot.version
+
+        if old_executor is not None:
+            # Parses already submitted to the old workers still complete
+            old_executor.shutdown(wait=False)
+            self.recycles += 1
+            logger.info(f"Parser pool recycled for registry version {snapshot.version}")
+        else:
+            logger.info(f"Parser pool started with {self.size} workers")
+
+    def _current_executor(self) -> ProcessPoolExecutor:
+        """Get the executor, (re)starting it if the registry changed."""
+        self.registry.refresh()
+        with self._lock:
+            if self._executor is None or self._version != self.registry.version:
+                self._start_locked()
+            return self._executor
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        """Get the in-flight slots for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_pending))
+        return self._slots[1]
+
+    async def parse(self, text: str) -> Tuple[Dict[str, Any], float]:
+        """
+        Parse a command in a worker process.
+
+        Args:
+            text: Natural language command text
+
+        Returns:
+            Tuple of (parse result, time the worker spent parsing in ms)
+
+        Raises:
+            PoolSaturatedError: If no slot became free within ``queue_timeout``
+        """
+        slots = self._loop_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PoolSaturatedError(
+                f"Parser pool saturated ({self.max_pending} commands in flight)"
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._current_executor(), _parse_in_worker, text)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with size, limits and in-flight/completed/rejected counters
+        """
+        return {
+            "size": self.size,
+            "running": self._executor is not None,
+            "registry_version": self._version,
+            "max_pending": self.max_pending,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "recycles": self.recycles
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+                logger.info("Parser pool stopped")
@@ -7,9 +7,8 @@ import functools
 from typing import Dict, List, Any, Optional, Callable, Union, Type
 from pathlib import Path
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from .intent_parser import get_command_registry
+
 logger = logging.getLogger(__name__)
 
 class PluginBase:
@@ -348,6 +347,9 @@ class PluginManager:
                 "class": plugin_class
             }
             
+            # Publish the plugin's commands to the shared registry
+            self._register_plugin_commands(plugin_id, plugin_instance)
+            
             logger.info(f"Plugin {plugin_id} loaded successfully")
             return True
             
@@ -381,6 +383,9 @@ class PluginManager:
             # Remove from loaded plugins
             del self.plugins[plugin_id]
             
+            # Withdraw the plugin's commands from the shared registry
+            get_command_registry().unregister(f"plugin:{plugin_id}")
+            
             # Remove module from sys.modules
             module_name = f"bylexa_plugin_{plugin_id}"
             if module_name in sys.modules:
@@ -393,6 +398,28 @@ class PluginManager:
             logger.error(f"Error unloading plugin {plugin_id}: {str(e)}")
             return False
     
+    def _register_plugin_commands(self, plugin_id: str, plugin_instance: PluginBase):
+        """
+        Register a loaded plugin's commands and aliases with the shared registry.
+        
+        Args:
+            plugin_id: ID of the plugin
+            plugin_instance: The loaded plugin instance
+        """
+        commands = {
+            f"{plugin_id}.{cmd_name}": cmd_info
+            for cmd_name, cmd_info in plugin_instance.get_commands().items()
+        }
+        
+        aliases = {}
+        if hasattr(plugin_instance, 'get_aliases'):
+            try:
+                aliases = plugin_instance.get_aliases()
+            except Exception as e:
+                logger.error(f"Error loading aliases from plugin {plugin_id}: {str(e)}")
+        
+        get_command_registry().register(f"plugin:{plugin_id}", commands, aliases)
+    
     def enable_plugin(self, plugin_id: str) -> bool:
         """
         Enable a plugin.
@@ -10,6 +10,8 @@ import shutil
 class PluginManager:
     def __init__(self):
         self.plugins: Dict[str, Any] = {}
+        # Bumped whenever the set of loaded or enabled plugins changes
+        self.generation = 0
         self.plugin_dir = Path.home() / '.bylexa' / 'plugins'
         self.plugin_dir.mkdir(parents=True, exist_ok=True)
         self.plugin_registry_url = "http://localhost:3000/api/plugins/registry"
@@ -41,6 +43,7 @@ class PluginManager:
                         }
             except Exception as e:
                 print(f"Error loading plugin {plugin_path}: {e}")
+        self.generation += 1
 
     def get_available_plugins(self) -> List[Dict[str, Any]]:
         """Fetch available plugins from registry"""
@@ -101,6 +104,7 @@ class PluginManager:
                 shutil.rmtree(plugin_path)
                 if plugin_id in self.plugins:
                     del self.plugins[plugin_id]
+                    self.generation += 1
                 return True
             return False
         except Exception as e:
@@ -118,6 +122,7 @@ class PluginManager:
                 with open(plugin_path, 'w') as f:
                     json.dump(metadata, f, indent=2)
                 self.plugins[plugin_id]['enabled'] = True
+                self.generation += 1
                 return True
             return False
         except Exception as e:
@@ -135,6 +140,7 @@ class PluginManager:
                 with open(plugin_path, 'w') as f:
                     json.dump(metadata, f, indent=2)
                 self.plugins[plugin_id]['enabled'] = False
+                self.generation += 1
                 return True
             return False
         except Exception as e:
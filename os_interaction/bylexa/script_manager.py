@@ -10,6 +10,10 @@ import tempfile
 from pathlib import Path
 import importlib.util
 import subprocess
+import logging
+
+logger = logging.getLogger(__name__)
+
 class ScriptManager:
     def __init__(self, scripts_directory: str):
         self.scripts_directory = Path(scripts_directory)
@@ -37,7 +41,7 @@ class ScriptManager:
             self._driver = webdriver.Chrome(service=service, options=chrome_options)
             return self._driver
         except Exception as e:
-            print(f"Error creating new driver: {str(e)}", file=sys.stderr)
+            logger.error("Error creating new driver: %s", e)
             return None
 
     def save_driver_session(self, driver: WebDriver) -> None:
@@ -57,7 +61,7 @@ class ScriptManager:
                     pass
             self._driver = None
         except Exception as e:
-            print(f"Error cleaning up session: {str(e)}", file=sys.stderr)
+            logger.error("Error cleaning up session: %s", e)
 
     def perform_script(self, script_path: str, args: list, parameters: Dict[str, Any]) -> str:
         """Executes a script with WebDriver session handling or directly using subprocess."""
@@ -16,9 +16,6 @@ import multiprocessing
 from multiprocessing import Process, Queue
 import signal
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class RestrictedEnvironment:
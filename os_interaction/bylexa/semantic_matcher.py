@@ -0,0 +1,173 @@
+import threading
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Maps a list of texts to a (len(texts), dim) array of embeddings
+Embedder = Callable[[List[str]], np.ndarray]
+
+
+def spacy_embedder(nlp) -> Embedder:
+    """
+    Create an embedder from a loaded spaCy pipeline.
+
+    Uses the pipeline's word vectors when it has them (the md/lg models);
+    otherwise falls back to the averaged tok2vec tensors of the small models.
+
+    Args:
+        nlp: Loaded spaCy pipeline
+
+    Returns:
+        Embedder function
+    """
+    if nlp.vocab.vectors.shape[0] == 0:
+        logger.warning(
+            "spaCy model has no static word vectors; semantic matching will "
+            "use context tensors, install a md/lg model for better results"
+        )
+
+    def embed(texts: List[str]) -> np.ndarray:
+        return np.array([doc.vector for doc in nlp.pipe(texts)], dtype=np.float32)
+
+    return embed
+
+
+def sentence_transformer_embedder(model_name: str) -> Embedder:
+    """
+    Create an embedder from a locally available sentence-transformers model.
+
+    Args:
+        model_name: Name or path of the model; it must already be cached
+            locally since matching runs offline
+
+    Returns:
+        Embedder function
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(texts: List[str]) -> np.ndarray:
+        return np.asarray(model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    return embed
+
+
+class SemanticMatcher:
+    """
+    Embedding-based command matcher.
+
+    Keeps one L2-normalized embedding row per registry command (its name,
+    description and aliases), so a query is scored against every command
+    with a single matrix-vector product. Rows are added, replaced and
+    removed incrementally as the registry changes.
+    """
+
+    def __init__(self, embed: Embedder):
+        """
+        Initialize the matcher.
+
+        Args:
+            embed: Function mapping texts to embedding vectors
+        """
+        self.embed = embed
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._texts: Dict[str, str] = {}
+        self._matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def command_text(cmd_name: str, cmd_info: Dict[str, Any], aliases: List[str] = ()) -> str:
+        """Build the text embedded for a command."""
+        words = cmd_name.replace(".", " ").replace("_", " ")
+        parts = [words, cmd_info.get("description", "")]
+        parts.extend(aliases)
+        return ". ".join(part for part in parts if part)
+
+    def sync(self, commands: Dict[str, Dict[str, Any]], aliases: Dict[str, Any] = None):
+        """
+        Bring the embedding matrix in line with the registry.
+
+        Only commands that are new or whose text changed are embedded;
+        removed commands have their rows dropped.
+
+        Args:
+            commands: Registry commands
+            aliases: Registry aliases; string aliases are added to their target's text
+        """
+        command_aliases: Dict[str, List[str]] = {}
+        for alias, target in (aliases or {}).items():
+            if isinstance(target, str):
+                command_aliases.setdefault(target, []).append(alias)
+
+        texts = {
+            name: self.command_text(name, info, command_aliases.get(name, []))
+            for name, info in commands.items()
+        }
+
+        with self._lock:
+            changed = [name for name, text in texts.items() if self._texts.get(name) != text]
+            removed = {name for name in self._texts if name not in texts}
+            if not changed and not removed:
+                return
+
+            # Drop rows for removed and changed commands
+            drop = removed | set(changed)
+            keep = [i for i, name in enumerate(self._names) if name not in drop]
+            names = [self._names[i] for i in keep]
+            matrix = self._matrix[keep] if self._matrix is not None and keep else None
+
+            # Embed new and changed commands and append their rows
+            if changed:
+                vectors = self._normalize(self.embed([texts[name] for name in changed]))
+                matrix = vectors if matrix is None else np.vstack([matrix, vectors])
+                names.extend(changed)
+
+            self._names = names
+            self._matrix = matrix
+            self._texts = {name: texts[name] for name in names}
+
+        logger.info(f"Semantic matcher synced: {len(changed)} embedded, {len(removed)} removed")
+
+    def query(self, text: str, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Find the commands most similar to a text.
+
+        Args:
+            text: Query text
+            top_k: Maximum number of commands to return
+            min_score: Minimum cosine similarity
+
+        Returns:
+            List of (command name, cosine similarity), best first
+        """
+        with self._lock:
+            names, matrix = self._names, self._matrix
+        if matrix is None or not names or top_k <= 0:
+            return []
+
+        query = self._normalize(self.embed([text]))[0]
+        scores = matrix @ query
+
+        # Select the top k rows without sorting the whole score vector
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        return [(names[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows, leaving all-zero rows as zeros."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,269 @@
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+from .intent_parser import IntentParser
+
+logger = logging.getLogger(__name__)
+
+# Characters that end an utterance without being part of the last word
+TRAILING_PUNCTUATION = ".!?"
+
+# Characters that open a quoted token
+QUOTES = "\"'"
+
+
+def _prefetch_open(command: Dict[str, Any]):
+    """Resolve the application's executable ahead of an 'open' command."""
+    from .actions import prefetch_executable
+    if command.get("application"):
+        prefetch_executable(command["application"])
+
+
+# Speculative work to start as soon as a command is committed, per action
+PREFETCHERS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "open": _prefetch_open,
+}
+
+
+def register_prefetcher(action: str, prefetcher: Callable[[Dict[str, Any]], None]):
+    """
+    Register speculative work for a command action.
+
+    Args:
+        action: Command action, e.g. "open"
+        prefetcher: Called with the committed command dictionary; it must
+            not have side effects beyond warming caches
+    """
+    PREFETCHERS[action] = prefetcher
+
+
+class StreamingParseSession:
+    """
+    Incremental parsing of a growing voice transcript.
+
+    Feed partial transcripts (or deltas) as the speech recognizer produces
+    them. Words that can no longer change are tokenized once and reused;
+    only the trailing word is re-tokenized per update, and the fast path
+    matches the kept tokens without tokenizing the transcript again. As
+    soon as the transcript so far resolves to a complete command whose
+    values all come from the registry's vocabulary, and its last word is
+    final, the session commits to it and starts the command's prefetcher.
+    Open-ended values such as an unknown application name are left to
+    finish(), since a partial transcript may have cut them short. If the
+    speaker keeps talking and the command no longer matches, the commit is
+    withdrawn.
+
+    finish() returns the committed result without any further parsing when
+    the final transcript is what was committed, and otherwise parses the
+    final transcript normally.
+    """
+
+    def __init__(self, parser: IntentParser, stable_updates: int = 2,
+                 on_commit: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize a session.
+
+        Args:
+            parser: Parser whose registry, fast path and cache are used
+            stable_updates: Number of consecutive updates a match must survive
+                before committing while its last word may still be growing
+            on_commit: Called with the parse result whenever the session commits
+        """
+        self.parser = parser
+        self.stable_updates = stable_updates
+        self.on_commit = on_commit
+
+        self.text = ""
+        # Tokens that later updates cannot change, in FastPathMatcher.tokenize form
+        self._tokens: Tuple[List[str], List[str], List[bool], List[int]] = ([], [], [], [])
+        self._token_ends: List[int] = []
+
+        self._last_match = None
+        self._match_streak = 0
+        self.committed: Optional[Dict[str, Any]] = None
+        self._committed_body: Optional[str] = None
+        self._committed_version: Optional[int] = None
+        self._prefetched = set()
+        self.finished = False
+
+        self.updates = 0
+        self.tokens_reused = 0
+        self.commits = 0
+        self.withdrawals = 0
+
+    def feed(self, delta: str) -> Dict[str, Any]:
+        """
+        Append newly recognized text to the transcript.
+
+        Args:
+            delta: Text to append
+
+        Returns:
+            Session state, see ``state``
+        """
+        return self.update(self.text + delta)
+
+    def update(self, transcript: str) -> Dict[str, Any]:
+        """
+        Replace the transcript with the recognizer's latest hypothesis.
+
+        Args:
+            transcript: Full partial transcript; it may revise earlier words
+
+        Returns:
+            Session state, see ``state``
+        """
+        if self.finished:
+            raise RuntimeError("Streaming parse session already finished")
+
+        self._retokenize(transcript)
+        self.text = transcript
+        self.updates += 1
+        self._evaluate()
+        return self.state()
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Get the session state.
+
+        Returns:
+            Dictionary with the transcript, 'committed' or 'listening' status,
+            the committed command if any, and the intent recognized so far
+        """
+        tokens, words, quoted, starts = self._tokens
+        intent, _ = self.parser.fast_path.match_verb(words)
+        return {
+            "status": "committed" if self.committed else "listening",
+            "text": self.text,
+            "intent": intent,
+            "command": self.committed["command"] if self.committed else None
+        }
+
+    def finish(self, transcript: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        End the session and get the parse result for the final transcript.
+
+        Args:
+            transcript: Final transcript; the last fed transcript when None
+
+        Returns:
+            Tuple of (final text, parse result)
+        """
+        if transcript is not None and transcript != self.text:
+            self.update(transcript)
+        self.finished = True
+
+        body = self._body()
+        if (self.committed is not None and body == self._committed_body
+                and self._committed_version == self.parser.command_registry.version):
+            logger.info(f"Voice command resolved before end of speech: '{self.text}'")
+            return self.text, self.committed
+
+        return self.text, self.parser.parse_command(self.text)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters for this session."""
+        return {
+            "updates": self.updates,
+            "tokens": len(self._tokens[0]),
+            "tokens_reused": self.tokens_reused,
+            "commits": self.commits,
+            "withdrawals": self.withdrawals
+        }
+
+    def _body(self) -> str:
+        """The transcript without trailing whitespace and punctuation."""
+        return self.text.rstrip().rstrip(TRAILING_PUNCTUATION)
+
+    def _retokenize(self, transcript: str):
+        """Update the token lists, keeping every token the new transcript didn't touch."""
+        # Keep stable tokens that lie entirely within the unchanged prefix
+        common = 0
+        limit = min(len(self.text), len(transcript))
+        while common < limit and self.text[common] == transcript[common]:
+            common += 1
+
+        keep = 0
+        for end, word, is_quoted in zip(self._token_ends, self._tokens[1], self._tokens[2]):
+            # A token is final once unchanged whitespace follows it, unless
+            # it opens a quote that a later word may close
+            if end >= common or not transcript[end].isspace():
+                break
+            if not is_quoted and word[:1] in QUOTES:
+                break
+            keep += 1
+
+        tokens, words, quoted, starts = (values[:keep] for values in self._tokens)
+        ends = self._token_ends[:keep]
+        self.tokens_reused += keep
+
+        # Re-tokenize everything after the kept tokens
+        body = transcript.rstrip().rstrip(TRAILING_PUNCTUATION)
+        pos = ends[-1] if ends else 0
+        tail = self.parser.fast_path.tokenize(body, pos)
+        for value, word, is_quoted, start in zip(*tail):
+            tokens.append(value)
+            words.append(word)
+            quoted.append(is_quoted)
+            starts.append(start)
+            ends.append(start + len(value) + (2 if is_quoted else 0))
+
+        self._tokens = (tokens, words, quoted, starts)
+        self._token_ends = ends
+
+    def _evaluate(self):
+        """Commit to, keep or withdraw the command matched by the transcript so far."""
+        body = self._body()
+        match, version = None, None
+        if body:
+            match, version = self.parser.match_tokens(body, self._tokens, vocabulary_only=True)
+
+        if match is not None and match == self._last_match:
+            self._match_streak += 1
+        else:
+            self._match_streak = 1 if match is not None else 0
+        self._last_match = match
+
+        if match is None:
+            if self.committed is not None:
+                logger.debug(f"Withdrawing commit for '{self.text}'")
+                self.committed = None
+                self._committed_body = None
+                self.withdrawals += 1
+            return
+
+        if self.committed is not None and self._committed_body == body:
+            return
+
+        # The last word may still grow ("open chr" -> "open chrome") unless
+        # it was followed by whitespace or punctuation, or has stayed the same
+        last_word_final = len(body) < len(self.text) or self._tokens[2][-1:] == [True]
+        if not last_word_final and self._match_streak < self.stable_updates:
+            return
+
+        result = self.parser.record_fast_path_result(body, version, match)
+        if result.get("status") != "clear":
+            return
+
+        self.committed = result
+        self._committed_body = body
+        self._committed_version = version
+        self.commits += 1
+        logger.info(f"Committed voice command early: {result['command']}")
+
+        self._prefetch(result["command"])
+        if self.on_commit is not None:
+            self.on_commit(result)
+
+    def _prefetch(self, command: Dict[str, Any]):
+        """Start the speculative work registered for the committed command."""
+        prefetcher = PREFETCHERS.get(command.get("action"))
+        key = repr(sorted(command.items()))
+        if prefetcher is None or key in self._prefetched:
+            return
+
+        self._prefetched.add(key)
+        try:
+            prefetcher(command)
+        except Exception as e:
+            logger.warning(f"Prefetch for {command.get('action')} failed: {str(e)}")
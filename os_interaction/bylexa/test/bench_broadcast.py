@@ -0,0 +1,112 @@
+# bench_broadcast.py
+import argparse
+import asyncio
+import json
+import time
+
+from bylexa.websocket_gateway import BylexaWSServer
+
+class FakeWebSocket:
+    """Accepts messages after a fixed delay, like a socket waiting to drain."""
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = 0
+
+    async def send(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+def make_room(server, members, delay, slow, slow_delay):
+    """Fill room 'bench' with fake clients, the first `slow` of them slow."""
+    sockets = []
+    for i in range(members):
+        conn_id = f"m{i}"
+        websocket = FakeWebSocket(slow_delay if i < slow else delay)
+        server.connections[conn_id] = websocket
+        server.connection_to_room[conn_id] = "bench"
+        sockets.append(websocket)
+    server.rooms["bench"] = set(server.connection_to_room)
+    return sockets
+
+async def sequential_broadcast(server, room_code, data):
+    """Room broadcast as it was done before fan-out: serialize and await per member."""
+    for conn_id in list(server.rooms[room_code]):
+        websocket = server.connections.get(conn_id)
+        if websocket is not None:
+            await websocket.send(json.dumps(data))
+
+async def run_broadcasts(members, broadcasts, delay, slow, slow_delay, send_timeout, sequential):
+    server = BylexaWSServer(send_timeout=send_timeout)
+    sockets = make_room(server, members, delay, slow, slow_delay)
+    data = {
+        "action": "broadcast",
+        "sender": "bench",
+        "message": "x" * 200,
+        "command": {"action": "open", "application": "notepad"},
+        "room_code": "bench"
+    }
+
+    latencies = []
+    for _ in range(broadcasts):
+        start = time.perf_counter()
+        if sequential:
+            await sequential_broadcast(server, "bench", data)
+        else:
+            await server._broadcast_to_room("bench", data)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Let evicted clients finish being removed
+    await asyncio.sleep(0)
+    await asyncio.gather(*list(server.handler_tasks), return_exceptions=True)
+
+    latencies.sort()
+    return {
+        "members": members,
+        "mode": "sequential" if sequential else "fan-out",
+        "first_ms": latencies[0] if broadcasts == 1 else None,
+        "p50_ms": latencies[len(latencies) // 2],
+        "max_ms": latencies[-1],
+        "delivered": sum(websocket.received for websocket in sockets),
+        "remaining_members": len(server.rooms.get("bench", ())),
+    }
+
+def bench_broadcast(sizes=(10, 100, 1000), broadcasts=20, delay=0.001, slow=0, slow_delay=1.0,
+                    send_timeout=0.25, compare=True):
+    print("=== Room Broadcast Benchmark ===")
+    print(f"Send delay {delay * 1000:.1f} ms, {slow} slow members ({slow_delay * 1000:.0f} ms), "
+          f"send timeout {send_timeout * 1000:.0f} ms, {broadcasts} broadcasts per run")
+
+    reports = []
+    for members in sizes:
+        modes = [False, True] if compare else [False]
+        for sequential in modes:
+            # A sequential run takes members x delay per broadcast; keep it short
+            count = min(broadcasts, 3) if sequential else broadcasts
+            report = asyncio.run(run_broadcasts(members, count, delay, slow, slow_delay,
+                                                send_timeout, sequential))
+            reports.append(report)
+            print(f"{members:>6} members, {report['mode']:<10}: p50 {report['p50_ms']:8.1f} ms, "
+                  f"max {report['max_ms']:8.1f} ms, {report['delivered']} delivered, "
+                  f"{report['remaining_members']} members left")
+    return reports
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Measure room broadcast latency for large rooms")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Room sizes to measure")
+    arg_parser.add_argument("--broadcasts", type=int, default=20, help="Broadcasts per room size")
+    arg_parser.add_argument("--delay", type=float, default=0.001, help="Seconds each send takes")
+    arg_parser.add_argument("--slow", type=int, default=0, help="Members that receive too slowly")
+    arg_parser.add_argument("--slow-delay", type=float, default=1.0, help="Seconds each send to a slow member takes")
+    arg_parser.add_argument("--send-timeout", type=float, default=0.25, help="Gateway send timeout in seconds")
+    arg_parser.add_argument("--no-compare", action="store_true", help="Skip the sequential baseline")
+    arg_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = arg_parser.parse_args()
+
+    report = bench_broadcast(args.sizes, args.broadcasts, args.delay, args.slow, args.slow_delay,
+                             args.send_timeout, not args.no_compare)
+    if args.json:
+        print(json.dumps(report, indent=2))
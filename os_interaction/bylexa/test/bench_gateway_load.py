@@ -0,0 +1,161 @@
+# bench_gateway_load.py
+import argparse
+import asyncio
+import json
+import time
+
+import websockets
+
+from bylexa.ai_orchestrator import init_orchestrator
+from bylexa.websocket_gateway import BylexaWSServer
+
+# Utterances that need the spaCy path (no fast-path rule matches them)
+NLP_COMMANDS = [
+    "please open the quarterly report in word",
+    "could you launch my browser for email",
+    "i want to hear some music now",
+    "close every window of firefox please",
+    "copy the notes from yesterday into the backup folder",
+]
+
+# Any token with JWT structure is accepted by the gateway
+TOKEN = "e30.e30.bench"
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def connect(uri):
+    websocket = await websockets.connect(uri, extra_headers={"Authorization": f"Bearer {TOKEN}"})
+    await websocket.recv()  # Welcome message
+    return websocket
+
+async def command_client(uri, client_id, count, results):
+    """Send commands back to back and record their round-trip times."""
+    websocket = await connect(uri)
+    try:
+        for i in range(count):
+            # A unique suffix keeps the parse cache from answering
+            text = f"{NLP_COMMANDS[i % len(NLP_COMMANDS)]} {client_id}x{i}"
+            start = time.perf_counter()
+            await websocket.send(json.dumps({"action": "command", "command": text}))
+            reply = json.loads(await websocket.recv())
+            results["command_ms"].append((time.perf_counter() - start) * 1000)
+            if reply.get("action") == "error":
+                results["errors"] += 1
+    finally:
+        await websocket.close()
+
+async def probe_client(uri, stop, latencies, interval=0.02):
+    """Measure gateway responsiveness with cheap queries while commands run."""
+    websocket = await connect(uri)
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await websocket.send(json.dumps({"action": "query", "query_type": "connections"}))
+            await websocket.recv()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(interval)
+    finally:
+        await websocket.close()
+
+async def run_load(port, clients, commands_per_client):
+    uri = f"ws://localhost:{port}"
+    server = BylexaWSServer(host="localhost", port=port)
+    server_task = asyncio.create_task(server.start())
+    await asyncio.sleep(0.5)
+
+    # Idle responsiveness
+    idle, stop = [], asyncio.Event()
+    probe = asyncio.create_task(probe_client(uri, stop, idle))
+    await asyncio.sleep(1.0)
+    stop.set()
+    await probe
+
+    # Responsiveness under concurrent command traffic
+    loaded, stop = [], asyncio.Event()
+    results = {"command_ms": [], "errors": 0}
+    probe = asyncio.create_task(probe_client(uri, stop, loaded))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        command_client(uri, i, commands_per_client, results) for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    await server.stop()
+    server_task.cancel()
+
+    idle.sort()
+    loaded.sort()
+    results["command_ms"].sort()
+    return {
+        "clients": clients,
+        "commands": len(results["command_ms"]),
+        "errors": results["errors"],
+        "throughput_per_s": len(results["command_ms"]) / elapsed,
+        "command_p50_ms": percentile(results["command_ms"], 50),
+        "command_p95_ms": percentile(results["command_ms"], 95),
+        "command_p99_ms": percentile(results["command_ms"], 99),
+        "probe_idle_p50_ms": percentile(idle, 50),
+        "probe_idle_p95_ms": percentile(idle, 95),
+        "probe_loaded_p50_ms": percentile(loaded, 50),
+        "probe_loaded_p95_ms": percentile(loaded, 95),
+        "probe_loaded_p99_ms": percentile(loaded, 99),
+        "probe_loaded_max_ms": loaded[-1] if loaded else 0.0,
+    }
+
+def bench_gateway_load(workers=2, clients=(8,), commands_per_client=20, port=8799):
+    # Without workers the parse runs in a thread of the gateway process
+    pool_options = {"size": workers} if workers > 0 else None
+    orchestrator = init_orchestrator({"cache_size": 0}, pool_options)
+
+    # Only measure parsing: parsed commands are queued but never run
+    orchestrator.executor.execute = lambda command: "skipped"
+
+    # Load the models before measuring
+    if orchestrator.parser_pool is not None:
+        orchestrator.parser_pool.start()
+
+        async def warm_up():
+            await asyncio.gather(*(orchestrator.parser_pool.parse(text) for text in NLP_COMMANDS[:workers * 2]))
+        asyncio.run(warm_up())
+    else:
+        orchestrator.parser.warm_up(background=False)
+
+    print("=== Gateway Load Benchmark ===")
+    print(f"Parser workers: {workers or 'none (thread)'}, commands per client: {commands_per_client}")
+
+    reports = []
+    for i, count in enumerate(clients):
+        # A fresh port per run; the previous listener may still be closing
+        report = asyncio.run(run_load(port + i, count, commands_per_client))
+        reports.append(report)
+
+        print(f"\n--- {count} concurrent clients ---")
+        print(f"Commands: {report['commands']} ({report['errors']} errors), {report['throughput_per_s']:.1f} cmd/s")
+        print(f"Command latency: p50 {report['command_p50_ms']:.1f} ms, p95 {report['command_p95_ms']:.1f} ms, "
+              f"p99 {report['command_p99_ms']:.1f} ms")
+        print(f"Probe latency idle:   p50 {report['probe_idle_p50_ms']:.2f} ms, p95 {report['probe_idle_p95_ms']:.2f} ms")
+        print(f"Probe latency loaded: p50 {report['probe_loaded_p50_ms']:.2f} ms, p95 {report['probe_loaded_p95_ms']:.2f} ms, "
+              f"p99 {report['probe_loaded_p99_ms']:.2f} ms, max {report['probe_loaded_max_ms']:.2f} ms")
+    orchestrator.stop()
+    return reports
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Load test the gateway with concurrent command traffic")
+    arg_parser.add_argument("--workers", type=int, default=2, help="Parser worker processes (0 = thread)")
+    arg_parser.add_argument("--clients", type=int, nargs="+", default=[8],
+                            help="Concurrent client counts to measure, e.g. 1 8 32")
+    arg_parser.add_argument("--commands", type=int, default=20, help="Commands per client")
+    arg_parser.add_argument("--port", type=int, default=8799)
+    arg_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = arg_parser.parse_args()
+
+    report = bench_gateway_load(args.workers, args.clients, args.commands, args.port)
+    if args.json:
+        print(json.dumps(report, indent=2))
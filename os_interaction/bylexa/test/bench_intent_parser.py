@@ -0,0 +1,193 @@
+# bench_intent_parser.py
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+TEST_DIR = Path(__file__).parent
+DEFAULT_CORPUS = TEST_DIR / "corpus" / "intent_corpus.json"
+PLUGINS_DIR = TEST_DIR / "test_plugins"
+
+# Metrics compared against a baseline: name -> (higher is better, tolerance key)
+TRACKED_METRICS = {
+    "p50_ms": (False, "latency"),
+    "p95_ms": (False, "latency"),
+    "p99_ms": (False, "latency"),
+    "throughput_per_s": (True, "latency"),
+    "intent_accuracy": (True, "accuracy"),
+    "param_accuracy": (True, "accuracy"),
+    "exact_match_rate": (True, "accuracy"),
+}
+
+def load_sample_plugins(registry, plugin_ids):
+    """Register the commands of the sample plugins used by the corpus."""
+    for plugin_id in plugin_ids:
+        plugin_dir = PLUGINS_DIR / plugin_id
+        spec = importlib.util.spec_from_file_location(f"bench_plugin_{plugin_id}", plugin_dir / "main.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        metadata = json.loads((plugin_dir / "plugin.json").read_text())
+        instance = module.Plugin(plugin_id, metadata)
+        commands = {
+            f"{plugin_id}.{name}": {k: v for k, v in info.items() if k != "handler"}
+            for name, info in instance.get_commands().items()
+        }
+        registry.register(f"plugin:{plugin_id}", commands)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def score(utterance, result):
+    """Compare one parse result with its label."""
+    command = result.get("command") or {}
+    predicted = command.get("action")
+    expected_params = utterance.get("params", {})
+    correct_params = sum(1 for k, v in expected_params.items() if command.get(k) == v)
+    intent_ok = predicted == utterance["intent"]
+    return {
+        "text": utterance["text"],
+        "intent": utterance["intent"],
+        "predicted": predicted,
+        "command": command,
+        "status": result.get("status"),
+        "intent_ok": intent_ok,
+        "params_expected": len(expected_params),
+        "params_correct": correct_params if intent_ok else 0,
+        "exact": intent_ok and correct_params == len(expected_params),
+    }
+
+def run_benchmark(corpus_path=DEFAULT_CORPUS, repeat=20, profile=None):
+    import psutil
+    from bylexa.intent_parser import IntentParser, CommandRegistry, DEFAULT_PIPELINE_PROFILE
+
+    corpus = json.loads(Path(corpus_path).read_text())
+    utterances = corpus["utterances"]
+
+    # A private registry keeps the sample plugins out of the shared one
+    registry = CommandRegistry()
+    load_sample_plugins(registry, corpus.get("plugins", []))
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    # Disable the result cache so every call really parses
+    parser = IntentParser(
+        pipeline_profile=profile or DEFAULT_PIPELINE_PROFILE,
+        cache_size=0,
+        registry=registry
+    )
+    load_start = time.perf_counter()
+    parser.nlp  # Load the model outside the timed loop
+    load_ms = (time.perf_counter() - load_start) * 1000
+
+    # Accuracy pass
+    scores = [score(u, parser.parse_command(u["text"])) for u in utterances]
+
+    # Latency pass
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for utterance in utterances:
+            call_start = time.perf_counter()
+            parser.parse_command(utterance["text"])
+            latencies.append((time.perf_counter() - call_start) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    params_expected = sum(s["params_expected"] for s in scores)
+    return {
+        "corpus": str(corpus_path),
+        "utterances": len(utterances),
+        "repeat": repeat,
+        "pipeline_profile": parser.pipeline_profile,
+        "model_load_ms": load_ms,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies),
+        "throughput_per_s": len(latencies) / elapsed,
+        "rss_mb": process.memory_info().rss / (1024 * 1024),
+        "parser_rss_mb": (process.memory_info().rss - rss_before) / (1024 * 1024),
+        "intent_accuracy": sum(s["intent_ok"] for s in scores) / len(scores),
+        "param_accuracy": sum(s["params_correct"] for s in scores) / params_expected if params_expected else 1.0,
+        "exact_match_rate": sum(s["exact"] for s in scores) / len(scores),
+        "path_stats": parser.get_path_stats(),
+        "failures": [s for s in scores if not s["exact"]],
+    }
+
+def compare(report, baseline, latency_tolerance=0.2, accuracy_tolerance=0.0):
+    """
+    Compare a report with a baseline report.
+
+    Returns:
+        List of regression messages; empty if nothing regressed
+    """
+    tolerances = {"latency": latency_tolerance, "accuracy": accuracy_tolerance}
+    regressions = []
+    for metric, (higher_is_better, kind) in TRACKED_METRICS.items():
+        if metric not in baseline:
+            continue
+        current, previous = report[metric], baseline[metric]
+        tolerance = tolerances[kind]
+        if kind == "accuracy":
+            # Accuracy tolerances are absolute
+            worse = current < previous - tolerance
+        elif higher_is_better:
+            worse = current < previous * (1 - tolerance)
+        else:
+            worse = current > previous * (1 + tolerance)
+        if worse:
+            regressions.append(f"{metric}: {previous:.4f} -> {current:.4f}")
+    return regressions
+
+def print_report(report):
+    print("=== Intent Parser Benchmark ===")
+    print(f"Corpus: {report['utterances']} utterances x {report['repeat']} (profile={report['pipeline_profile']})")
+    print(f"Model load: {report['model_load_ms']:.1f} ms")
+    print(f"Latency: p50 {report['p50_ms']:.3f} ms, p95 {report['p95_ms']:.3f} ms, p99 {report['p99_ms']:.3f} ms")
+    print(f"Throughput: {report['throughput_per_s']:.1f} cmd/s")
+    print(f"Memory: {report['rss_mb']:.1f} MB RSS ({report['parser_rss_mb']:.1f} MB for the parser)")
+    print(f"Intent accuracy: {report['intent_accuracy']:.1%}")
+    print(f"Param accuracy: {report['param_accuracy']:.1%}")
+    print(f"Exact match: {report['exact_match_rate']:.1%}")
+    for failure in report["failures"]:
+        print(f"  MISS {failure['text']!r}: expected {failure['intent']}, got {failure['command'] or None} ({failure['status']})")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark intent parser speed and accuracy on a labelled corpus")
+    arg_parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--profile", default=None, help="spaCy pipeline profile")
+    arg_parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this file ('-' for stdout)")
+    arg_parser.add_argument("--baseline", help="Fail if the report regresses against this JSON report")
+    arg_parser.add_argument("--latency-tolerance", type=float, default=0.2,
+                            help="Allowed relative latency/throughput regression")
+    arg_parser.add_argument("--accuracy-tolerance", type=float, default=0.0,
+                            help="Allowed absolute accuracy drop")
+    args = arg_parser.parse_args()
+
+    report = run_benchmark(args.corpus, args.repeat, args.profile)
+
+    if args.json_path == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        if args.json_path:
+            Path(args.json_path).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()),
+                              args.latency_tolerance, args.accuracy_tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
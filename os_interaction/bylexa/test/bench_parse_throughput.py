@@ -0,0 +1,53 @@
+# bench_parse_throughput.py
+import argparse
+import time
+from bylexa.intent_parser import IntentParser
+
+SAMPLE_COMMANDS = [
+    "open chrome",
+    "launch notepad",
+    "play music",
+    "pause",
+    "volume 40 percent",
+    "copy 'a.txt' 'b.txt'",
+    "execute dir",
+    "close firefox",
+    "open word with report.docx",
+    "paste",
+]
+
+def bench_parse_throughput(repeat=50, batch_size=64, n_process=1):
+    # Disable the result cache so every call really parses
+    parser = IntentParser(cache_size=0)
+    texts = SAMPLE_COMMANDS * repeat
+    
+    print("=== Parse Throughput Benchmark ===")
+    print(f"Utterances: {len(texts)} (batch_size={batch_size}, n_process={n_process})")
+    
+    # Warm up both paths so model loading is not measured
+    parser.parse_command(texts[0])
+    parser.parse_commands(texts[:batch_size], batch_size=batch_size)
+    
+    # Per-call path
+    start = time.perf_counter()
+    single_results = [parser.parse_command(text) for text in texts]
+    single_elapsed = time.perf_counter() - start
+    
+    # Batched path
+    start = time.perf_counter()
+    batch_results = parser.parse_commands(texts, batch_size=batch_size, n_process=n_process)
+    batch_elapsed = time.perf_counter() - start
+    
+    print(f"parse_command:  {single_elapsed:.3f}s ({len(texts) / single_elapsed:.1f} cmd/s)")
+    print(f"parse_commands: {batch_elapsed:.3f}s ({len(texts) / batch_elapsed:.1f} cmd/s)")
+    print(f"Speedup: {single_elapsed / batch_elapsed:.2f}x")
+    print(f"Results identical: {single_results == batch_results}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark batched intent parsing")
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    arg_parser.add_argument("--batch-size", type=int, default=64)
+    arg_parser.add_argument("--n-process", type=int, default=1)
+    args = arg_parser.parse_args()
+    
+    bench_parse_throughput(args.repeat, args.batch_size, args.n_process)
@@ -0,0 +1,87 @@
+# bench_pipeline_profiles.py
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+SAMPLE_COMMANDS = [
+    "open chrome",
+    "launch notepad with notes.txt",
+    "play music",
+    "pause",
+    "volume 40 percent",
+    "copy 'a.txt' 'b.txt'",
+    "execute dir",
+    "close firefox",
+]
+
+def measure_profile(profile, repeat):
+    """Load the parser with one profile and report latency and RSS (runs in a child process)."""
+    import psutil
+    from bylexa.intent_parser import IntentParser
+    
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    
+    parser = IntentParser(pipeline_profile=profile, cache_size=0)
+    parser.parse_command(SAMPLE_COMMANDS[0])  # Warm up
+    
+    latencies = []
+    for _ in range(repeat):
+        for text in SAMPLE_COMMANDS:
+            start = time.perf_counter()
+            parser.parse_command(text)
+            latencies.append(time.perf_counter() - start)
+    
+    latencies.sort()
+    return {
+        "profile": profile,
+        "components": parser.nlp.pipe_names,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "rss_mb": process.memory_info().rss / (1024 * 1024),
+        "model_rss_mb": (process.memory_info().rss - rss_before) / (1024 * 1024),
+    }
+
+def bench_pipeline_profiles(profiles, repeat=20):
+    print("=== Pipeline Profile Benchmark ===")
+    
+    # Each profile is measured in a fresh process so RSS is not shared
+    results = []
+    for profile in profiles:
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", profile, "--repeat", str(repeat)],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"{profile}: failed\n{output.stderr}")
+            continue
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    
+    if not results:
+        return
+    
+    baseline = results[0]
+    for result in results:
+        print(f"{result['profile']:>8}: mean {result['mean_ms']:.2f}ms, "
+              f"p95 {result['p95_ms']:.2f}ms, RSS {result['rss_mb']:.1f}MB "
+              f"(model {result['model_rss_mb']:.1f}MB)")
+        print(f"          components: {result['components']}")
+        print(f"          vs {baseline['profile']}: "
+              f"latency {result['mean_ms'] - baseline['mean_ms']:+.2f}ms, "
+              f"RSS {result['rss_mb'] - baseline['rss_mb']:+.1f}MB")
+
+if __name__ == "__main__":
+    from bylexa.intent_parser import PIPELINE_PROFILES
+    
+    arg_parser = argparse.ArgumentParser(description="Benchmark spaCy pipeline profiles")
+    arg_parser.add_argument("--profiles", nargs="+", default=list(PIPELINE_PROFILES))
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    
+    if args.measure:
+        print(json.dumps(measure_profile(args.measure, args.repeat)))
+    else:
+        bench_pipeline_profiles(args.profiles, args.repeat)
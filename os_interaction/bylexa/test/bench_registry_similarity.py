@@ -0,0 +1,85 @@
+# bench_registry_similarity.py
+import argparse
+import random
+import time
+from bylexa.intent_parser import CommandRegistry
+
+VOCABULARY = [
+    "send", "email", "report", "weather", "forecast", "timer", "alarm", "note",
+    "calendar", "event", "music", "playlist", "light", "thermostat", "door",
+    "camera", "backup", "photo", "upload", "download", "translate", "text",
+    "search", "web", "news", "stock", "price", "reminder", "task", "list",
+]
+
+QUERIES = [
+    "play", "open", "weather forecast", "send email report", "set a timer",
+    "control media playback", "backup photo", "translate text", "xyz",
+]
+
+def build_synthetic_registry(num_commands, seed=42):
+    """Create a registry with num_commands synthetic plugin commands."""
+    rng = random.Random(seed)
+    registry = CommandRegistry()
+    
+    commands = {}
+    for i in range(num_commands):
+        description = " ".join(rng.sample(VOCABULARY, rng.randint(2, 6)))
+        commands[f"plugin{i // 50}.cmd{i}"] = {
+            "description": description.capitalize(),
+            "parameters": {}
+        }
+    
+    registry.register("bench", commands)
+    return registry
+
+def text_similarity(str1, str2):
+    """Jaccard word overlap of two strings, as the pre-index scan computed it."""
+    set1 = set(str1.lower().split())
+    set2 = set(str2.lower().split())
+    if not set1 or not set2:
+        return 0.0
+    return len(set1 & set2) / len(set1 | set2)
+
+def linear_similar_commands(registry, name, threshold):
+    """Reference: the pre-index scan over every command, description and alias."""
+    similar = {}
+    for cmd_name, cmd_info in registry.commands.items():
+        texts = [cmd_name, cmd_info.get("description", "")]
+        texts.extend(a for a, t in registry.aliases.items() if t == cmd_name)
+        for text in texts:
+            similarity = text_similarity(name, text)
+            if similarity >= threshold and similarity > similar.get(cmd_name, -1):
+                similar[cmd_name] = similarity
+    return sorted(similar.items(), key=lambda x: (-x[1], x[0]))
+
+def bench_registry_similarity(num_commands=10000, threshold=0.3, repeat=5):
+    registry = build_synthetic_registry(num_commands)
+    
+    print("=== Registry Similarity Benchmark ===")
+    print(f"Commands: {len(registry.commands)}, index tokens: {len(registry._index)}")
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        expected = [linear_similar_commands(registry, q, threshold) for q in QUERIES]
+    linear_elapsed = (time.perf_counter() - start) / (repeat * len(QUERIES))
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        actual = [registry.get_similar_commands(q, threshold) for q in QUERIES]
+    indexed_elapsed = (time.perf_counter() - start) / (repeat * len(QUERIES))
+    
+    actual = [[(c["action"], c["similarity"]) for c in result] for result in actual]
+    
+    print(f"Linear scan:  {linear_elapsed * 1000:.2f}ms per query")
+    print(f"Indexed:      {indexed_elapsed * 1000:.2f}ms per query")
+    print(f"Speedup: {linear_elapsed / indexed_elapsed:.1f}x")
+    print(f"Results identical: {actual == expected}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark CommandRegistry similarity search")
+    arg_parser.add_argument("--commands", type=int, default=10000)
+    arg_parser.add_argument("--threshold", type=float, default=0.3)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    
+    bench_registry_similarity(args.commands, args.threshold, args.repeat)
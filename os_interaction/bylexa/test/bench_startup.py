@@ -0,0 +1,68 @@
+# bench_startup.py
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+def measure_startup():
+    """Measure cold-start timings in the current (fresh) process."""
+    timings = {}
+    
+    start = time.perf_counter()
+    from bylexa.intent_parser import IntentParser
+    timings["import_ms"] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    parser = IntentParser()
+    timings["construct_ms"] = (time.perf_counter() - start) * 1000
+    
+    # Structured commands take the fast path and never load spaCy
+    start = time.perf_counter()
+    parser.parse_command('{"action": "media", "media_action": "pause"}')
+    timings["first_structured_command_ms"] = (time.perf_counter() - start) * 1000
+    timings["model_loaded_after_structured"] = parser.is_loaded
+    
+    # First natural language command pays for loading the model
+    start = time.perf_counter()
+    parser.parse_command("open chrome")
+    timings["first_parsed_command_ms"] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    parser.parse_command("open firefox")
+    timings["second_parsed_command_ms"] = (time.perf_counter() - start) * 1000
+    
+    return timings
+
+def bench_startup(runs=3):
+    print("=== Startup Time Benchmark ===")
+    
+    # Every run happens in a fresh interpreter so imports are cold
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure"],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"Run failed:\n{output.stderr}")
+            return
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        if isinstance(values[0], bool):
+            print(f"{key}: {values[0]}")
+        else:
+            print(f"{key}: min {min(values):.1f}ms, max {max(values):.1f}ms")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark parser startup time")
+    arg_parser.add_argument("--runs", type=int, default=3)
+    arg_parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    
+    if args.measure:
+        print(json.dumps(measure_startup()))
+    else:
+        bench_startup(args.runs)
@@ -33,7 +33,20 @@ def run_test(test_file):
 def main():
     test_files = [
         "test_intent_parser.py",
+        "test_fast_path.py",
+        "test_param_extractor.py",
+        "test_parse_cache.py",
+        "test_parser_pool.py",
+        "test_streaming_parser.py",
+        "test_semantic_matcher.py",
         "test_dialog_manager.py", 
+        "test_dialog_flow.py",
+        "test_dialog_store.py",
+        "test_command_executor.py",
+        "test_tracing.py",
+        "test_metrics.py",
+        "test_logging_setup.py",
+        "test_gateway_dispatch.py",
         "test_orchestrator.py",
         "test_plugins.py",
         "test_community_registry.py",
@@ -0,0 +1,155 @@
+# test_command_executor.py
+import threading
+import time
+
+from bylexa.command_executor import CommandExecutor, LaneFullError, LANES, ACTION_DEADLINES, register_lane, register_deadline
+
+class Recorder:
+    """Executes commands by sleeping, recording the peak concurrency per action."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+        self.finished = []
+    
+    def __call__(self, command):
+        action = command["action"]
+        with self.lock:
+            self.running[action] = self.running.get(action, 0) + 1
+            self.peak[action] = max(self.peak.get(action, 0), self.running[action])
+        time.sleep(command.get("seconds", 0.05))
+        with self.lock:
+            self.running[action] -= 1
+            self.finished.append(command.get("name", action))
+        return f"done {command.get('name', action)}"
+
+def test_lanes():
+    print("=== Testing Execution Lanes ===")
+    recorder = Recorder()
+    executor = CommandExecutor(recorder, lane_sizes={"default": 4})
+    try:
+        # A slow command doesn't hold up a media command
+        slow = executor.submit({"action": "run", "name": "slow", "seconds": 0.5})
+        pause = executor.submit({"action": "media", "name": "pause", "seconds": 0.0})
+        assert pause.result(timeout=0.3) == "done pause"
+        assert not slow.done()
+        
+        # Media commands run one at a time, independent ones in parallel
+        futures = [executor.submit({"action": "media"}) for _ in range(3)]
+        futures += [executor.submit({"action": "open"}) for _ in range(3)]
+        for future in futures:
+            future.result(timeout=5)
+        slow.result(timeout=5)
+        print(f"Peak concurrency: {recorder.peak}")
+        assert recorder.peak["media"] == 1
+        assert recorder.peak["open"] == 3
+        
+        stats = executor.stats()
+        print(f"Stats: {stats}")
+        assert stats["media"]["workers"] == 1
+        assert stats["media"]["completed"] == 4
+        assert stats["default"]["completed"] == 4
+        assert stats["media"]["max_depth"] >= 2
+    finally:
+        executor.shutdown()
+
+def test_limits_and_cancel():
+    print("=== Testing Queue Limits ===")
+    release = threading.Event()
+    executor = CommandExecutor(lambda command: release.wait(5), max_queue=2)
+    try:
+        executor.submit({"action": "clipboard"})
+        time.sleep(0.05)  # Let the worker pick up the first command
+        queued = [executor.submit({"action": "clipboard"}) for _ in range(2)]
+        try:
+            executor.submit({"action": "clipboard"})
+            assert False, "Expected LaneFullError"
+        except LaneFullError as e:
+            print(f"Rejected: {e}")
+        assert executor.stats()["clipboard"]["rejected"] == 1
+        
+        # Commands that haven't started can be cancelled
+        assert executor.clear() == 2
+        assert all(future.cancelled() for future in queued)
+    finally:
+        release.set()
+        executor.shutdown()
+    
+    # Plugins can route their actions to a serialized lane
+    register_lane("printer.print", "printer")
+    try:
+        executor = CommandExecutor(lambda command: "printed")
+        assert executor.lane_for({"action": "printer.print"}) == "printer"
+        assert executor.submit({"action": "printer.print"}).result(timeout=5) == "printed"
+        assert executor.stats()["printer"]["workers"] == 1
+        executor.shutdown()
+    finally:
+        del LANES["printer.print"]
+
+def test_priorities_and_deadlines():
+    print("=== Testing Priorities and Deadlines ===")
+    release = threading.Event()
+    order = []
+    
+    def execute(command):
+        if command["name"] == "blocker":
+            release.wait(5)
+        order.append(command["name"])
+        return command["name"]
+    
+    executor = CommandExecutor(execute, lane_sizes={"default": 1})
+    try:
+        executor.submit({"action": "run", "name": "blocker"})
+        time.sleep(0.05)  # Let the worker pick up the blocker
+        
+        # Queued while the lane is busy; interactive commands overtake
+        # remote ones and those overtake background work
+        futures = [
+            executor.submit({"action": "run", "name": "bulk"}, "background"),
+            executor.submit({"action": "run", "name": "remote"}, "normal"),
+            executor.submit({"action": "run", "name": "local"}, "interactive"),
+            executor.submit({"action": "run", "name": "late"}, "normal", timeout=0.05),
+        ]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        print(f"Execution order: {order}")
+        assert order == ["blocker", "local", "remote", "bulk"]
+        
+        # The command that waited past its deadline wasn't executed
+        expired = futures[3].result()
+        print(f"Expired result: {expired}")
+        assert "not executed" in expired
+        assert executor.stats()["default"]["expired"] == 1
+        
+        # Every queue wait is recorded per priority
+        wait_times = executor.wait_time_stats()
+        print(f"Wait times: {wait_times['normal']}")
+        assert wait_times["normal"]["count"] == 3
+        assert wait_times["interactive"]["count"] == 1
+        assert wait_times["background"]["count"] == 1
+        assert sum(wait_times["normal"]["buckets"].values()) == 3
+        
+        try:
+            executor.submit({"action": "run", "name": "x"}, "urgent")
+            assert False, "Expected ValueError"
+        except ValueError as e:
+            print(f"Rejected: {e}")
+    finally:
+        release.set()
+        executor.shutdown()
+    
+    # Actions can have their own, tighter deadline
+    register_deadline("printer.print", 0.0)
+    try:
+        executor = CommandExecutor(lambda command: "printed")
+        assert "not executed" in executor.submit({"action": "printer.print", "name": "p"}).result(timeout=5)
+        executor.shutdown()
+    finally:
+        del ACTION_DEADLINES["printer.print"]
+
+if __name__ == "__main__":
+    test_lanes()
+    test_limits_and_cancel()
+    test_priorities_and_deadlines()
@@ -0,0 +1,109 @@
+# test_dialog_flow.py
+from bylexa.dialog_flow import (
+    DialogFlow, Transition, DEFAULT_FLOW, EXECUTE_PROMPT, prompt, register_flow, unregister_flow
+)
+from bylexa.dialog_manager import DialogManager
+
+AMBIGUOUS = {
+    "status": "ambiguous",
+    "options": [
+        {"action": "media", "description": "Control media playback"},
+        {"action": "open", "description": "Open an application", "required": ["application"]}
+    ]
+}
+
+def test_default_flow():
+    print("=== Testing Default Flow Table ===")
+    structure = DEFAULT_FLOW.describe()
+    print(f"States: {structure['states']}")
+    assert structure["states"]["initial"]["choose"] == "ambiguous"
+    assert structure["states"]["ambiguous"]["ask"] == "missing_params"
+    assert structure["states"]["missing_params"]["execute"] == "clear"
+    
+    dialog = DialogManager()
+    result = dialog.handle_response("start", AMBIGUOUS)
+    assert result["status"] == "ambiguous"
+    assert "1. Control media playback\n2. Open an application" in result["message"]
+    
+    result = dialog.handle_response("9", {})
+    assert result["status"] == "ambiguous"
+    assert result["message"].startswith("I didn't understand your selection.")
+    
+    result = dialog.handle_response("2", {})
+    assert result["message"] == "Please provide the application for the open command:"
+    
+    result = dialog.handle_response("notepad", {})
+    print(f"Completed: {result}")
+    assert result["should_execute"]
+    assert result["command"] == {"action": "open", "application": "notepad"}
+    assert dialog.context.state == "clear"
+
+def test_flow_metrics():
+    print("=== Testing Dialog Metrics ===")
+    dialog = DialogManager()
+    dialog.handle_response("start", AMBIGUOUS, session_id="a")
+    dialog.handle_response("1", {}, session_id="a")
+    dialog.handle_response("start", AMBIGUOUS, session_id="b")
+    dialog.end_session("b")  # Walks away without answering
+    
+    stats = dialog.flow_stats()
+    print(f"Stats: {stats}")
+    assert stats["default.ambiguous"]["entries"] == 2
+    assert stats["default.ambiguous"]["abandoned"] == 1
+    assert stats["default.ambiguous"]["abandonment_rate"] == 0.5
+    assert stats["default.clear"]["entries"] == 1
+    assert stats["default.ambiguous"]["seconds"] >= 0.0
+
+def test_plugin_flow():
+    print("=== Testing Plugin Flow ===")
+    
+    def start(context, user_input, parser_result):
+        return "ask", {"file": context.command.get("file", "it")}
+    
+    def confirming(context, user_input, parser_result):
+        return ("yes", {"action": context.command["action"]}) if user_input.lower() in ("yes", "y") else ("no", {})
+    
+    flow = DialogFlow(
+        "confirm_delete",
+        handlers={"start": start, "confirming": confirming},
+        transitions={
+            "start": {"ask": Transition("confirming", "confirm", prompt("Really delete {file}?"))},
+            "confirming": {
+                "yes": Transition("clear", "clear", EXECUTE_PROMPT, execute=True),
+                "no": Transition("initial", "cancelled", prompt("Cancelled."))
+            }
+        },
+        start="start",
+        actions=["files.delete"]
+    )
+    register_flow(flow)
+    try:
+        dialog = DialogManager()
+        command = {"action": "files.delete", "file": "a.txt"}
+        
+        result = dialog.handle_response("delete a.txt", {"status": "clear", "command": command})
+        print(f"Prompt: {result}")
+        assert result == {"status": "confirm", "message": "Really delete a.txt?", "should_execute": False}
+        
+        result = dialog.handle_response("yes", {})
+        assert result["should_execute"] and result["command"] == command
+        
+        # Back in the default flow afterwards
+        assert dialog.context.flow is None
+        dialog.handle_response("delete a.txt", {"status": "clear", "command": command})
+        assert dialog.handle_response("no", {})["status"] == "cancelled"
+        assert "confirm_delete.confirming" in dialog.flow_stats()
+    finally:
+        unregister_flow(flow)
+    
+    # Invalid tables are rejected
+    try:
+        DialogFlow("broken", handlers={}, transitions={"nowhere": {}})
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        print(f"Rejected: {e}")
+
+if __name__ == "__main__":
+    test_default_flow()
+    test_flow_metrics()
+    test_plugin_flow()
@@ -1,6 +1,11 @@
 # test_dialog_manager.py
-from bylexa.dialog_manager import DialogManager
-from bylexa.intent_parser import IntentParser
+import tempfile
+import time
+from pathlib import Path
+
+from bylexa.dialog_manager import DialogManager, HistoryTurn
+from bylexa.intent_parser import IntentParser, CommandRegistry
+from bylexa.param_extractor import ParameterExtractor
 
 def test_dialog_flow():
     parser = IntentParser()
@@ -30,5 +35,153 @@ def test_dialog_flow():
         completion = dialog.handle_response("chrome", {})
         print(f"Parameter provided: {completion}")
 
+def test_sessions_isolated():
+    dialog = DialogManager()
+    
+    # Two users interleave their clarification dialogs
+    print("=== Testing Per-Session Contexts ===")
+    ambiguous = {
+        "status": "ambiguous",
+        "options": [
+            {"action": "media", "description": "Control media playback"},
+            {"action": "run", "description": "Run a shell command"}
+        ]
+    }
+    missing = {
+        "status": "missing_params",
+        "command": {"action": "open"},
+        "missing_params": ["application"]
+    }
+    
+    first = dialog.handle_response("play", ambiguous, session_id="alice")
+    second = dialog.handle_response("open", missing, session_id="bob")
+    print(f"alice: {first['status']}, bob: {second['status']}")
+    assert first["status"] == "ambiguous"
+    assert second["status"] == "missing_params"
+    
+    # Each answer resolves its own session's question
+    bob_done = dialog.handle_response("chrome", {}, session_id="bob")
+    alice_done = dialog.handle_response("1", {}, session_id="alice")
+    print(f"alice: {alice_done['command']}, bob: {bob_done['command']}")
+    assert alice_done["command"] == {"action": "media"}
+    assert bob_done["command"] == {"action": "open", "application": "chrome"}
+    
+    # The default session is untouched
+    assert dialog.context.state == "initial"
+    
+    dialog.end_session("alice")
+    assert dialog.session_stats()["sessions"] == 2  # bob and default
+
+def test_session_eviction():
+    print("=== Testing Session Eviction ===")
+    missing = {
+        "status": "missing_params",
+        "command": {"action": "open"},
+        "missing_params": ["application"]
+    }
+    
+    # Least recently active sessions are dropped beyond max_sessions
+    dialog = DialogManager(max_sessions=2)
+    dialog.handle_response("open", missing, session_id="a")
+    dialog.handle_response("open", missing, session_id="b")
+    dialog.get_context("a")
+    dialog.handle_response("open", missing, session_id="c")
+    stats = dialog.session_stats()
+    print(f"Size limit: {stats}")
+    assert stats["sessions"] == 2 and stats["evictions"] == 1
+    assert dialog.get_context("a").state == "missing_params"
+    
+    # Idle sessions expire
+    dialog = DialogManager(session_ttl=0.05)
+    dialog.handle_response("open", missing, session_id="a")
+    time.sleep(0.1)
+    assert dialog.get_context("a").state == "initial"
+    stats = dialog.session_stats()
+    print(f"TTL: {stats}")
+    assert stats["expirations"] == 1
+
+def test_bounded_history():
+    print("=== Testing Bounded History ===")
+    error = {"status": "error", "message": "I couldn't understand that command."}
+    
+    # Without a log, old turns are dropped
+    dialog = DialogManager(history_size=3, history_text_limit=10)
+    for i in range(5):
+        dialog.handle_response(f"utterance number {i}", error)
+    history = dialog.get_history()
+    print(f"In memory: {history}")
+    assert len(history) == 3
+    assert isinstance(history[0], HistoryTurn)
+    assert history[0].user == "utterance "  # Truncated to 10 characters
+    assert history[-1].system == "I couldn't"
+    
+    # With a log, old turns spill to disk and can be replayed
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "history.jsonl"
+        dialog = DialogManager(history_size=2, history_log_path=log_path)
+        for i in range(5):
+            dialog.handle_response(f"say {i}", error, session_id="alice")
+        dialog.handle_response("say other", error, session_id="bob")
+        
+        assert len(dialog.get_history("alice")) == 2
+        full = dialog.get_history("alice", include_logged=True)
+        print(f"Replayed: {[turn.user for turn in full]}")
+        assert [turn.user for turn in full] == [f"say {i}" for i in range(5)]
+        
+        # Ending a session keeps its history in the log
+        dialog.end_session("bob")
+        assert [turn.user for turn in dialog.history_log.replay("bob")] == ["say other"]
+        assert dialog.session_stats()["history_logged"] == 4
+        dialog.close()
+
+def test_slot_filling():
+    print("=== Testing Slot Filling ===")
+    registry = CommandRegistry()
+    parser = IntentParser(cache_size=0, registry=registry)
+    dialog = DialogManager(parameter_extractor=ParameterExtractor(registry))
+    
+    # One answer fills the missing source and the optional destination
+    missing = parser.parse_command('{"action": "file", "file_action": "copy"}')
+    print(f"Parsed: {missing}")
+    assert missing["missing_params"] == ["source"]
+    dialog.handle_response("copy", missing)
+    result = dialog.handle_response("copy a.txt to backup/a.txt", {})
+    print(f"Both at once: {result}")
+    assert result["should_execute"]
+    assert result["command"] == {
+        "action": "file", "file_action": "copy", "source": "a.txt", "destination": "backup/a.txt"
+    }
+    
+    # A destination is only taken for actions that have one
+    missing = parser.parse_command('{"action": "file", "file_action": "delete"}')
+    dialog.handle_response("delete", missing)
+    result = dialog.handle_response("old.log new.log", {})
+    assert result["command"] == {"action": "file", "file_action": "delete", "source": "old.log"}
+    
+    # Unrecognized answers fill the first parameter, converted to its type
+    missing = {
+        "status": "missing_params",
+        "command": {"action": "media", "media_action": "volume"},
+        "missing_params": ["volume_level"]
+    }
+    dialog.handle_response("set the volume", missing)
+    result = dialog.handle_response("loud", {})
+    print(f"Invalid value: {result}")
+    assert result["status"] == "missing_params"
+    assert "not a valid int" in result["message"]
+    result = dialog.handle_response("40", {})
+    assert result["command"]["volume_level"] == 40
+    
+    # Without an extractor each answer fills one parameter verbatim
+    dialog = DialogManager()
+    missing = parser.parse_command('{"action": "file", "file_action": "copy"}')
+    dialog.handle_response("copy", missing)
+    result = dialog.handle_response("from a.txt to backup/a.txt", {})
+    assert result["command"]["source"] == "from a.txt to backup/a.txt"
+
 if __name__ == "__main__":
-    test_dialog_flow()
\ No newline at end of file
+    test_dialog_flow()
+    test_sessions_isolated()
+    test_session_eviction()
+    test_bounded_history()
+    test_slot_filling()
\ No newline at end of file
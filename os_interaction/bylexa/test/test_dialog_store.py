@@ -0,0 +1,86 @@
+# test_dialog_store.py
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from bylexa.dialog_store import DialogStore
+from bylexa.dialog_manager import DialogManager
+
+MISSING = {
+    "status": "missing_params",
+    "command": {"action": "file", "file_action": "copy"},
+    "missing_params": ["source", "destination"]
+}
+
+def test_store_log():
+    print("=== Testing Dialog Store Log ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sessions.wal"
+        store = DialogStore(path)
+        store.put("a", {"state": "ambiguous"})
+        store.put("b", {"state": "missing_params"})
+        store.put("a", {"state": "missing_params"})
+        store.delete("b")
+        store.close()
+        
+        # A torn last line from a crash is ignored
+        with open(path, "a") as f:
+            f.write('{"op": "put", "sess')
+        
+        live = DialogStore(path).load()
+        print(f"Replayed: {live}")
+        assert live == {"a": {"state": "missing_params"}}
+        
+        # Compaction keeps only the live sessions
+        store = DialogStore(path, compact_after=10)
+        for i in range(20):
+            store.put("c", {"state": "ambiguous", "turn": i})
+        store.close()
+        stats = store.stats()
+        print(f"Stats: {stats}")
+        assert stats["compactions"] >= 1
+        assert len(path.read_text().splitlines()) < 20
+        assert DialogStore(path).load() == {"a": {"state": "missing_params"}, "c": {"state": "ambiguous", "turn": 19}}
+
+def test_restore_after_restart():
+    print("=== Testing Restore After Restart ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sessions.wal"
+        
+        dialog = DialogManager(store_path=path)
+        dialog.handle_response("copy", MISSING, session_id="alice")
+        dialog.handle_response("copy", MISSING, session_id="bob")
+        dialog.handle_response("a.txt", {}, session_id="bob")
+        dialog.handle_response("b.txt", {}, session_id="bob")  # Completed
+        dialog.close()
+        
+        # A new process picks up the dialog that was still waiting
+        dialog = DialogManager(store_path=path)
+        assert dialog.restore() == 1
+        context = dialog.get_context("alice")
+        print(f"Restored: {context.state} {context.command} {context.missing_params}")
+        assert context.state == "missing_params"
+        assert context.missing_params == ["source", "destination"]
+        assert dialog.get_context("bob").state == "initial"
+        
+        result = dialog.handle_response("a.txt", {}, session_id="alice")
+        assert result["message"] == "Please provide the destination for the file command:"
+        dialog.close()
+        
+        # Dialogs idle for longer than the session TTL are not restored
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        for record in records:
+            if record["op"] == "put":
+                record["context"]["saved_at"] = time.time() - 3600
+        with open(path, "w") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        
+        dialog = DialogManager(store_path=path, session_ttl=60)
+        assert dialog.restore() == 0
+        assert DialogStore(path).load() == {}
+
+if __name__ == "__main__":
+    test_store_log()
+    test_restore_after_restart()
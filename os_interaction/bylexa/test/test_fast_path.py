@@ -0,0 +1,111 @@
+# test_fast_path.py
+import sys
+import threading
+from bylexa.intent_parser import CommandRegistry, IntentParser
+from bylexa.fast_path import FastPathMatcher
+
+def test_fast_path_matcher():
+    matcher = FastPathMatcher(CommandRegistry())
+    
+    print("=== Testing Fast Path Matcher ===")
+    
+    cases = {
+        "open chrome": ("open", {"application": "chrome"}),
+        "launch browser": ("open", {"application": "chrome"}),
+        "pause": ("media", {"media_action": "pause"}),
+        "play music": ("media", {"media_action": "play"}),
+        "start playback": ("media", {"media_action": "play"}),
+        "volume 40 percent": ("media", {"media_action": "volume", "volume_level": 40}),
+        "copy 'a.txt' 'b.txt'": ("file", {"file_action": "copy", "source": "a.txt", "destination": "b.txt"}),
+        "delete old.log": ("file", {"file_action": "delete", "source": "old.log"}),
+        "run echo 'hi there'": ("run", {"command_line": "echo 'hi there'"}),
+    }
+    for text, expected in cases.items():
+        result = matcher.match(text)
+        print(f"{text!r}: {result}")
+        assert result == expected
+    
+    # Anything a rule can't fully consume falls back to spaCy
+    for text in ["open word with report.docx", "copy", "what time is it"]:
+        result = matcher.match(text)
+        print(f"{text!r}: {result}")
+        assert result is None
+    
+    # Action slots only take their vocabulary; a leftover word is not an action
+    for text in ["play despacito", "pause please", "volume up", "copy hello"]:
+        result = matcher.match(text)
+        print(f"{text!r}: {result}")
+        assert result is None
+
+def test_fast_path_skips_nlp():
+    parser = IntentParser()
+    
+    result = parser.parse_command("volume 40 percent")
+    print(f"Volume: {result}")
+    assert result["status"] == "clear"
+    
+    # The spaCy model is never loaded for fast-path commands
+    assert not parser.is_loaded
+    
+    stats = parser.get_path_stats()
+    print(f"Path stats: {stats}")
+    assert stats["fast_path"]["count"] == 1
+
+def test_recompile_during_parses():
+    registry = CommandRegistry()
+    parser = IntentParser(cache_size=0, registry=registry)
+    # Enough commands that recompiling takes a while
+    plugin = {
+        f"mood.set{i}": {
+            "params": ["mood"],
+            "required": ["mood"],
+            "description": "Set the mood lighting",
+            "extract": {"mood": {"keywords": {f"happy{i}": "happy", "calm": "calm"}}}
+        }
+        for i in range(50)
+    }
+    
+    print("=== Testing Parses During Plugin Changes ===")
+    
+    stop = threading.Event()
+    errors = []
+    
+    def parse():
+        try:
+            while not stop.is_set():
+                result, _ = parser.parse_quick("volume 40 percent")
+                assert result["command"] == {"action": "media", "media_action": "volume", "volume_level": 40}
+                parser.param_extractor.extract_text("make it happy1", "mood.set1")
+                assert parser.param_extractor.extract_text("pause it", "media") == {"media_action": "pause"}
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+    
+    # Switch threads often so parses land in the middle of a recompile
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    threads = [threading.Thread(target=parse) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for i in range(100):
+            if stop.is_set():
+                break
+            registry.register("plugin:mood", plugin, {f"mood{i}": "mood.set0"})
+            parser._sync_registry()
+            registry.unregister("plugin:mood")
+            parser._sync_registry()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(switch_interval)
+    
+    print(f"Registry version: {registry.version}, errors: {errors}")
+    assert not errors
+    assert parser._sync_registry() == registry.version
+
+if __name__ == "__main__":
+    test_fast_path_matcher()
+    test_fast_path_skips_nlp()
+    test_recompile_during_parses()
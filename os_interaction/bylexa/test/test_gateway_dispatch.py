@@ -0,0 +1,178 @@
+# test_gateway_dispatch.py
+import asyncio
+import json
+import time
+
+from bylexa.websocket_gateway import BylexaWSServer, EVICTIONS
+
+class FakeWebSocket:
+    """Collects the messages the gateway sends."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.raw = []
+        self.sent = []
+        self.close_code = None
+    
+    async def send(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.raw.append(message)
+        self.sent.append(json.loads(message))
+    
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+def make_server(**options):
+    server = BylexaWSServer(**options)
+    log = []
+    running = {"now": 0, "peak": 0}
+    
+    async def handle_work(conn_id, data):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(data.get("seconds", 0))
+        running["now"] -= 1
+        log.append((conn_id, data["name"], time.perf_counter()))
+    
+    server.command_handlers["work"] = handle_work
+    return server, log, running
+
+def connect(server, conn_id, delay=0.0):
+    server.connections[conn_id] = websocket = FakeWebSocket(delay)
+    server._open_inbox(conn_id)
+    return websocket
+
+async def send(server, conn_id, name, seconds=0.0):
+    await server._handle_message(conn_id, json.dumps({"action": "work", "name": name, "seconds": seconds}))
+
+def test_per_connection_order():
+    print("=== Testing Per-Connection Dispatch ===")
+    
+    async def run():
+        server, log, running = make_server()
+        connect(server, "a")
+        connect(server, "b")
+        
+        # A slow message on one connection doesn't hold up another
+        # connection, but does hold up the messages behind it
+        await send(server, "a", "a-slow", 0.2)
+        await send(server, "a", "a-fast")
+        await send(server, "b", "b-fast")
+        await asyncio.sleep(0.4)
+        
+        order = [name for _, name, _ in log]
+        print(f"Handled: {order}")
+        assert order == ["b-fast", "a-slow", "a-fast"]
+        
+        await server._remove_connection("a")
+        await server._remove_connection("b")
+        assert not server.inbox_workers
+    
+    asyncio.run(run())
+
+def test_concurrency_cap_and_backpressure():
+    print("=== Testing Handler Cap and Inbox Backpressure ===")
+    
+    async def run():
+        server, log, running = make_server(inbox_size=1, max_concurrent_handlers=2)
+        for i in range(4):
+            connect(server, f"c{i}")
+            await send(server, f"c{i}", f"slow{i}", 0.1)
+        await asyncio.sleep(0.35)
+        print(f"Peak concurrent handlers: {running['peak']}")
+        assert running["peak"] == 2
+        assert len(log) == 4
+        
+        # One message running and one waiting fill a connection with a
+        # one-message inbox; the next one waits for room
+        await send(server, "c0", "busy", 0.3)
+        await asyncio.sleep(0.05)
+        await send(server, "c0", "queued")
+        try:
+            await asyncio.wait_for(send(server, "c0", "blocked"), timeout=0.1)
+            assert False, "Expected the full inbox to block"
+        except asyncio.TimeoutError:
+            print("Full inbox blocked the sender")
+        
+        # Closing the connection drops what it hasn't handled
+        for i in range(4):
+            await server._remove_connection(f"c{i}")
+        assert not server.inboxes
+    
+    asyncio.run(run())
+
+def test_broadcast_fan_out():
+    print("=== Testing Broadcast Fan-Out ===")
+    
+    async def run():
+        server, log, running = make_server(send_timeout=0.1)
+        members = {conn_id: connect(server, conn_id, 0.05) for conn_id in ("a", "b", "c")}
+        slow = connect(server, "slow", 1.0)
+        server.rooms["r"] = set(members) | {"slow"}
+        server.connection_to_room.update({conn_id: "r" for conn_id in server.rooms["r"]})
+        server.event_subscribers["e"] = set(members) | {"slow"}
+        evicted = EVICTIONS.value("send_timeout")
+        
+        # Members are sent to at once, and the slow one only delays the
+        # broadcast until it is evicted
+        start = time.perf_counter()
+        await server._broadcast_to_room("r", {"action": "broadcast", "message": "hi"}, exclude_conn_id="c")
+        elapsed = time.perf_counter() - start
+        print(f"Room broadcast took {elapsed * 1000:.0f} ms")
+        assert elapsed < 0.3
+        assert members["a"].sent == [{"action": "broadcast", "message": "hi"}]
+        assert not members["c"].sent
+        
+        # The message was serialized once for everyone
+        assert members["a"].raw[0] is members["b"].raw[0]
+        
+        await asyncio.sleep(0.05)
+        assert "slow" not in server.connections
+        assert "slow" not in server.rooms["r"] and "slow" not in server.event_subscribers["e"]
+        assert slow.close_code == 1013
+        assert EVICTIONS.value("send_timeout") == evicted + 1
+        
+        await server._broadcast_event("e", {"value": 1})
+        assert [m.sent[-1]["data"] for m in members.values()] == [{"value": 1}] * 3
+        assert members["a"].raw[-1] is members["c"].raw[-1]
+        
+        for conn_id in members:
+            await server._remove_connection(conn_id)
+    
+    asyncio.run(run())
+
+def test_dialog_session_scope():
+    print("=== Testing Dialog Session Scope ===")
+    server = BylexaWSServer()
+    
+    async def authenticate(conn_id, token):
+        server.connection_info[conn_id] = {}
+        websocket = FakeWebSocket()
+        websocket.request_headers = {"Authorization": f"Bearer {token}"}
+        assert await server._authenticate(websocket, conn_id)
+    
+    async def run():
+        await authenticate("alice", "e30.e30.alice")
+        await authenticate("mallory", "e30.e30.mallory")
+        await authenticate("alice-again", "e30.e30.alice")
+    
+    asyncio.run(run())
+    
+    # The same session ID from another credential is another conversation
+    alice = server._dialog_session("alice", {"session_id": "kitchen"})
+    mallory = server._dialog_session("mallory", {"session_id": "kitchen"})
+    print(f"alice: {alice}, mallory: {mallory}")
+    assert alice != mallory
+    assert "e30.e30.alice" not in alice
+    
+    # The same credential picks its conversation up again after reconnecting
+    assert server._dialog_session("alice-again", {"session_id": "kitchen"}) == alice
+    
+    # Without a session ID the conversation belongs to the connection
+    assert server._dialog_session("alice", {}) == "alice"
+
+if __name__ == "__main__":
+    test_per_connection_order()
+    test_concurrency_cap_and_backpressure()
+    test_broadcast_fan_out()
+    test_dialog_session_scope()
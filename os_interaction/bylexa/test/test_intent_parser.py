@@ -1,5 +1,6 @@
 # test_intent_parser.py
-from bylexa.intent_parser import IntentParser
+import json
+from bylexa.intent_parser import IntentParser, CommandRegistry
 
 def test_intent_parser():
     parser = IntentParser()
@@ -20,5 +21,92 @@ def test_intent_parser():
     result = parser.parse_command("open")
     print(f"Missing Params: {result}")
 
+def test_parse_commands_batch():
+    parser = IntentParser()
+    texts = ["open chrome", "", "play music", "copy file.txt to backup/"]
+    
+    # Batched parsing must match parsing one command at a time
+    batch_results = parser.parse_commands(texts, batch_size=2)
+    single_results = [parser.parse_command(text) for text in texts]
+    print(f"Batch results: {batch_results}")
+    assert batch_results == single_results
+
+def test_pipeline_profile():
+    parser = IntentParser(pipeline_profile="intent")
+    
+    # NER is never used by the extractors, so the intent profile drops it
+    print(f"Intent profile components: {parser.nlp.pipe_names}")
+    assert "ner" not in parser.nlp.pipe_names
+    assert parser.missing_components() == {}
+
+def test_similar_commands_index():
+    registry = CommandRegistry()
+    
+    # Aliases are indexed alongside names and descriptions
+    similar = registry.get_similar_commands("play", threshold=0.5)
+    print(f"Similar to 'play': {similar}")
+    assert similar[0]["action"] == "media"
+    
+    # Extraction tables are internal; options and snapshots leave them out
+    assert "extract" not in similar[0]
+    assert "extract" not in registry.snapshot().commands["media"]
+    assert "media_action" in registry.snapshot().extract_tables["media"]
+    
+    # Only commands sharing a word with the query are scored
+    assert registry.get_similar_commands("xyzzy") == []
+    assert "file" in registry._index["operations"]
+
+def test_registry_deltas():
+    registry = CommandRegistry()
+    deltas = []
+    registry.add_listener(deltas.append)
+    snapshot = registry.snapshot()
+    
+    # Plugins register and unregister incrementally
+    registry.register("plugin:greeter", {"greeter.hello": {"description": "Say hello"}},
+                      {"greet": "greeter.hello"})
+    assert registry.get_command("greet")["action"] == "greeter.hello"
+    assert registry.get_similar_commands("hello", threshold=0.5)[0]["action"] == "greeter.hello"
+    
+    registry.unregister("plugin:greeter")
+    assert registry.get_command("greeter.hello") is None
+    print(f"Deltas: {deltas}")
+    assert [d["version"] for d in deltas] == [1, 2]
+    assert deltas[1]["removed_commands"] == ["greeter.hello"]
+    
+    # Snapshots taken earlier are unaffected
+    assert snapshot.version == 0
+    assert "greeter.hello" not in snapshot.commands
+
+def test_corpus_labels():
+    from bench_intent_parser import DEFAULT_CORPUS, load_sample_plugins, compare
+    
+    corpus = json.loads(DEFAULT_CORPUS.read_text())
+    registry = CommandRegistry()
+    load_sample_plugins(registry, corpus["plugins"])
+    
+    # Every label names a registered command and only its parameters
+    for utterance in corpus["utterances"]:
+        command = registry.get_command(utterance["intent"])
+        assert command is not None, utterance
+        known = set(command.get("params", [])) | set(command.get("parameters", {}))
+        assert set(utterance["params"]) <= known, utterance
+    
+    # Labels cover every built-in command
+    intents = {u["intent"] for u in corpus["utterances"]}
+    assert {"open", "script", "run", "file", "clipboard", "media", "close"} <= intents
+    
+    # Baseline comparison flags speed and accuracy regressions
+    baseline = {"p95_ms": 1.0, "throughput_per_s": 100.0, "intent_accuracy": 0.9}
+    assert compare({"p95_ms": 1.1, "throughput_per_s": 95.0, "intent_accuracy": 0.9}, baseline) == []
+    regressions = compare({"p95_ms": 2.0, "throughput_per_s": 50.0, "intent_accuracy": 0.8}, baseline)
+    print(f"Regressions: {regressions}")
+    assert len(regressions) == 3
+
 if __name__ == "__main__":
-    test_intent_parser()
\ No newline at end of file
+    test_intent_parser()
+    test_parse_commands_batch()
+    test_pipeline_profile()
+    test_similar_commands_index()
+    test_registry_deltas()
+    test_corpus_labels()
\ No newline at end of file
@@ -0,0 +1,69 @@
+# test_logging_setup.py
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from bylexa.logging_setup import JsonFormatter, RateLimitFilter, setup_logging, shutdown_logging
+
+def make_record(msg, *args, level=logging.INFO, name="bylexa.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_json_and_rate_limit():
+    print("=== Testing JSON Records and Rate Limiting ===")
+    record = make_record("Executing command: %s", {"action": "open"})
+    record.action = "open"
+    data = json.loads(JsonFormatter().format(record))
+    print(f"JSON record: {data}")
+    assert data["message"] == "Executing command: {'action': 'open'}"
+    assert data["level"] == "INFO"
+    assert data["action"] == "open"
+    
+    # Repeats of one template are limited, whatever their arguments
+    limiter = RateLimitFilter(rate=0.0001, burst=3)
+    passed = [limiter.filter(make_record("Parser result: %s", i)) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.suppressed == 7
+    
+    # Other templates and errors are not affected
+    assert limiter.filter(make_record("Dialog result: %s", 1))
+    assert limiter.filter(make_record("Parser result: %s", 11, level=logging.ERROR))
+    
+    # The next record let through reports what was suppressed
+    limiter.rate = 1000.0
+    time.sleep(0.01)
+    record = make_record("Parser result: %s", 12)
+    assert limiter.filter(record)
+    assert record.suppressed == 7
+
+def test_setup_logging():
+    print("=== Testing Central Logging Setup ===")
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = Path(tmp) / "bylexa.log"
+            setup_logging(level="INFO", json_format=True, log_file=log_file,
+                          module_levels={"bylexa.test.quiet": "WARNING"}, rate=None)
+            logging.getLogger("bylexa.test").info("Command %s done", "open", extra={"lane": "default"})
+            logging.getLogger("bylexa.test.quiet").info("Not written")
+            logging.getLogger("bylexa.test").debug("Below the root level")
+            shutdown_logging()
+            
+            records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+            print(f"Records: {records}")
+            assert len(records) == 1
+            assert records[0]["message"] == "Command open done"
+            assert records[0]["lane"] == "default"
+            assert records[0]["logger"] == "bylexa.test"
+    finally:
+        shutdown_logging()
+        logging.getLogger("bylexa.test.quiet").setLevel(logging.NOTSET)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+if __name__ == "__main__":
+    test_json_and_rate_limit()
+    test_setup_logging()
@@ -0,0 +1,65 @@
+# test_metrics.py
+import urllib.request
+
+from bylexa.metrics import MetricsRegistry, MetricsServer, get_metrics
+from bylexa.tracing import Tracer, span
+
+def test_metrics_text():
+    print("=== Testing Metrics Text Format ===")
+    registry = MetricsRegistry()
+    commands = registry.counter("test_commands_total", "Commands", ("action", "status"))
+    commands.inc("open", "executing")
+    commands.inc("open", "executing")
+    commands.inc("media", "error", amount=3)
+    assert registry.counter("test_commands_total", "Commands", ("action", "status")) is commands
+    
+    depth = {"default": 2, "media": 0}
+    registry.gauge("test_queue_depth", "Queued", ("lane",), callback=lambda: depth)
+    registry.gauge("test_connections", "Connections", callback=lambda: 5)
+    latency = registry.histogram("test_seconds", "Latency", ("stage",), buckets=(0.01, 0.1))
+    latency.observe(0.005, "parse")
+    latency.observe(0.05, "parse")
+    latency.observe(1.0, "parse")
+    
+    try:
+        commands.inc("open")
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    
+    text = registry.render()
+    print(text)
+    assert "# TYPE test_commands_total counter" in text
+    assert 'test_commands_total{action="open",status="executing"} 2' in text
+    assert 'test_commands_total{action="media",status="error"} 3' in text
+    assert 'test_queue_depth{lane="default"} 2' in text
+    assert "test_connections 5" in text
+    assert 'test_seconds_bucket{stage="parse",le="0.01"} 1' in text
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="parse"} 3' in text
+
+def test_metrics_endpoint():
+    print("=== Testing Metrics Endpoint ===")
+    # Finished traces feed the per-stage latency histograms
+    stages = get_metrics().get("bylexa_stage_duration_seconds")
+    before = stages.count("test_stage")
+    tracer = Tracer()
+    with tracer.trace("test"):
+        with span("test_stage"):
+            pass
+    assert stages.count("test_stage") == before + 1
+    
+    server = MetricsServer(get_metrics(), port=0)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://localhost:{server.port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode("utf-8")
+        assert 'bylexa_stage_duration_seconds_count{stage="test_stage"}' in text
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_metrics_text()
+    test_metrics_endpoint()
@@ -1,7 +1,11 @@
 # test_orchestrator.py
-from bylexa.ai_orchestrator import get_orchestrator
+import asyncio
+import threading
 import time
 
+from bylexa import ai_orchestrator
+from bylexa.ai_orchestrator import AIOrchestrator, get_orchestrator
+
 def test_orchestrator():
     orchestrator = get_orchestrator()
     
@@ -29,5 +33,48 @@ def test_orchestrator():
     result = orchestrator.process_text("xyzabc invalid command")
     print(f"Invalid Command: {result}")
 
+def test_command_futures():
+    print("=== Testing Per-Command Results ===")
+    executed = []
+    release = threading.Event()
+    
+    def fake_perform_action(command):
+        # Hold the first command until both have been submitted
+        if not executed:
+            release.wait(5)
+        executed.append(command["action"])
+        return f"ran {command['action']} {command.get('application', '')}".strip()
+    
+    original = ai_orchestrator.perform_action
+    ai_orchestrator.perform_action = fake_perform_action
+    orchestrator = AIOrchestrator()
+    try:
+        first_id, first = orchestrator.submit_command({"action": "media", "media_action": "pause"})
+        second_id, second = orchestrator.submit_command({"action": "open", "application": "notepad"})
+        assert orchestrator.has_pending_commands()
+        assert not first.done()
+        release.set()
+        
+        # Each caller gets its own command's result
+        assert orchestrator.wait_for_result(second_id, timeout=5) == "ran open notepad"
+        assert first.result() == "ran media"
+        assert orchestrator.get_command_future(first_id) is first
+        assert not orchestrator.has_pending_commands()
+        
+        # The async API resolves with the executed result
+        response = asyncio.run(orchestrator.execute_text_async("open notepad"))
+        print(f"Async: {response}")
+        assert response["status"] == "executing"
+        assert response["execution_result"] == "ran open notepad"
+    finally:
+        # The idle execution thread stops at once instead of after a poll
+        start = time.perf_counter()
+        orchestrator.stop()
+        ai_orchestrator.perform_action = original
+    elapsed = time.perf_counter() - start
+    print(f"Stopped in {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.5
+
 if __name__ == "__main__":
-    test_orchestrator()
\ No newline at end of file
+    test_orchestrator()
+    test_command_futures()
\ No newline at end of file
@@ -0,0 +1,101 @@
+# test_param_extractor.py
+import spacy
+from spacy.tokens import Doc
+
+from bylexa.intent_parser import CommandRegistry
+from bylexa.param_extractor import KeywordScanner, ParameterExtractor
+
+def make_doc(words, pos, deps, heads):
+    """Build a parsed doc by hand so the test doesn't need a trained model."""
+    nlp = spacy.blank("en")
+    return Doc(nlp.vocab, words=words, pos=pos, deps=deps, heads=heads, lemmas=[w.lower() for w in words])
+
+def test_keyword_scanner():
+    scanner = KeywordScanner(["play", "turn up", "start", "up"])
+    
+    print("=== Testing Keyword Scanner ===")
+    
+    matches = scanner.scan("please turn up the volume and play")
+    print(f"Matches: {matches}")
+    assert matches == [(7, "turn up"), (12, "up"), (30, "play")]
+    
+    # Keywords only match whole words
+    assert scanner.scan("restart") == []
+
+def test_table_driven_extraction():
+    registry = CommandRegistry()
+    extractor = ParameterExtractor(registry)
+    
+    print("=== Testing Table-Driven Extraction ===")
+    
+    cases = [
+        ("media", "turn up the volume to 40 percent", {"media_action": "volume", "volume_level": 40}),
+        ("media", "stop the music", {"media_action": "pause"}),
+        ("file", "copy notes.txt to backup.txt", {"file_action": "copy", "source": "notes.txt", "destination": "backup.txt"}),
+        ("file", "delete 'old report.doc' please.now", {"file_action": "delete", "source": "old report.doc"}),
+        ("clipboard", "copy 'hello world'", {"text": "hello world"}),
+    ]
+    for command, text, expected in cases:
+        result = extractor.extract_text(text, command)
+        print(f"{command} {text!r}: {result}")
+        assert result == expected
+    
+    # Dependency-based specs use the doc: "open chrome for email"
+    doc = make_doc(
+        ["open", "chrome", "for", "email"],
+        pos=["VERB", "PROPN", "ADP", "NOUN"],
+        deps=["ROOT", "dobj", "prep", "pobj"],
+        heads=[0, 0, 0, 2]
+    )
+    result = extractor.extract(doc, "open")
+    print(f"open: {result}")
+    assert result == {"application": "chrome", "task": "email"}
+
+def test_plugin_parameter_specs():
+    registry = CommandRegistry()
+    registry.register("plugin:greeter", {
+        "greeter.greet": {
+            "description": "Greet someone",
+            "parameters": {"name": {"type": "str"}, "times": {"type": "int"}}
+        }
+    })
+    extractor = ParameterExtractor(registry)
+    
+    print("=== Testing Plugin Parameter Specs ===")
+    
+    result = extractor.extract_text("greet name 'Ada Lovelace' times=3", "greeter.greet")
+    print(f"Greet: {result}")
+    assert result == {"name": "Ada Lovelace", "times": 3}
+    
+    # Values that fail type coercion are left out
+    result = extractor.extract_text("greet times many", "greeter.greet")
+    print(f"Bad type: {result}")
+    assert result == {}
+    
+    # Declared types are available for converting raw answers
+    assert extractor.param_type("greeter.greet", "times") == "int"
+    assert extractor.coerce("greeter.greet", "times", "4") == 4
+    try:
+        extractor.coerce("greeter.greet", "times", "many")
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        print(f"Coercion error: {e}")
+
+def test_requested_parameters():
+    extractor = ParameterExtractor(CommandRegistry())
+    
+    # Paths fill the requested path parameters in order, and "when"
+    # conditions may refer to parameters known from earlier
+    known = {"action": "file", "file_action": "copy", "source": "a.txt"}
+    result = extractor.extract_text("backup/a.txt", "file", ["destination"], known)
+    print(f"Requested only: {result}")
+    assert result == {"destination": "backup/a.txt"}
+    
+    known["file_action"] = "delete"
+    assert extractor.extract_text("backup/a.txt", "file", ["destination"], known) == {}
+
+if __name__ == "__main__":
+    test_keyword_scanner()
+    test_table_driven_extraction()
+    test_plugin_parameter_specs()
+    test_requested_parameters()
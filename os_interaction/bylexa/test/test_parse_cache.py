@@ -0,0 +1,83 @@
+# test_parse_cache.py
+import time
+from bylexa.intent_parser import IntentParser, CommandRegistry
+from bylexa.parse_cache import ParseCache
+
+def test_parse_cache():
+    cache = ParseCache(max_size=2, ttl=0.2)
+    
+    print("=== Testing Parse Cache ===")
+    
+    result = {"status": "clear", "command": {"action": "media", "media_action": "pause"},
+              "original_text": "pause"}
+    cache.put("pause", 0, result)
+    
+    # Outer whitespace is ignored, results are copies
+    cached = cache.get("  pause ", 0)
+    print(f"Cached: {cached}")
+    assert cached["command"] == result["command"]
+    assert cached["original_text"] == "  pause "
+    cached["command"]["media_action"] = "play"
+    assert cache.get("pause", 0)["command"]["media_action"] == "pause"
+    
+    # A different registry version never hits
+    assert cache.get("pause", 1) is None
+    
+    # Least recently used entries are evicted
+    cache.put("play", 0, result)
+    cache.put("stop", 0, result)
+    assert cache.get("pause", 0) is None
+    
+    # Entries expire after the TTL
+    time.sleep(0.3)
+    assert cache.get("stop", 0) is None
+    
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+def test_parse_cache_exact_values():
+    cache = ParseCache(max_size=8, ttl=None)
+    
+    print("=== Testing Parse Cache Keeps Parameter Values Apart ===")
+    
+    # Utterances differing only in case or inner spacing of a value are separate entries
+    pairs = [
+        ("execute echo hello", "execute echo HELLO", {"action": "execute", "command_line": "echo hello"}),
+        ("delete Report.txt", "delete report.txt", {"action": "file", "file_action": "delete", "source": "Report.txt"}),
+        ('copy "My  File.txt" b.txt', 'copy "My File.txt" b.txt',
+         {"action": "file", "file_action": "copy", "source": "My  File.txt", "destination": "b.txt"}),
+    ]
+    for text, variant, command in pairs:
+        cache.put(text, 0, {"status": "clear", "command": command, "original_text": text})
+        assert cache.get(variant, 0) is None, variant
+        assert cache.get(text, 0)["command"] == command
+    
+    parser = IntentParser(registry=CommandRegistry())
+    first = parser.parse_command('{"action": "file", "file_action": "delete", "source": "Report.txt"}')
+    second = parser.parse_command('{"action": "file", "file_action": "delete", "source": "report.txt"}')
+    print(f"Sources: {first['command']['source']}, {second['command']['source']}")
+    assert first["command"]["source"] == "Report.txt"
+    assert second["command"]["source"] == "report.txt"
+
+def test_parser_cache_invalidation():
+    registry = CommandRegistry()
+    parser = IntentParser(registry=registry)
+    
+    parser.parse_command("open chrome")
+    parser.parse_command("open chrome")
+    assert parser.cache.stats()["hits"] == 1
+    
+    # A plugin registering commands bumps the version and drops cached results
+    registry.register("plugin:test", {"test.hello": {"description": "Say hello"}})
+    parser.parse_command("open chrome")
+    stats = parser.cache.stats()
+    print(f"Stats after plugin change: {stats}")
+    assert stats["invalidations"] == 1
+    assert stats["hits"] == 1
+
+if __name__ == "__main__":
+    test_parse_cache()
+    test_parse_cache_exact_values()
+    test_parser_cache_invalidation()
@@ -0,0 +1,80 @@
+# test_parser_pool.py
+import asyncio
+import pickle
+from bylexa.intent_parser import CommandRegistry
+from bylexa.parser_pool import ParserPool, PoolSaturatedError, _picklable
+from bylexa.ai_orchestrator import AIOrchestrator
+
+def test_registry_snapshot_copy():
+    registry = CommandRegistry()
+    registry.register("plugin:greeter", {
+        "greeter.hello": {"description": "Say hello", "handler": lambda params: "hi"}
+    })
+    snapshot = registry.snapshot()
+    
+    print("=== Testing Worker Registry Copy ===")
+    
+    # Worker processes get the registry contents without plugin callables
+    commands = _picklable(dict(snapshot.commands))
+    aliases = _picklable(dict(snapshot.aliases))
+    extract_tables = _picklable(dict(snapshot.extract_tables))
+    pickle.dumps((commands, aliases, extract_tables))
+    assert "handler" not in commands["greeter.hello"]
+    
+    copy = CommandRegistry.from_snapshot(snapshot.version, commands, aliases, extract_tables)
+    print(f"Copy version: {copy.version}, commands: {len(copy.commands)}")
+    assert copy.version == registry.version
+    assert set(copy.commands) == set(registry.commands)
+    assert copy.get_command("launch")["action"] == "open"
+    assert copy.extract_tables == registry.extract_tables
+    
+    # The copy never loads plugins on its own
+    assert copy.refresh() == registry.version
+
+def test_parse_without_blocking_loop():
+    orchestrator = AIOrchestrator({"cache_size": 0})
+    
+    print("=== Testing Async Processing ===")
+    
+    async def run():
+        return await asyncio.gather(
+            orchestrator.process_text_async("pause"),
+            orchestrator.process_text_async("volume 40 percent")
+        )
+    
+    results = asyncio.run(run())
+    print(f"Results: {results}")
+    assert [r["command"]["media_action"] for r in results] == ["pause", "volume"]
+    orchestrator.stop()
+
+def test_parser_pool():
+    pool = ParserPool(size=1, max_pending=1, queue_timeout=0.01, registry=CommandRegistry())
+    
+    print("=== Testing Parser Pool ===")
+    
+    async def run():
+        # The first parse loads the model in the worker; a second one
+        # arriving meanwhile finds no free slot
+        first = asyncio.ensure_future(pool.parse("open the report in word"))
+        await asyncio.sleep(0)
+        try:
+            await pool.parse("close firefox")
+            saturated = False
+        except PoolSaturatedError:
+            saturated = True
+        return await first, saturated
+    
+    try:
+        (result, elapsed_ms), saturated = asyncio.run(run())
+        print(f"Result: {result} ({elapsed_ms:.1f} ms), saturated: {saturated}")
+        assert result["status"] in ("clear", "missing_params", "ambiguous")
+        assert saturated
+        print(f"Stats: {pool.stats()}")
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+if __name__ == "__main__":
+    test_registry_snapshot_copy()
+    test_parse_without_blocking_loop()
+    test_parser_pool()
@@ -0,0 +1,49 @@
+# test_semantic_matcher.py
+import numpy as np
+from bylexa.intent_parser import CommandRegistry
+from bylexa.semantic_matcher import SemanticMatcher
+
+VOCABULARY = ["open", "application", "browser", "launch", "media", "playback",
+              "music", "file", "clipboard", "shell", "command", "weather"]
+
+def bag_of_words(texts):
+    """Tiny deterministic embedder so the test needs no model download."""
+    vectors = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().replace(".", " ").split():
+            if word in VOCABULARY:
+                vectors[row, VOCABULARY.index(word)] += 1
+    return vectors
+
+def test_semantic_matcher():
+    registry = CommandRegistry()
+    calls = []
+    
+    def embed(texts):
+        calls.append(len(texts))
+        return bag_of_words(texts)
+    
+    matcher = SemanticMatcher(embed)
+    matcher.sync(registry.commands, registry.aliases)
+    print(f"Indexed commands: {len(matcher)}")
+    assert len(matcher) == len(registry.commands)
+    
+    matches = matcher.query("launch my browser", top_k=3)
+    print(f"'launch my browser': {matches}")
+    assert matches[0][0] == "open"
+    
+    # Only the new command is embedded when the registry grows
+    commands = dict(registry.commands)
+    commands["weather.today"] = {"description": "Show the weather"}
+    matcher.sync(commands, registry.aliases)
+    assert calls[-1] == 1
+    assert matcher.query("weather", top_k=1)[0][0] == "weather.today"
+    
+    # Removed commands drop out without re-embedding anything
+    del commands["weather.today"]
+    matcher.sync(commands, registry.aliases)
+    assert len(matcher) == len(registry.commands)
+    assert all(name != "weather.today" for name, _ in matcher.query("weather"))
+
+if __name__ == "__main__":
+    test_semantic_matcher()
@@ -0,0 +1,87 @@
+# test_streaming_parser.py
+from bylexa.intent_parser import IntentParser, CommandRegistry
+from bylexa.streaming_parser import StreamingParseSession, register_prefetcher, PREFETCHERS
+
+def test_streaming_commit():
+    parser = IntentParser(registry=CommandRegistry())
+    prefetched = []
+    original = PREFETCHERS.get("open")
+    register_prefetcher("open", prefetched.append)
+    
+    print("=== Testing Streaming Commit ===")
+    
+    try:
+        session = StreamingParseSession(parser)
+        for delta in ["op", "en ", "chr", "ome", " "]:
+            state = session.feed(delta)
+            print(f"{session.text!r}: {state}")
+        
+        # Committed once the last word was followed by whitespace
+        assert state["status"] == "committed"
+        assert state["command"] == {"action": "open", "application": "chrome"}
+        assert prefetched == [{"action": "open", "application": "chrome"}]
+        
+        # Earlier words were not tokenized again
+        assert session.stats()["tokens_reused"] > 0
+        
+        text, result = session.finish()
+        print(f"Final: {result}")
+        assert result["command"]["application"] == "chrome"
+        
+        # The spaCy model was never needed
+        assert not parser.is_loaded
+    finally:
+        register_prefetcher("open", original)
+
+def test_streaming_withdraw():
+    parser = IntentParser(registry=CommandRegistry())
+    session = StreamingParseSession(parser, stable_updates=1)
+    
+    print("=== Testing Streaming Withdraw ===")
+    
+    state = session.update("volume 40 percent")
+    print(f"{session.text!r}: {state}")
+    assert state["status"] == "committed"
+    
+    # The speaker kept going: the earlier commit no longer holds
+    state = session.update("volume 40 percent and then")
+    print(f"{session.text!r}: {state}")
+    assert state["status"] == "listening"
+    assert session.stats()["withdrawals"] == 1
+    
+    # A revised hypothesis is retokenized from the first changed word
+    state = session.update("volume 30 percent.")
+    print(f"{session.text!r}: {state}")
+    assert state["command"]["volume_level"] == 30
+
+def test_streaming_vocabulary_only():
+    parser = IntentParser(registry=CommandRegistry())
+    session = StreamingParseSession(parser, stable_updates=1)
+    
+    print("=== Testing Streaming Commits From Vocabulary Only ===")
+    
+    # Committing works on the kept tokens; the transcript is never matched whole
+    def match_whole(text):
+        raise AssertionError(f"Transcript re-tokenized: {text!r}")
+    parser.fast_path.match = match_whole
+    
+    # "play" alone is a command, but a partial word never fills its action slot
+    assert session.feed("play")["command"] == {"action": "media", "media_action": "play"}
+    for delta in [" des", "paci", "to"]:
+        state = session.feed(delta)
+        print(f"{session.text!r}: {state}")
+        assert state["status"] == "listening"
+    
+    # An application outside the vocabulary waits for the final transcript
+    session = StreamingParseSession(parser, stable_updates=1)
+    state = session.update("open notep")
+    assert state["status"] == "listening"
+    
+    state = session.update("open browser ")
+    print(f"{session.text!r}: {state}")
+    assert state["command"] == {"action": "open", "application": "chrome"}
+
+if __name__ == "__main__":
+    test_streaming_commit()
+    test_streaming_withdraw()
+    test_streaming_vocabulary_only()
@@ -0,0 +1,84 @@
+# test_tracing.py
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from bylexa.tracing import Tracer, current_trace, span
+from bylexa.command_executor import CommandExecutor
+
+def test_trace_spans():
+    print("=== Testing Trace Spans ===")
+    tracer = Tracer(capacity=2)
+    
+    with tracer.trace("process_text", session="s1") as trace:
+        assert current_trace() is trace
+        with span("parse"):
+            time.sleep(0.01)
+        # Nested entry points only add a stage
+        with tracer.trace("dialog"):
+            pass
+    assert current_trace() is None
+    
+    # Spans outside a trace are ignored
+    with span("parse"):
+        pass
+    
+    recorded = tracer.recent()
+    print(f"Trace: {recorded[0]}")
+    assert len(recorded) == 1
+    assert recorded[0]["attributes"] == {"session": "s1"}
+    assert [s["name"] for s in recorded[0]["spans"]] == ["parse", "dialog"]
+    assert recorded[0]["spans"][0]["duration_ms"] >= 10
+    assert tracer.get(recorded[0]["trace_id"])["name"] == "process_text"
+    
+    # The buffer keeps only the newest traces
+    for i in range(3):
+        with tracer.trace(f"t{i}"):
+            pass
+    assert [t["name"] for t in tracer.recent()] == ["t2", "t1"]
+    
+    # A disabled tracer records nothing
+    disabled = Tracer(enabled=False)
+    with disabled.trace("ignored"):
+        assert current_trace() is None
+    assert disabled.recent() == []
+
+def test_trace_through_executor():
+    print("=== Testing Tracing Through the Executor ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        export_path = Path(tmp) / "traces.jsonl"
+        tracer = Tracer(export_path=export_path)
+        
+        def execute(command):
+            with span("handler", action=command["action"]):
+                time.sleep(0.05)
+            return "done"
+        
+        executor = CommandExecutor(execute)
+        try:
+            with tracer.trace("ws.command") as trace:
+                future = executor.submit({"action": "open"})
+            # Still open: its command hasn't executed yet
+            assert tracer.recent() == []
+            assert future.result(timeout=5) == "done"
+            time.sleep(0.05)  # Let the done callback finish the trace
+        finally:
+            executor.shutdown()
+        
+        recorded = tracer.recent()
+        print(f"Trace: {recorded[0]}")
+        assert recorded[0]["trace_id"] == trace.trace_id
+        stages = [s["name"] for s in recorded[0]["spans"]]
+        assert stages == ["command_queue", "handler"]
+        assert recorded[0]["duration_ms"] >= 50
+        assert tracer.stage_stats()["handler"]["count"] == 1
+        
+        tracer.close()
+        lines = export_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["trace_id"] == trace.trace_id
+
+if __name__ == "__main__":
+    test_trace_spans()
+    test_trace_through_executor()
@@ -0,0 +1,402 @@
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Latencies of finished traces, for the metrics endpoint
+STAGE_SECONDS = get_metrics().histogram(
+    "bylexa_stage_duration_seconds", "Time spent per command pipeline stage", ("stage",)
+)
+TRACE_SECONDS = get_metrics().histogram(
+    "bylexa_trace_duration_seconds", "Time from a command's arrival until it has executed", ("trace",)
+)
+
+# Trace of the command being handled by the current thread or task
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("bylexa_trace", default=None)
+
+
+class Span:
+    """One timed stage of a trace; times are time.monotonic() seconds."""
+    __slots__ = ("name", "start", "end", "attributes")
+
+    def __init__(self, name: str, start: float, end: float, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        """Length of the stage in milliseconds."""
+        return (self.end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """Convert to a dictionary with times in ms relative to ``origin``."""
+        data = {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3)
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        return data
+
+
+class _SpanTimer:
+    """Context manager timing one span of a trace."""
+    __slots__ = ("trace", "name", "attributes", "start")
+
+    def __init__(self, trace: "Trace", name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.start = 0.0
+
+    def __enter__(self) -> "_SpanTimer":
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.add_span(self.name, self.start, time.monotonic(), **self.attributes)
+        return False
+
+
+class _NullSpan:
+    """Context manager used when there is no trace to record into."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """
+    Timeline of one command across the gateway, parser, dialog manager and
+    executor.
+
+    A trace is finished once everything holding it has released it: the
+    code that started it, plus each command it queued for execution. Only
+    then is it handed to the tracer's buffer and exporter.
+    """
+    __slots__ = ("trace_id", "name", "start", "end", "started_at", "attributes", "spans",
+                 "_pending", "_lock", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        # Wall clock time, only to place the trace in logs
+        self.started_at = time.time()
+        self.attributes = dict(attributes or {})
+        self.spans: List[Span] = []
+        self._pending = 1
+        self._lock = threading.Lock()
+        self._tracer = tracer
+
+    def span(self, name: str, **attributes) -> _SpanTimer:
+        """
+        Time a stage.
+
+        Args:
+            name: Stage name, e.g. "parse"
+            **attributes: Values recorded with the span
+
+        Returns:
+            Context manager recording the span on exit
+        """
+        return _SpanTimer(self, name, attributes)
+
+    def add_span(self, name: str, start: float, end: float, **attributes):
+        """
+        Record a stage timed by the caller, e.g. time spent in a queue.
+
+        Args:
+            name: Stage name
+            start: time.monotonic() at the start of the stage
+            end: time.monotonic() at the end of the stage
+            **attributes: Values recorded with the span
+        """
+        self.spans.append(Span(name, start, end, attributes or None))
+
+    def hold(self):
+        """Keep the trace open until a matching release()."""
+        with self._lock:
+            self._pending += 1
+
+    def release(self):
+        """Release the trace; the last release finishes it."""
+        with self._lock:
+            self._pending -= 1
+            if self._pending != 0:
+                return
+            self.end = time.monotonic()
+        self._tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Length of the finished trace in milliseconds."""
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the trace to a JSON-serializable dictionary."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": None if self.end is None else round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "spans": [span.to_dict(self.start) for span in sorted(self.spans, key=lambda s: s.start)]
+        }
+
+
+class _TraceScope:
+    """Context manager making a trace current, starting it if it's new."""
+    __slots__ = ("trace", "owned", "token")
+
+    def __init__(self, trace: Trace, owned: bool):
+        self.trace = trace
+        self.owned = owned
+        self.token = None
+
+    def __enter__(self) -> Trace:
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self.token)
+        if self.owned:
+            if exc_type is not None:
+                self.trace.attributes["error"] = exc_type.__name__
+            self.trace.release()
+        return False
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace of the command being handled, if any."""
+    return _current_trace.get()
+
+
+def use_trace(trace: Optional[Trace]):
+    """
+    Make a trace current, e.g. in the thread executing its command.
+
+    Args:
+        trace: Trace to continue, or None
+
+    Returns:
+        Context manager; the trace is not released on exit
+    """
+    if trace is None:
+        return _NULL_SPAN
+    return _TraceScope(trace, owned=False)
+
+
+def span(name: str, **attributes):
+    """
+    Time a stage of the current trace; does nothing outside a trace.
+
+    Args:
+        name: Stage name
+        **attributes: Values recorded with the span
+
+    Returns:
+        Context manager recording the span on exit
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _SpanTimer(trace, name, attributes)
+
+
+class Tracer:
+    """
+    Collects finished traces in a ring buffer and optionally appends them
+    to a JSONL file.
+    """
+
+    def __init__(self, capacity: int = 1000, export_path: Optional[Union[str, Path]] = None,
+                 enabled: bool = True):
+        """
+        Initialize the tracer.
+
+        Args:
+            capacity: Number of finished traces kept in memory
+            export_path: JSONL file every finished trace is appended to
+            enabled: Whether traces are recorded at all
+        """
+        self.enabled = enabled
+        self.traces: "deque[Trace]" = deque(maxlen=capacity)
+        self.export_path = Path(export_path).expanduser() if export_path else None
+        self._export_file = None
+        self._lock = threading.Lock()
+        self.finished = 0
+        self.export_errors = 0
+
+    def trace(self, name: str, **attributes):
+        """
+        Trace a command.
+
+        Inside an existing trace this only times a stage named ``name``, so
+        entry points such as AIOrchestrator.process_text can be traced on
+        their own or as part of a gateway message.
+
+        Args:
+            name: Trace or stage name
+            **attributes: Values recorded with the trace or stage
+
+        Returns:
+            Context manager making the trace current
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        trace = _current_trace.get()
+        if trace is not None:
+            return _SpanTimer(trace, name, attributes)
+        return _TraceScope(Trace(self, name, attributes), owned=True)
+
+    def start_trace(self, name: str, **attributes) -> Optional[Trace]:
+        """
+        Start a trace to be passed along explicitly, e.g. through a queue.
+
+        The caller must release() it when done.
+
+        Args:
+            name: Trace name
+            **attributes: Values recorded with the trace
+
+        Returns:
+            The new trace, or None if tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        return Trace(self, name, attributes)
+
+    def _finish(self, trace: Trace):
+        """Store a finished trace, export it and record its latencies."""
+        TRACE_SECONDS.observe(trace.end - trace.start, trace.name)
+        for s in list(trace.spans):
+            STAGE_SECONDS.observe(s.end - s.start, s.name)
+
+        with self._lock:
+            self.traces.append(trace)
+            self.finished += 1
+            if self.export_path is None:
+                return
+            try:
+                if self._export_file is None:
+                    self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._export_file = open(self.export_path, "a", encoding="utf-8")
+                self._export_file.write(json.dumps(trace.to_dict(), default=str) + "\n")
+                self._export_file.flush()
+            except OSError as e:
+                self.export_errors += 1
+                logger.error(f"Error exporting trace: {str(e)}")
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recently finished traces.
+
+        Args:
+            limit: Maximum number of traces
+
+        Returns:
+            List of trace dictionaries, newest first
+        """
+        with self._lock:
+            traces = list(self.traces)[-limit:] if limit > 0 else []
+        return [trace.to_dict() for trace in reversed(traces)]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a buffered trace.
+
+        Args:
+            trace_id: Trace ID
+
+        Returns:
+            Trace dictionary, or None if it isn't in the buffer
+        """
+        with self._lock:
+            trace = next((t for t in self.traces if t.trace_id == trace_id), None)
+        return None if trace is None else trace.to_dict()
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize stage latencies over the buffered traces.
+
+        Returns:
+            Dictionary mapping stage names to count, avg_ms, p95_ms and max_ms
+        """
+        with self._lock:
+            traces = list(self.traces)
+
+        durations: Dict[str, List[float]] = {}
+        for trace in traces:
+            for s in list(trace.spans):
+                durations.setdefault(s.name, []).append(s.duration_ms)
+
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {
+                "count": len(values),
+                "avg_ms": sum(values) / len(values),
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max_ms": values[-1]
+            }
+        return stats
+
+    def close(self):
+        """Close the export file."""
+        with self._lock:
+            if self._export_file is not None:
+                self._export_file.close()
+                self._export_file = None
+
+
+# Global tracer instance
+_tracer_instance = None
+
+def get_tracer() -> Tracer:
+    """Get the global tracer instance."""
+    global _tracer_instance
+    if _tracer_instance is None:
+        _tracer_instance = Tracer()
+    return _tracer_instance
+
+def init_tracer(capacity: int = 1000, export_path: Optional[Union[str, Path]] = None,
+                enabled: bool = True) -> Tracer:
+    """
+    Configure the global tracer, replacing the default one.
+
+    Args:
+        capacity: Number of finished traces kept in memory
+        export_path: JSONL file every finished trace is appended to
+        enabled: Whether traces are recorded at all
+
+    Returns:
+        The global tracer
+    """
+    global _tracer_instance
+    if _tracer_instance is not None:
+        _tracer_instance.close()
+    _tracer_instance = Tracer(capacity, export_path, enabled)
+    return _tracer_instance
@@ -5,13 +5,17 @@ import io
 import sys
 import contextlib
 import traceback
+import logging
 from .commands import perform_action
-from .config import load_email, load_token
+from .config import load_email, load_token, load_app_configs
+from .logging_setup import setup_logging_from_config
 import aioconsole
 
 WEBSOCKET_SERVER_URL = 'ws://localhost:3000/ws'
 # WEBSOCKET_SERVER_URL = 'wss://bylexa.onrender.com/ws'
 
+logger = logging.getLogger(__name__)
+
 class CodeExecutor:
     def __init__(self):
         self.globals = {}
@@ -65,13 +69,13 @@ async def listen(token, room_code=None):
     
     while True:
         try:
-            print(f"Connecting to server at {WEBSOCKET_SERVER_URL}...")
+            logger.info("Connecting to server at %s...", WEBSOCKET_SERVER_URL)
             async with websockets.connect(WEBSOCKET_SERVER_URL, extra_headers=headers) as websocket:
-                print(f"Connected to {WEBSOCKET_SERVER_URL} as {email}")
+                logger.info("Connected to %s as %s", WEBSOCKET_SERVER_URL, email)
                 
                 if room_code:
                     await websocket.send(json.dumps({'action': 'join_room', 'room_code': room_code}))
-                    print(f"Joined room: {room_code}")
+                    logger.info("Joined room: %s", room_code)
 
                 input_task = asyncio.create_task(handle_user_input(websocket, room_code))
                 receive_task = asyncio.create_task(handle_server_messages(websocket, code_executor))
@@ -92,14 +96,14 @@ async def listen(token, room_code=None):
                     try:
                         await task
                     except Exception as e:
-                        print(f"Task error: {e}")
+                        logger.error("Task error: %s", e)
                         raise
 
         except websockets.exceptions.ConnectionClosed:
-            print("Connection closed. Attempting to reconnect...")
+            logger.warning("Connection closed. Attempting to reconnect...")
             await asyncio.sleep(5)
         except Exception as e:
-            print(f"An error occurred: {e}. Retrying in 5 seconds...")
+            logger.error("An error occurred: %s. Retrying in 5 seconds...", e)
             await asyncio.sleep(5)
 
 async def handle_server_messages(websocket, code_executor):
@@ -107,7 +111,7 @@ async def handle_server_messages(websocket, code_executor):
         try:
             message = await websocket.recv()
             command = json.loads(message)
-            print(f"\nReceived: {command}")
+            logger.info("Received: %s", command)
             
             if command.get('action') == 'python_execute':
                 # Execute the code and get the result
@@ -122,43 +126,40 @@ async def handle_server_messages(websocket, code_executor):
                 }
                 
                 await websocket.send(json.dumps(response))
-                print(f"Sent execution result: {result}")
+                logger.info("Sent execution result: %s", result)
                 
             elif command.get('action') == 'python_result':
                 # Handle received Python execution results
                 result = command['result']
                 
-                # Print execution details in a formatted way
-                print("\n=== Python Execution Result ===")
-                print(f"Status: {'Success' if result['success'] else 'Failed'}")
+                # Log execution details in a formatted way
+                lines = ["=== Python Execution Result ===",
+                         f"Status: {'Success' if result['success'] else 'Failed'}"]
                 if result['output']:
-                    print("\nOutput:")
-                    print(result['output'].rstrip())
+                    lines += ["Output:", result['output'].rstrip()]
                 if result['errors']:
-                    print("\nErrors:")
-                    print(result['errors'])
+                    lines += ["Errors:", result['errors']]
                 if result['exception']:
-                    print("\nException:")
-                    print(result['exception'])
-                print(f"\nExecuted by: {command['executor']}")
-                print("============================\n")
+                    lines += ["Exception:", result['exception']]
+                lines.append(f"Executed by: {command['executor']}")
+                logger.info("\n".join(lines))
                 
             elif 'command' in command:
                 result = perform_action(command['command'])
                 await websocket.send(json.dumps({'result': result}))
-                print(f"Sent result: {result}")
+                logger.info("Sent result: %s", result)
                 
             elif 'message' in command:
-                print(f"Message from server: {command['message']}")
+                logger.info("Message from server: %s", command['message'])
                 
             else:
-                print(f"Unhandled message type: {command.get('action', 'unknown')}")
-                print(f"Message content: {command}")
+                logger.warning("Unhandled message type: %s", command.get('action', 'unknown'))
+                logger.debug("Message content: %s", command)
                 
         except asyncio.CancelledError:
             raise
         except Exception as e:
-            print(f"Error handling server message: {e}")
+            logger.error("Error handling server message: %s", e)
             raise
 
 async def handle_user_input(websocket, room_code):
@@ -218,4 +219,5 @@ def start_client():
         print("\nClient stopped.")
 
 if __name__ == "__main__":
+    setup_logging_from_config(load_app_configs())
     start_client()
\ No newline at end of file
@@ -12,29 +12,49 @@ from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
 from .ai_orchestrator import get_orchestrator
+from .command_executor import PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from .parser_pool import PoolSaturatedError
+from .tracing import get_tracer, use_trace
+from .metrics import get_metrics
 from .config import load_token
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Clients disconnected for not keeping up with their messages
+EVICTIONS = get_metrics().counter(
+    "bylexa_ws_slow_consumer_evictions_total", "Clients disconnected for receiving too slowly", ("reason",)
+)
+
 class BylexaWSServer:
     """
     WebSocket gateway for Bylexa that handles remote connections,
     command processing, and event distribution.
     """
     
-    def __init__(self, host: str = 'localhost', port: int = 8765):
+    def __init__(self, host: str = 'localhost', port: int = 8765,
+                 inbox_size: int = 64, max_concurrent_handlers: int = 64,
+                 send_timeout: Optional[float] = 5.0, max_send_buffer: Optional[int] = 1 << 20):
         """
         Initialize the WebSocket server.
         
         Args:
             host: Hostname or IP to bind the server to
             port: Port number to listen on
+            inbox_size: Messages a connection may have waiting; once full,
+                the connection isn't read until its handlers catch up
+            max_concurrent_handlers: Message handlers running at once across
+                all connections
+            send_timeout: Seconds a send may take before the client is
+                disconnected as too slow, or None to wait indefinitely
+            max_send_buffer: Bytes that may be waiting to go out to a client
+                before it is disconnected as too slow, or None for no limit
         """
         self.host = host
         self.port = port
+        self.inbox_size = inbox_size
+        self.max_concurrent_handlers = max_concurrent_handlers
+        self.send_timeout = send_timeout
+        self.max_send_buffer = max_send_buffer
         
         # Connection tracking
         self.connections = {}  # Maps connection ID to websocket
@@ -59,18 +79,40 @@ class BylexaWSServer:
             'query': self._handle_query
         }
         
-        # Start message processing task
+        # Background tasks, e.g. waiting for a command's execution result
+        self.handler_tasks = set()
+        
+        # Actions whose messages are traced from arrival to execution
+        self.traced_actions = {'command'}
+        
+        # Each connection's messages are handled in order by its own worker
+        # task; workers of different connections run concurrently, up to
+        # max_concurrent_handlers handlers at a time
         self.running = False
-        self.message_queue = asyncio.Queue()
-        self.processing_task = None
+        self.inboxes: Dict[str, asyncio.Queue] = {}  # Maps connection ID to pending messages
+        self.inbox_workers: Dict[str, asyncio.Task] = {}  # Maps connection ID to its worker
+        self.handler_slots = None  # Created with the first inbox, inside the event loop
+        self.active_handlers = 0
+        
+        # Sampled only when metrics are collected
+        metrics = get_metrics()
+        metrics.gauge("bylexa_ws_connections", "Open WebSocket connections",
+                      callback=lambda: len(self.connections))
+        metrics.gauge("bylexa_ws_authenticated", "Authenticated WebSocket connections",
+                      callback=lambda: len(self.authenticated))
+        metrics.gauge("bylexa_ws_rooms", "Rooms with members",
+                      callback=lambda: len(self.rooms))
+        metrics.gauge("bylexa_ws_subscribers", "Event subscribers by event type", ("event",),
+                      callback=lambda: {event: len(subs) for event, subs in list(self.event_subscribers.items())})
+        metrics.gauge("bylexa_message_queue_depth", "Gateway messages waiting in connection inboxes",
+                      callback=lambda: sum(inbox.qsize() for inbox in list(self.inboxes.values())))
+        metrics.gauge("bylexa_ws_active_handlers", "Gateway message handlers running",
+                      callback=lambda: self.active_handlers)
     
     async def start(self):
         """Start the WebSocket server."""
         self.running = True
         
-        # Start message processing task
-        self.processing_task = asyncio.create_task(self._process_message_queue())
-        
         # Start the WebSocket server
         async with websockets.serve(
             self.handle_connection, self.host, self.port
@@ -82,13 +124,15 @@ class BylexaWSServer:
         """Stop the WebSocket server."""
         self.running = False
         
-        # Cancel processing task
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel connection workers, with their running handlers, and
+        # tasks waiting on execution results
+        tasks = list(self.inbox_workers.values()) + list(self.handler_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.inbox_workers.clear()
+        self.inboxes.clear()
         
         # Close all connections
         close_tasks = []
@@ -149,6 +193,7 @@ class BylexaWSServer:
             }))
             
             # Handle messages until the connection is closed
+            self._open_inbox(conn_id)
             async for message in websocket:
                 await self._handle_message(conn_id, message)
                 
@@ -184,6 +229,8 @@ class BylexaWSServer:
                 # For now, just check if it's not empty and matches the local token
                 local_token = load_token()
                 if token and (token == local_token or self._verify_token(token)):
+                    # Identifies the credential without keeping it around
+                    self.connection_info[conn_id]['principal'] = hashlib.sha256(token.encode()).hexdigest()[:32]
                     return True
             
             # If auth header is missing or invalid, send auth error and close
@@ -239,6 +286,9 @@ class BylexaWSServer:
         Args:
             conn_id: Connection ID to remove
         """
+        # Stop handling its messages; nobody is left to answer
+        await self._close_inbox(conn_id)
+        
         # Remove from authenticated set
         if conn_id in self.authenticated:
             self.authenticated.remove(conn_id)
@@ -263,6 +313,10 @@ class BylexaWSServer:
             if not subscribers:
                 del self.event_subscribers[event_type]
         
+        # Drop the connection's conversation state, if it ever sent a command
+        if self.connection_info.get(conn_id, {}).get('dialog_session'):
+            get_orchestrator().end_session(conn_id)
+        
         # Remove from connections dict
         if conn_id in self.connections:
             del self.connections[conn_id]
@@ -294,9 +348,16 @@ class BylexaWSServer:
             action = data['action']
             handler = self.command_handlers.get(action)
             
-            if handler:
-                # Add to message queue for processing
-                await self.message_queue.put((conn_id, action, data, handler))
+            inbox = self.inboxes.get(conn_id)
+            if handler and inbox is not None:
+                # Queue for the connection's worker; waits while the inbox is
+                # full, which stops reading from this client meanwhile
+                trace = None
+                if action in self.traced_actions:
+                    trace = get_tracer().start_trace(f"ws.{action}", conn_id=conn_id)
+                await inbox.put((action, data, handler, trace, time.monotonic()))
+            elif handler:
+                await self._send_error(conn_id, "Connection is closing")
             else:
                 await self._send_error(conn_id, f"Unknown action: {action}")
         
@@ -305,28 +366,65 @@ class BylexaWSServer:
         except Exception as e:
             await self._send_error(conn_id, f"Error processing message: {str(e)}")
     
-    async def _process_message_queue(self):
-        """Process messages from the queue."""
-        while self.running:
-            try:
-                # Get a message from the queue
-                conn_id, action, data, handler = await self.message_queue.get()
-                
-                # Process the message
-                try:
-                    await handler(conn_id, data)
-                except Exception as e:
-                    logger.error(f"Error handling action '{action}': {str(e)}")
-                    await self._send_error(conn_id, f"Error handling action '{action}': {str(e)}")
-                
-                # Mark the task as done
-                self.message_queue.task_done()
+    def _open_inbox(self, conn_id: str):
+        """Create a connection's inbox and start the worker handling it."""
+        if self.handler_slots is None:
+            self.handler_slots = asyncio.Semaphore(self.max_concurrent_handlers)
+        self.inboxes[conn_id] = asyncio.Queue(maxsize=self.inbox_size)
+        self.inbox_workers[conn_id] = asyncio.create_task(self._process_inbox(conn_id))
+    
+    async def _close_inbox(self, conn_id: str):
+        """Stop a connection's worker, dropping the messages it hasn't handled."""
+        worker = self.inbox_workers.pop(conn_id, None)
+        self.inboxes.pop(conn_id, None)
+        if worker is not None:
+            worker.cancel()
+            # A worker closing its own inbox (its client went away while it
+            # was sending) stops at its next await instead
+            if worker is not asyncio.current_task():
+                await asyncio.gather(worker, return_exceptions=True)
+    
+    async def _process_inbox(self, conn_id: str):
+        """Handle one connection's messages in the order they arrived."""
+        inbox = self.inboxes[conn_id]
+        try:
+            while True:
+                action, data, handler, trace, enqueued = await inbox.get()
                 
-            except asyncio.CancelledError:
-                # Task was cancelled, exit loop
-                break
-            except Exception as e:
-                logger.error(f"Error in message processing loop: {str(e)}")
+                # Wait for a free handler slot
+                async with self.handler_slots:
+                    if trace is not None:
+                        trace.add_span("message_queue", enqueued, time.monotonic())
+                    self.active_handlers += 1
+                    try:
+                        await self._run_handler(conn_id, action, data, handler, trace)
+                    finally:
+                        self.active_handlers -= 1
+        finally:
+            # Finish the traces of messages that will never be handled
+            while not inbox.empty():
+                trace = inbox.get_nowait()[3]
+                if trace is not None:
+                    trace.release()
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine as a task that stop() cancels."""
+        task = asyncio.create_task(coro)
+        self.handler_tasks.add(task)
+        task.add_done_callback(self.handler_tasks.discard)
+        return task
+    
+    async def _run_handler(self, conn_id: str, action: str, data: Dict, handler, trace=None):
+        """Run a message handler, reporting failures to the sender."""
+        try:
+            with use_trace(trace):
+                await handler(conn_id, data)
+        except Exception as e:
+            logger.error(f"Error handling action '{action}': {str(e)}")
+            await self._send_error(conn_id, f"Error handling action '{action}': {str(e)}")
+        finally:
+            if trace is not None:
+                trace.release()
     
     async def _send_error(self, conn_id: str, message: str):
         """
@@ -337,13 +435,10 @@ class BylexaWSServer:
             message: Error message
         """
         if conn_id in self.connections:
-            try:
-                await self.connections[conn_id].send(json.dumps({
-                    'action': 'error',
-                    'message': message
-                }))
-            except Exception as e:
-                logger.error(f"Error sending error message to {conn_id}: {str(e)}")
+            await self._send_message(conn_id, json.dumps({
+                'action': 'error',
+                'message': message
+            }))
     
     async def _send_to_connection(self, conn_id: str, data: Dict):
         """
@@ -354,12 +449,99 @@ class BylexaWSServer:
             data: Data dictionary to send
         """
         if conn_id in self.connections:
-            try:
-                await self.connections[conn_id].send(json.dumps(data))
-            except Exception as e:
-                logger.error(f"Error sending data to {conn_id}: {str(e)}")
-                # Connection might be dead, remove it
-                await self._remove_connection(conn_id)
+            await self._send_message(conn_id, json.dumps(data))
+    
+    async def _send_message(self, conn_id: str, message: str) -> bool:
+        """
+        Send an already serialized message to a connection.
+        
+        A client that doesn't keep up, because more than max_send_buffer
+        bytes are still waiting to go out to it or a send takes longer than
+        send_timeout, is disconnected so it can't hold up everyone else.
+        
+        Args:
+            conn_id: Connection ID to send to
+            message: JSON message
+            
+        Returns:
+            True if the message was sent
+        """
+        websocket = self.connections.get(conn_id)
+        if websocket is None:
+            return False
+        
+        transport = getattr(websocket, 'transport', None)
+        if (self.max_send_buffer is not None and transport is not None
+                and transport.get_write_buffer_size() > self.max_send_buffer):
+            self._evict(conn_id, "send_buffer_full")
+            return False
+        
+        try:
+            if self.send_timeout is None:
+                await websocket.send(message)
+            else:
+                await asyncio.wait_for(websocket.send(message), self.send_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._evict(conn_id, "send_timeout")
+        except Exception as e:
+            logger.error(f"Error sending data to {conn_id}: {str(e)}")
+            # Connection might be dead, remove it
+            self._drop_connection(conn_id)
+        return False
+    
+    def _evict(self, conn_id: str, reason: str):
+        """Disconnect a client that receives its messages too slowly."""
+        if conn_id in self.connections:
+            logger.warning(f"Disconnecting slow client {conn_id}: {reason}")
+            EVICTIONS.inc(reason)
+            self._drop_connection(conn_id, 1013, "Receiving messages too slowly")
+    
+    def _drop_connection(self, conn_id: str, code: int = 1011, reason: str = ""):
+        """
+        Stop sending to a connection at once and clean it up in the background.
+        
+        Removing a connection cancels its worker, which may be the task
+        sending to it, so the removal runs as a task of its own rather than
+        in the middle of a broadcast.
+        """
+        websocket = self.connections.pop(conn_id, None)
+        if websocket is not None:
+            self._spawn(self._close_connection(conn_id, websocket, code, reason))
+    
+    async def _close_connection(self, conn_id: str, websocket, code: int, reason: str):
+        """Remove a dropped connection and close its socket."""
+        await self._remove_connection(conn_id)
+        try:
+            await websocket.close(code, reason)
+        except Exception:
+            # Already broken; nothing left to close
+            pass
+    
+    async def _fan_out(self, conn_ids, data: Dict) -> int:
+        """
+        Send the same data to several connections.
+        
+        The data is serialized once and sent to all connections concurrently,
+        so a slow client delays only itself until send_timeout evicts it.
+        
+        Args:
+            conn_ids: Connection IDs to send to
+            data: Data dictionary to send
+            
+        Returns:
+            Number of connections the data was sent to
+        """
+        targets = [conn_id for conn_id in conn_ids if conn_id in self.connections]
+        if not targets:
+            return 0
+        
+        message = json.dumps(data)
+        if len(targets) == 1:
+            return int(await self._send_message(targets[0], message))
+        
+        results = await asyncio.gather(*(self._send_message(conn_id, message) for conn_id in targets))
+        return sum(results)
     
     async def _broadcast_to_room(self, room_code: str, data: Dict, exclude_conn_id: str = None):
         """
@@ -373,13 +555,10 @@ class BylexaWSServer:
         if room_code not in self.rooms:
             return
         
-        # Get connections in the room
-        connections = self.rooms[room_code].copy()
-        
-        # Send to each connection
-        for conn_id in connections:
-            if conn_id != exclude_conn_id and conn_id in self.connections:
-                await self._send_to_connection(conn_id, data)
+        await self._fan_out(
+            [conn_id for conn_id in self.rooms[room_code] if conn_id != exclude_conn_id],
+            data
+        )
     
     async def _broadcast_event(self, event_type: str, data: Dict):
         """
@@ -392,18 +571,14 @@ class BylexaWSServer:
         if event_type not in self.event_subscribers:
             return
         
-        # Get subscribers for this event type
-        subscribers = self.event_subscribers[event_type].copy()
-        
-        # Send to each subscriber
-        for conn_id in subscribers:
-            if conn_id in self.connections:
-                event_data = {
-                    'action': 'event',
-                    'event_type': event_type,
-                    'data': data
-                }
-                await self._send_to_connection(conn_id, event_data)
+        await self._fan_out(
+            list(self.event_subscribers[event_type]),
+            {
+                'action': 'event',
+                'event_type': event_type,
+                'data': data
+            }
+        )
     
     # Command handlers
     
@@ -623,7 +798,18 @@ class BylexaWSServer:
         )
     
     async def _handle_command(self, conn_id: str, data: Dict):
-        """Handle a command to be executed by the AI orchestrator."""
+        """
+        Handle a command to be executed by the AI orchestrator.
+        
+        A single utterance is sent as 'command'. Several utterances can be
+        sent at once as a 'commands' list; they are parsed as one batch and
+        answered with a single 'command_results' message.
+        """
+        commands = data.get('commands')
+        if commands is not None:
+            await self._handle_command_batch(conn_id, data, commands)
+            return
+        
         command = data.get('command')
         if not command:
             await self._send_error(conn_id, "Missing 'command' field")
@@ -632,8 +818,22 @@ class BylexaWSServer:
         # Get AI orchestrator
         orchestrator = get_orchestrator()
         
-        # Process the command
-        result = orchestrator.process_text(command)
+        try:
+            priority, deadline = self._command_priority(data, PRIORITY_NORMAL)
+        except ValueError as e:
+            await self._send_error(conn_id, str(e))
+            return
+        
+        # Process the command in its conversation; the parse runs off the
+        # event loop
+        try:
+            result = await orchestrator.process_text_async(
+                command, session_id=self._dialog_session(conn_id, data),
+                priority=priority, deadline=deadline
+            )
+        except PoolSaturatedError as e:
+            await self._send_error(conn_id, f"Server busy, try again later: {str(e)}")
+            return
         
         # Send the result back
         await self._send_to_connection(
@@ -644,6 +844,10 @@ class BylexaWSServer:
             }
         )
         
+        # Send the execution result once the command has run
+        if 'command_id' in result:
+            self._spawn(self._send_execution_result(conn_id, result['command_id']))
+        
         # Broadcast the command as an event if requested
         if data.get('broadcast_event', False):
             event_type = data.get('event_type', 'command')
@@ -656,6 +860,116 @@ class BylexaWSServer:
                 }
             )
     
+    async def _send_execution_result(self, conn_id: str, command_id: str):
+        """Send a command's execution result to the connection that issued it."""
+        try:
+            execution_result = await get_orchestrator().result_async(command_id)
+        except KeyError:
+            return
+        
+        await self._send_to_connection(
+            conn_id,
+            {
+                'action': 'execution_result',
+                'command_id': command_id,
+                'result': execution_result
+            }
+        )
+    
+    def _command_priority(self, data: Dict, default: str) -> Tuple[str, Optional[float]]:
+        """
+        Get the priority and deadline requested for a command.
+        
+        Remote clients may ask for 'normal' or 'background' priority;
+        'interactive' is kept for commands spoken or typed on this machine.
+        A 'deadline' in seconds drops the command if it can't start in time.
+        
+        Raises:
+            ValueError: If the priority or deadline is invalid
+        """
+        priority = data.get('priority', default)
+        if priority not in (PRIORITY_NORMAL, PRIORITY_BACKGROUND):
+            raise ValueError(f"'priority' must be '{PRIORITY_NORMAL}' or '{PRIORITY_BACKGROUND}'")
+        
+        deadline = data.get('deadline')
+        if deadline is not None:
+            if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline <= 0:
+                raise ValueError("'deadline' must be a positive number of seconds")
+            deadline = float(deadline)
+        return priority, deadline
+    
+    def _dialog_session(self, conn_id: str, data: Dict) -> str:
+        """
+        Get the dialog session a command belongs to.
+        
+        Clients that send a 'session_id' keep their conversation across
+        reconnects and server restarts; otherwise each connection has its
+        own conversation, which ends when the connection closes.
+        
+        A client's session IDs are scoped to the token it authenticated
+        with, so another client can't join its conversation by sending the
+        same ID.
+        """
+        session_id = data.get('session_id')
+        if session_id:
+            principal = self.connection_info.get(conn_id, {}).get('principal', conn_id)
+            return f"client:{principal}:{session_id}"
+        self.connection_info.get(conn_id, {})['dialog_session'] = True
+        return conn_id
+    
+    async def _handle_command_batch(self, conn_id: str, data: Dict, commands: List[str]):
+        """Handle a batch of commands parsed together by the AI orchestrator."""
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            await self._send_error(conn_id, "'commands' must be a list of strings")
+            return
+        
+        # Batches yield to single commands unless the client asks otherwise
+        try:
+            priority, deadline = self._command_priority(data, PRIORITY_BACKGROUND)
+        except ValueError as e:
+            await self._send_error(conn_id, str(e))
+            return
+        
+        # Get AI orchestrator
+        orchestrator = get_orchestrator()
+        
+        # Process all commands off the event loop
+        try:
+            results = await orchestrator.process_texts_async(
+                commands, session_id=self._dialog_session(conn_id, data),
+                priority=priority, deadline=deadline
+            )
+        except PoolSaturatedError as e:
+            await self._send_error(conn_id, f"Server busy, try again later: {str(e)}")
+            return
+        
+        # Send the results back
+        await self._send_to_connection(
+            conn_id,
+            {
+                'action': 'command_results',
+                'results': results
+            }
+        )
+        
+        # Send each execution result once its command has run
+        for result in results:
+            if 'command_id' in result:
+                self._spawn(self._send_execution_result(conn_id, result['command_id']))
+        
+        # Broadcast each command as an event if requested
+        if data.get('broadcast_event', False):
+            event_type = data.get('event_type', 'command')
+            for command, result in zip(commands, results):
+                await self._broadcast_event(
+                    event_type,
+                    {
+                        'command': command,
+                        'result': result,
+                        'sender': conn_id
+                    }
+                )
+    
     async def _handle_query(self, conn_id: str, data: Dict):
         """Handle a query for system information."""
         query_type = data.get('query_type')
@@ -687,6 +1001,45 @@ class BylexaWSServer:
                 subscribers_info[event_type] = len(subscribers)
             response['subscribers'] = subscribers_info
             
+        elif query_type == 'parser':
+            # Return hit-rate and latency counters per parsing path
+            response['paths'] = get_orchestrator().parser.get_path_stats()
+            
+        elif query_type == 'parse_cache':
+            # Return parse result cache statistics
+            response['cache'] = get_orchestrator().parser.cache.stats()
+            
+        elif query_type == 'parser_pool':
+            # Return parser worker pool statistics
+            pool = get_orchestrator().parser_pool
+            response['pool'] = pool.stats() if pool is not None else None
+            
+        elif query_type == 'executor':
+            # Return per-lane command queue depths and counters, and queue
+            # wait-time histograms per priority
+            executor = get_orchestrator().executor
+            response['lanes'] = executor.stats()
+            response['wait_times'] = executor.wait_time_stats()
+            
+        elif query_type == 'metrics':
+            # Return all metrics in the Prometheus text format
+            response['metrics'] = get_metrics().render()
+            
+        elif query_type == 'traces':
+            # Return recent command traces and per-stage latencies
+            tracer = get_tracer()
+            if data.get('trace_id'):
+                response['trace'] = tracer.get(data['trace_id'])
+            else:
+                response['traces'] = tracer.recent(int(data.get('limit', 20)))
+                response['stages'] = tracer.stage_stats()
+            
+        elif query_type == 'dialog_sessions':
+            # Return per-connection conversation and dialog state statistics
+            dialog_manager = get_orchestrator().dialog_manager
+            response['sessions'] = dialog_manager.session_stats()
+            response['states'] = dialog_manager.flow_stats()
+            
         else:
             response['error'] = f"Unknown query type: {query_type}"
         
@@ -704,11 +1057,18 @@ def get_ws_server() -> BylexaWSServer:
         _server_instance = BylexaWSServer()
     return _server_instance
 
-async def start_ws_server(host: str = 'localhost', port: int = 8765):
-    """Start the WebSocket server with the given host and port."""
+async def start_ws_server(host: str = 'localhost', port: int = 8765, **options):
+    """
+    Start the WebSocket server with the given host and port.
+    
+    Args:
+        host: Hostname or IP to bind the server to
+        port: Port number to listen on
+        **options: Further BylexaWSServer arguments, e.g. inbox_size
+    """
     global _server_instance
     if _server_instance is None:
-        _server_instance = BylexaWSServer(host, port)
+        _server_instance = BylexaWSServer(host, port, **options)
     await _server_instance.start()
 
 async def stop_ws_server():